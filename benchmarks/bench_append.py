@@ -0,0 +1,76 @@
+"""Warehouse append throughput: pandas round-trip vs. Arrow hand-off.
+
+    $ python benchmarks/bench_append.py --rows 5000000
+
+The pandas baseline needs the optional ``bench`` extra (``pip install
+reps[bench]``); without pandas only the Arrow path is timed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from reps.pipeline.ingest import _DDL, append_samples
+
+
+def _frame(rows: int) -> pl.DataFrame:
+    start = datetime(2020, 1, 1)
+    end = start + timedelta(milliseconds=10 * (rows - 1))
+    ts = pl.datetime_range(start, end, "10ms", eager=True, time_zone="US/Eastern")
+    x = pl.int_range(0, rows, eager=True).cast(pl.Float32) / 100
+    return pl.DataFrame(
+        {"ts": ts, **{c: x.sin() for c in ("ax", "ay", "az", "gx", "gy", "gz")}}
+    ).with_columns(pl.lit("001").alias("id"))
+
+
+def _pandas(db: duckdb.DuckDBPyConnection, df: pl.DataFrame) -> None:
+    db.append("imu_structured", df.to_pandas(), by_name=True)
+
+
+def _arrow(db: duckdb.DuckDBPyConnection, df: pl.DataFrame) -> None:
+    append_samples(db, "imu_structured", df)
+
+
+def _time(fn: Callable, df: pl.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            with duckdb.connect(Path(tmp) / "bench.duckdb") as db:
+                db.execute(_DDL.format(tbl="imu_structured", lbl="labels_structured"))
+                t0 = time.perf_counter()
+                fn(db, df)
+                best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = _frame(args.rows)
+    paths: dict[str, Callable] = {"arrow": _arrow}
+    if find_spec("pandas"):
+        paths = {"pandas": _pandas, **paths}
+    else:
+        print("pandas not installed – skipping the pandas baseline")
+
+    results = {name: _time(fn, df, args.repeat) for name, fn in paths.items()}
+    for name, secs in results.items():
+        print(f"{name:>7}: {secs:7.3f} s  {args.rows / secs:>14,.0f} rows/s")
+    if "pandas" in results:
+        print(f"speed-up: {results['pandas'] / results['arrow']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Warehouse layout: per-append ART indexes vs. clustered appends.
+
+    $ python benchmarks/bench_layout.py --subjects 20 --rows 500000
+
+Loads the same synthetic subjects into three warehouses and reports ingest
+time plus per-subject query latency:
+
+* ``indexed``   – the old path, ``CREATE INDEX IF NOT EXISTS`` on every append
+* ``clustered`` – no indexes, rows appended sorted by (id, ts)
+* ``parquet``   – `export_parquet` of the clustered warehouse, scanned with
+  Hive partition pruning
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from reps.io.warehouse import INDEXES, export_parquet
+from reps.pipeline.ingest import _DDL, append_samples
+
+_TABLE = "imu_structured"
+
+
+def _subject(sid: str, rows: int) -> pl.DataFrame:
+    start = datetime(2020, 1, 1)
+    end = start + timedelta(milliseconds=10 * (rows - 1))
+    ts = pl.datetime_range(start, end, "10ms", eager=True)
+    x = pl.int_range(0, rows, eager=True).cast(pl.Float32) / 100
+    return pl.DataFrame(
+        {"ts": ts, **{c: x.sin() for c in ("ax", "ay", "az", "gx", "gy", "gz")}}
+    ).with_columns(pl.lit(sid).alias("id"))
+
+
+def _indexed(db: duckdb.DuckDBPyConnection, df: pl.DataFrame) -> None:
+    for name, (table, col) in INDEXES.items():
+        if table == _TABLE:
+            db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({col})")
+    append_samples(db, _TABLE, df)
+
+
+def _clustered(db: duckdb.DuckDBPyConnection, df: pl.DataFrame) -> None:
+    append_samples(db, _TABLE, df)
+
+
+def _load(
+    path: Path, frames: list[pl.DataFrame], append: Callable
+) -> tuple[duckdb.DuckDBPyConnection, float]:
+    db = duckdb.connect(path)
+    db.execute(_DDL.format(tbl=_TABLE, lbl="labels_structured"))
+    db.execute(_DDL.format(tbl="imu_unstructured", lbl="labels_unstructured"))
+    t0 = time.perf_counter()
+    for df in frames:
+        append(db, df)
+    db.execute("CHECKPOINT")
+    return db, time.perf_counter() - t0
+
+
+def _latency(query: Callable[[str], object], ids: list[str]) -> float:
+    """Median seconds of *query* over every subject (after one warm-up)."""
+    query(ids[0])
+    times = []
+    for sid in ids:
+        t0 = time.perf_counter()
+        query(sid)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--subjects", type=int, default=10)
+    ap.add_argument("--rows", type=int, default=200_000, help="rows per subject")
+    args = ap.parse_args()
+
+    ids = [f"{i:03d}" for i in range(args.subjects)]
+    frames = [_subject(sid, args.rows) for sid in ids]
+    window = "ts BETWEEN TIMESTAMP '2020-01-01 00:05' AND TIMESTAMP '2020-01-01 00:06'"
+    sql = f"SELECT avg(ax), count(*) FROM {_TABLE} WHERE id = ? AND {window}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        rows: list[tuple[str, float | None, float]] = []
+        for name, append in (("indexed", _indexed), ("clustered", _clustered)):
+            db, secs = _load(root / f"{name}.duckdb", frames, append)
+            lat = _latency(lambda s: db.execute(sql, [s]).fetchall(), ids)
+            rows.append((name, secs, lat))
+            if name == "clustered":
+                export_parquet(db, root / "export")
+            db.close()
+
+        glob = (root / "export" / "imu" / "**" / "*.parquet").as_posix()
+        pq = duckdb.connect()
+        pq_sql = (
+            f"SELECT avg(ax), count(*) FROM read_parquet('{glob}', "
+            "hive_partitioning = true, hive_types = {'subject': VARCHAR}) "
+            f"WHERE subject = ? AND session = 'structured' AND {window}"
+        )
+        lat = _latency(lambda s: pq.execute(pq_sql, [s]).fetchall(), ids)
+        rows.append(("parquet", None, lat))
+
+    total = args.subjects * args.rows
+    print(f"{'layout':>10} {'ingest s':>9} {'rows/s':>13} {'query ms':>9}")
+    for layout, took, median in rows:
+        load = "" if took is None else f"{took:.3f}"
+        rate = "" if took is None else f"{total / took:,.0f}"
+        print(f"{layout:>10} {load:>9} {rate:>13} {median * 1e3:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
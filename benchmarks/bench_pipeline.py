@@ -0,0 +1,287 @@
+"""End-to-end pipeline benchmark on synthetic data.
+
+    $ python benchmarks/bench_pipeline.py --subjects 4 --hours 1 --out base.json
+    $ python benchmarks/bench_pipeline.py --subjects 4 --hours 1 --compare base.json
+
+Generates REPS-style raw files with `reps.utils.synthetic` (deterministic for a
+given ``--seed``), then times every stage in a fresh process so each one's
+peak RSS is its own: the loaders, alignment, single- and multi-subject
+ingest, validation, and the ``reps ingest`` / ``reps validate`` CLI. Results
+(seconds, rows/s, peak RSS) are written as JSON to compare across commits.
+Runs offline; a few subject-hours fit comfortably on a laptop. A CLI run's
+peak RSS comes from ``wait4`` on POSIX and ``GetProcessMemoryInfo`` on
+Windows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import polars as pl
+
+from reps.config import configure
+from reps.utils import metrics
+from reps.utils.synthetic import SyntheticSpec, generate
+
+Context = dict[str, Any]  # raw/tmp paths, subject ids, workers; picklable
+
+
+# ─────────────────────────── stages (each runs in its own process) ───────────────────────────
+
+
+def _raw(ctx: Context, kind: str) -> Path:
+    sid, root = ctx["ids"][0], Path(ctx["raw"])
+    if kind == "labels":
+        return root / "exercise_labels" / "structured" / f"REPS-{sid}_labels.parquet"
+    return root / kind / f"REPS-{sid}_{kind}.parquet"
+
+
+def _imu_rows(db_path: Path) -> int:
+    with duckdb.connect(db_path, read_only=True) as con:
+        row = con.execute(
+            "SELECT (SELECT count(*) FROM imu_structured)"
+            " + (SELECT count(*) FROM imu_unstructured)"
+        ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def _load_acc(ctx: Context) -> int:
+    from reps.io.parquet import load_acc
+
+    return load_acc(_raw(ctx, "acc")).height
+
+
+def _load_gyro(ctx: Context) -> int:
+    from reps.io.parquet import load_gyro
+
+    return load_gyro(_raw(ctx, "gyro")).height
+
+
+def _load_labels(ctx: Context) -> int:
+    from reps.io.parquet import load_labels
+
+    load_labels(_raw(ctx, "labels"))
+    return pl.scan_parquet(_raw(ctx, "labels")).select(pl.len()).collect().item()
+
+
+def _align_acc_gyro(ctx: Context) -> int:
+    from reps.io.parquet import load_acc, load_gyro
+    from reps.processing.resample import align_acc_gyro
+
+    acc, gyro = load_acc(_raw(ctx, "acc")), load_gyro(_raw(ctx, "gyro"))
+    return align_acc_gyro(acc, gyro).height
+
+
+def _ingest_subject(ctx: Context) -> int:
+    from reps.pipeline.ingest import ingest_subject
+
+    db = Path(ctx["tmp"]) / "single.duckdb"
+    configure({"DWH_PATH": db})
+    ingest_subject(ctx["ids"][0])
+    return _imu_rows(db)
+
+
+def _ingest_many(ctx: Context) -> int:
+    from reps.pipeline.ingest import ingest_many
+
+    db = Path(ctx["tmp"]) / "many.duckdb"
+    configure({"DWH_PATH": db})
+    ingest_many(ctx["ids"], workers=ctx["workers"])
+    return _imu_rows(db)
+
+
+def _validate(ctx: Context) -> int:
+    from reps.pipeline import validate
+
+    db = Path(ctx["tmp"]) / "many.duckdb"
+    configure({"DWH_PATH": db})
+    validate.run(summary=True)
+    return _imu_rows(db)
+
+
+# order matters: validate reads the warehouse ingest_many wrote
+STAGES: dict[str, Callable[[Context], int]] = {
+    "load_acc": _load_acc,
+    "load_gyro": _load_gyro,
+    "load_labels": _load_labels,
+    "align_acc_gyro": _align_acc_gyro,
+    "ingest_subject": _ingest_subject,
+    "ingest_many": _ingest_many,
+    "validate": _validate,
+}
+
+
+def _peak_rss_mb(maxrss: int) -> float:
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 2**10
+
+
+def _child(name: str, ctx: Context, out: Any) -> None:
+    # silence progress output here and in any workers the stage spawns
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    configure({"RAW_ROOT": Path(ctx["raw"])})
+    t0 = time.perf_counter()
+    rows = STAGES[name](ctx)
+    secs = time.perf_counter() - t0
+    out.put((secs, rows, metrics.peak_rss_mb() or 0.0))
+
+
+def _in_process(name: str, ctx: Context) -> tuple[float, int, float]:
+    spawn = mp.get_context("spawn")  # fresh interpreter: clean RSS, no fork issues
+    out = spawn.Queue()
+    proc = spawn.Process(target=_child, args=(name, ctx, out))
+    proc.start()
+    result = out.get()
+    proc.join()
+    if proc.exitcode:
+        raise RuntimeError(f"stage {name} exited with {proc.exitcode}")
+    return result
+
+
+def _cli(args: list[str], ctx: Context, cwd: Path) -> tuple[float, float, int]:
+    """Run ``reps <args>``: seconds, peak RSS of its main process, exit code."""
+    env = {**os.environ, "RAW_ROOT": ctx["raw"], "DWH_PATH": "dwh/reps.duckdb"}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "reps.cli.main", *args],
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    if sys.platform == "win32":
+        proc.wait()  # the Popen keeps the process handle open for the query
+        peak = metrics.peak_rss_mb(proc.pid) or 0.0
+    else:
+        _, status, usage = os.wait4(proc.pid, 0)  # unlike Popen.wait, gives rusage
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        peak = _peak_rss_mb(usage.ru_maxrss)
+    return time.perf_counter() - t0, peak, proc.returncode
+
+
+# ─────────────────────────── harness ───────────────────────────
+
+
+def _record(secs: float, rows: int, rss_mb: float) -> dict[str, Any]:
+    return {
+        "seconds": round(secs, 4),
+        "rows": rows,
+        "rows_per_s": round(rows / secs, 1) if secs else 0.0,
+        "peak_rss_mb": round(rss_mb, 1),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(spec: SyntheticSpec, subjects: int, workers: int, repeat: int) -> dict:
+    """Generate data, run every stage *repeat* times; best time, worst RSS."""
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / "raw"
+        t0 = time.perf_counter()
+        ids = generate(raw, subjects, spec)
+        gen_secs = time.perf_counter() - t0
+        ctx: Context = {"raw": str(raw), "tmp": tmp, "ids": ids, "workers": workers}
+
+        stages: dict[str, dict[str, Any]] = {}
+        for name in STAGES:
+            runs = [_in_process(name, ctx) for _ in range(repeat)]
+            secs = min(r[0] for r in runs)
+            stages[name] = _record(secs, runs[0][1], max(r[2] for r in runs))
+            print(f"{name:>16}: {secs:8.3f} s", flush=True)
+
+        cli = Path(tmp) / "cli"
+        cli.mkdir()
+        ingest_args = ["ingest", "--all", "--workers", str(workers), "--force"]
+        for name, args in (
+            ("cli_ingest", ingest_args),
+            ("cli_validate", ["validate", "--summary"]),
+        ):
+            cli_runs = [_cli(args, ctx, cli) for _ in range(repeat)]
+            secs = min(r[0] for r in cli_runs)
+            rss = max(r[1] for r in cli_runs)
+            stages[name] = _record(secs, _imu_rows(cli / "dwh" / "reps.duckdb"), rss)
+            stages[name]["exit_code"] = cli_runs[-1][2]
+            print(f"{name:>16}: {secs:8.3f} s", flush=True)
+
+    spec_json = {
+        k: v.isoformat() if isinstance(v, datetime) else v
+        for k, v in asdict(spec).items()
+    }
+    return {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "params": {
+            "subjects": subjects,
+            "workers": workers,
+            "repeat": repeat,
+            "spec": spec_json,
+        },
+        "generate_seconds": round(gen_secs, 4),
+        "stages": stages,
+    }
+
+
+def _compare(new: dict, base: dict) -> None:
+    print(f"\n{'stage':>16} {'base s':>9} {'new s':>9} {'speed-up':>9} {'Δ RSS MB':>9}")
+    for name, cur in new["stages"].items():
+        old = base.get("stages", {}).get(name)
+        if old is None:
+            continue
+        ratio = old["seconds"] / cur["seconds"] if cur["seconds"] else float("inf")
+        d_rss = cur["peak_rss_mb"] - old["peak_rss_mb"]
+        print(
+            f"{name:>16} {old['seconds']:9.3f} {cur['seconds']:9.3f}"
+            f" {ratio:8.2f}x {d_rss:+9.1f}"
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--subjects", type=int, default=2)
+    ap.add_argument("--hours", type=float, default=0.25, help="per subject")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, help="write results JSON here")
+    ap.add_argument("--compare", type=Path, help="baseline JSON to compare with")
+    args = ap.parse_args()
+
+    spec = SyntheticSpec(hours=args.hours, seed=args.seed)
+    result = run(spec, args.subjects, args.workers, args.repeat)
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2))
+        print(f"wrote {args.out}")
+    if args.compare:
+        _compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
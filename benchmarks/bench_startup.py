@@ -0,0 +1,68 @@
+"""Start-up cost of the ``reps`` CLI.
+
+    $ python benchmarks/bench_startup.py
+    $ python benchmarks/bench_startup.py --budget-ms 400   # exit 1 if over
+
+Times ``reps --help`` end to end (median of ``--repeat`` fresh interpreters)
+and lists the slowest imports from ``python -X importtime``, so a command
+module that starts importing polars or DuckDB at top level shows up at once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+CMD = [sys.executable, "-m", "reps.cli.main", "--help"]
+
+
+def wall_ms(repeat: int) -> list[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(CMD, check=True, stdout=subprocess.DEVNULL)
+        out.append((time.perf_counter() - t0) * 1e3)
+    return out
+
+
+def slowest_imports(n: int) -> list[tuple[int, str]]:
+    """(cumulative µs, module) of the *n* slowest top-level imports."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *CMD[1:]],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2]
+            if len(name) - len(name.lstrip()) <= 1:  # direct imports only
+                rows.append((int(parts[1]), name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--budget-ms", type=float, help="fail if the median is above")
+    args = ap.parse_args()
+
+    times = wall_ms(args.repeat)
+    median = statistics.median(times)
+    print(f"reps --help: median {median:.0f} ms, min {min(times):.0f} ms")
+    print(f"\n{'cumulative ms':>14}  module")
+    for us, name in slowest_imports(args.top):
+        print(f"{us / 1e3:14.1f}  {name}")
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"\nover budget: {median:.0f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
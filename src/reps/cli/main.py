@@ -1,19 +1,87 @@
+"""The ``reps`` command line.
+
+Only typer (and rich, which typer loads anyway) is imported at module level.
+Each command imports polars, DuckDB and the settings when it runs, so
+``reps --help``, shell completion and every scheduled call start without
+them. ``tests/cli/test_startup.py`` enforces this.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from enum import StrEnum
+from pathlib import Path
+
 import typer
-from ..pipeline.ingest import ingest_subject
-from ..config import settings
-from ..pipeline.validate import run as validate_run
 from rich.console import Console
+from rich.table import Table
 
 app = typer.Typer(help="REPS CLI")
 console = Console()
 
 
+class Session(StrEnum):
+    """Recording sessions; the value names the ``imu_*``/``labels_*`` tables."""
+
+    structured = "structured"
+    unstructured = "unstructured"
+
+
+@contextmanager
+def _profiling(profile: bool, metrics_out: Path | None) -> Iterator[None]:
+    """Record `metrics` spans for the command if either flag is given."""
+    from ..config import settings
+    from ..utils import metrics
+
+    if not (profile or metrics_out):
+        yield
+        return
+    previous, settings.PROFILE = settings.PROFILE, True
+    try:
+        yield
+    finally:
+        settings.PROFILE = previous
+        records = metrics.drain()
+        if metrics_out is not None:
+            metrics.write_jsonl(metrics_out, records)
+        if profile and records:
+            table = Table("stage", "calls", "seconds", "rows", "rows/s", "peak RSS MB")
+            for r in metrics.summary(records).iter_rows(named=True):
+                table.add_row(
+                    r["stage"],
+                    str(r["calls"]),
+                    f"{r['seconds']:.3f}",
+                    f"{r['rows']:,}" if r.get("rows") is not None else "",
+                    (
+                        f"{r['rows_per_s']:,.0f}"
+                        if r.get("rows_per_s") is not None
+                        else ""
+                    ),
+                    (
+                        f"{r['peak_rss_mb']:.0f}"
+                        if r.get("peak_rss_mb") is not None
+                        else ""
+                    ),
+                )
+            console.print(table)
+
+
 @app.command()
 def ingest(
     subject_id: str = typer.Option(
         None, "--subject-id", "-s", help="Single participant ID"
     ),
     all_: bool = typer.Option(False, "--all", help="Ingest every raw subject found"),
+    workers: int = typer.Option(
+        1, "--workers", "-w", min=1, help="Processes preparing subjects in parallel"
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="Re-ingest even if the raw files are unchanged"
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Print per-stage timings"),
+    metrics_out: Path = typer.Option(
+        None, "--metrics-out", help="Append per-stage metrics here as JSON lines"
+    ),
 ):
     if all_ and subject_id:
         typer.echo("Choose --subject-id OR --all, not both.")
@@ -22,16 +90,15 @@ def ingest(
         typer.echo("Provide --subject-id or use --all.")
         raise typer.Exit(1)
 
-    if all_:
-        acc_dir = settings.RAW_ROOT / "acc"
-        ids = [
-            p.name.split("_")[0].split("-")[1]
-            for p in acc_dir.glob("REPS-*_acc.parquet")
-        ]
-        for sid in ids:
-            ingest_subject(sid)
-    else:
-        ingest_subject(subject_id)
+    from ..config import settings
+    from ..pipeline.ingest import discover_subjects, ingest_many, ingest_subject
+
+    with _profiling(profile, metrics_out):
+        if all_:
+            ids = discover_subjects(settings.RAW_ROOT)
+            ingest_many(ids, workers=workers, force=force)
+        else:
+            ingest_subject(subject_id, force=force)
 
 
 # ──────────────────────────────────────────────────────────────
@@ -42,9 +109,24 @@ def ingest(
 
 
 @app.command("validate")
-def validate_data() -> None:
+def validate_data(
+    summary: bool = typer.Option(
+        False, "--summary", help="Counts and top-k offenders instead of row dumps"
+    ),
+    top_k: int = typer.Option(5, "--top-k", min=1, help="Offenders per subject"),
+    full_scan: bool = typer.Option(
+        False, "--full-scan", help="Recompute from imu instead of the imu_stats table"
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Print per-rule timings"),
+    metrics_out: Path = typer.Option(
+        None, "--metrics-out", help="Append per-rule metrics here as JSON lines"
+    ),
+) -> None:
     """Run warehouse‑sanity checks."""
-    errors = validate_run()
+    from ..pipeline.validate import run as validate_run
+
+    with _profiling(profile, metrics_out):
+        errors = validate_run(summary=summary, top_k=top_k, full_scan=full_scan)
     if errors:
         console.print("[red bold]DATA VALIDATION FAILED[/red bold]")
         for err in errors:
@@ -53,6 +135,214 @@ def validate_data() -> None:
     console.print("[green]Warehouse looks clean.[/green]")
 
 
+@app.command("optimize")
+def optimize(
+    indexes: bool = typer.Option(
+        None,
+        "--indexes/--no-indexes",
+        help="Build or drop ART indexes (default: settings.DWH_INDEXES)",
+    ),
+    pyramid: bool = typer.Option(
+        None,
+        "--pyramid/--no-pyramid",
+        help="Rebuild the 1 s / 10 s summary tables (default: settings.DWH_PYRAMID)",
+    ),
+) -> None:
+    """Re-sort the session tables by (id, ts) and settle indexes and summaries."""
+    from ..config import settings
+    from ..io.connection import writer
+    from ..io.warehouse import cluster, create_indexes, drop_indexes, rebuild_pyramid
+    from ..pipeline.ingest import create_schema
+
+    with writer(create_schema) as db:
+        drop_indexes(db)
+        if settings.DWH_PYRAMID if pyramid is None else pyramid:
+            rebuild_pyramid(db)
+        cluster(db)
+        if settings.DWH_INDEXES if indexes is None else indexes:
+            create_indexes(db)
+    console.print("[green]Warehouse clustered.[/green]")
+
+
+@app.command("export-parquet")
+def export_parquet_cmd(
+    out: Path = typer.Option(..., "--out", "-o", help="Export root directory"),
+) -> None:
+    """Export imu/labels as Hive-partitioned Parquet (subject=/session=)."""
+    from ..io.connection import reader
+    from ..io.warehouse import export_parquet
+
+    with reader() as db:
+        for path in export_parquet(db, out):
+            console.print(f"wrote {path}")
+
+
+@app.command("storage-report")
+def storage_report_cmd(
+    table: list[str] = typer.Option(
+        None, "--table", "-t", help="Table(s) to report; default all"
+    ),
+) -> None:
+    """Bytes on disk per table and column, and per sample."""
+    from ..io.connection import reader
+    from ..io.warehouse import storage_report
+
+    with reader() as db:
+        report = storage_report(db, table or None)
+    out = Table("table", "column", "rows", "bytes", "B/sample", "compression")
+    for r in report.iter_rows(named=True):
+        total = r["column"] == "*"
+        out.add_row(
+            r["table"],
+            r["column"],
+            f"{r['rows'] or 0:,}",
+            f"{r['bytes']:,}",
+            f"{r['bytes_per_sample'] or 0:.3f}",
+            r["compression"] or "",
+            end_section=total,
+            style="bold" if total else None,
+        )
+    console.print(out)
+
+
+@app.command("export")
+def export(
+    out: Path = typer.Option(..., "--out", "-o", help="Output .parquet or .csv file"),
+    subject_id: list[str] = typer.Option(
+        None, "--subject-id", "-s", help="Subject(s); default all in the session"
+    ),
+    session: Session = typer.Option(Session.structured, help="Recording session"),
+    exercise: str = typer.Option(
+        None, "--exercise", "-e", help="Exercise name or code; default all samples"
+    ),
+    start: datetime = typer.Option(None, "--start", help="First ts (UTC)"),
+    end: datetime = typer.Option(None, "--end", help="Last ts (UTC)"),
+    resolution: float = typer.Option(
+        None,
+        "--resolution",
+        min=0,
+        help="Seconds; export the coarsest summary level that meets it",
+    ),
+) -> None:
+    """Export aligned, labelled samples of a subject/exercise/time slice."""
+    import polars as pl
+
+    from ..io.query import get_signal, get_summary, shared_summary_level
+    from ..ml.store import warehouse_subjects
+
+    ex = int(exercise) if exercise and exercise.isdigit() else exercise
+    ids = subject_id or warehouse_subjects(session.value)
+    # one level for every subject, or the frames would not concatenate
+    level = None
+    if resolution is not None:
+        level = shared_summary_level(ids, session.value, resolution)
+    frames = [
+        (
+            get_signal(sid, session.value, ex, start, end)
+            if level is None
+            else get_summary(sid, session.value, level, ex, start, end)
+        ).insert_column(0, pl.lit(sid).alias("subject_id"))
+        for sid in ids
+    ]
+    df = pl.concat(frames) if frames else pl.DataFrame()
+    if out.suffix == ".csv":
+        df.write_csv(out)
+    else:
+        df.write_parquet(out)
+    console.print(f"{df.height:,} samples → {out}")
+
+
+@app.command("features")
+def features(
+    session: Session = typer.Option(Session.structured, help="Recording session"),
+    size: int = typer.Option(200, min=1, help="Window length in samples"),
+    step: int = typer.Option(100, min=1, help="Hop between windows in samples"),
+    group: list[str] = typer.Option(
+        None, "--group", "-g", help="Feature group(s); default all"
+    ),
+    workers: int = typer.Option(1, "--workers", "-w", min=1),
+    out: Path = typer.Option(None, "--out", help="Also write the combined table"),
+) -> None:
+    """Extract window features into the feature store."""
+    from ..ml.store import build_features, warehouse_subjects
+
+    df = build_features(
+        warehouse_subjects(session.value),
+        session.value,
+        size,
+        step,
+        group or None,
+        workers,
+    )
+    if out is not None:
+        df.write_parquet(out)
+    console.print(f"{df.height} windows × {df.width} columns")
+
+
+@app.command("export-dataset")
+def export_dataset_cmd(
+    out: Path = typer.Option(..., "--out", "-o", help="Dataset directory"),
+    session: list[Session] = typer.Option(
+        None, "--session", help="Session(s) to export; default both"
+    ),
+    subject_id: list[str] = typer.Option(
+        None, "--subject-id", "-s", help="Subject(s); default all"
+    ),
+    size: int = typer.Option(200, min=1, help="Window length in samples"),
+    step: int = typer.Option(100, min=1, help="Hop between windows in samples"),
+    workers: int = typer.Option(1, "--workers", "-w", min=1),
+) -> None:
+    """Export memory-mapped training shards (see reps.ml.dataset)."""
+    from ..ml.dataset import SESSIONS, export_dataset
+
+    meta = export_dataset(
+        out,
+        size,
+        step,
+        sessions=[s.value for s in session] if session else SESSIONS,
+        subject_ids=subject_id or None,
+        workers=workers,
+    )
+    n = sum(s["n_windows"] for s in meta["shards"])
+    console.print(f"{len(meta['shards'])} shards, {n} windows → {out}")
+
+
+@app.command("stream")
+def stream(
+    subject_id: str = typer.Option(..., "--subject-id", "-s", help="Participant ID"),
+    source: Path = typer.Option(
+        ..., "--source", help="Spool directory with acc/ and gyro/ chunk files"
+    ),
+    session: Session = typer.Option(Session.structured, help="Recording session"),
+    poll: float = typer.Option(1.0, min=0, help="Seconds between directory scans"),
+    batch_rows: int = typer.Option(6_000, min=1, help="Rows per warehouse append"),
+    max_latency: float = typer.Option(
+        5.0, min=0, help="Longest a sample waits before it is appended (s)"
+    ),
+    idle_timeout: float = typer.Option(
+        None, help="Stop after this many seconds without new chunks"
+    ),
+    profile: bool = typer.Option(False, "--profile", help="Print per-stage timings"),
+    metrics_out: Path = typer.Option(
+        None, "--metrics-out", help="Append per-stage metrics here as JSON lines"
+    ),
+) -> None:
+    """Align and append a recording's chunks as they arrive (see reps.pipeline.stream)."""
+    from ..pipeline.stream import stream_ingest
+
+    with _profiling(profile, metrics_out):
+        rows = stream_ingest(
+            source,
+            subject_id,
+            session.value,
+            poll_s=poll,
+            batch_rows=batch_rows,
+            max_latency_s=max_latency,
+            idle_timeout_s=idle_timeout,
+        )
+    console.print(f"{rows:,} rows → imu_{session.value}")
+
+
 def main():
     app()
 
@@ -1,10 +1,53 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     RAW_ROOT: Path = Path("data/raw")
     DWH_PATH: Path = Path("dwh/reps.duckdb")
+    # bronze cache of normalised raw files (parsed ts, renamed float32 axes);
+    # None disables it
+    CACHE_DIR: Path | None = None
+    FEATURE_ROOT: Path = Path("data/features")
+    # build ART indexes on the session tables once after each ingest run;
+    # off by default, the (id, ts) insert order already lets zone maps prune
+    DWH_INDEXES: bool = False
+    # keep 1 s / 10 s summary tables (imu_<session>_<n>s) up to date on ingest
+    DWH_PYRAMID: bool = False
+    # DuckDB threads / memory_limit (e.g. "8GB") for warehouse connections;
+    # None keeps DuckDB's defaults (all cores, 80 % of RAM)
+    DWH_THREADS: int | None = None
+    DWH_MEMORY_LIMIT: str | None = None
+    # working-set budget for preparing one subject (e.g. "2GB"); larger subjects
+    # are aligned in time slices spooled to disk. None keeps them in memory
+    INGEST_MEMORY_LIMIT: str | None = None
+    # record reps.utils.metrics spans (reps … --profile / --metrics-out)
+    PROFILE: bool = False
+    # per-process cache of reps.io.query slices
+    QUERY_CACHE_MB: float = 512
 
 
 settings = Settings()  # import‑time singleton
+
+
+def configure(overrides: dict[str, Any]) -> None:
+    """Copy *overrides* onto `settings`; spawned workers use it to mirror the parent."""
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+
+
+def worker_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers start with this process's `settings`.
+
+    Workers are spawned, not forked: polars is not fork-safe.
+    """
+    import multiprocessing as mp
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=configure,
+        initargs=(settings.model_dump(),),
+    )
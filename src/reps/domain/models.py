@@ -1,7 +1,11 @@
 from __future__ import annotations
+from collections.abc import Mapping
 from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
 from datetime import datetime
+from types import MappingProxyType
+import polars as pl
 import yaml
 
 
@@ -17,6 +21,12 @@ class IMURecord:
     gz: float
 
 
+# ---------- sensor limits ----------
+# gyro saturates at 2000 but float values slightly exceed 2000 so limit set to 2001
+ACC_LIMIT = 8 * 9.80665  # m/s², ±8 g range
+GYRO_LIMIT = 2001  # °/s
+
+
 # ---------- label segment ----------
 @dataclass(slots=True)
 class LabelSegment:
@@ -29,9 +39,38 @@ class LabelSegment:
 _EXERCISE_PATH = Path(__file__).with_suffix(".yaml").parent / "exercise_map.yaml"
 
 
+@cache
+def exercise_map() -> Mapping[int, str]:
+    """Code → name mapping, parsed from YAML once per process.
+
+    Read-only, since every caller shares the cached copy.
+    """
+    with _EXERCISE_PATH.open("r") as fh:
+        mapping: dict[int, str] = yaml.safe_load(fh)
+    return MappingProxyType(dict(sorted(mapping.items())))
+
+
 def exercise_name(code: int | None) -> str | None:
     if code is None:
         return None
-    with _EXERCISE_PATH.open("r") as fh:
-        mapping: dict[int, str] = yaml.safe_load(fh)
-    return mapping.get(code)
+    return exercise_map().get(code)
+
+
+def exercise_enum() -> pl.Enum:
+    """Polars ``Enum`` of exercise names, ordered by code."""
+    return pl.Enum(list(exercise_map().values()))
+
+
+def exercise_name_expr(col: str | pl.Expr = "exercise_id") -> pl.Expr:
+    """Vectorised `exercise_name`: map a code column to `exercise_enum` values.
+
+    Unknown codes and nulls (rest) map to null.
+    """
+    expr = pl.col(col) if isinstance(col, str) else col
+    mapping = exercise_map()
+    return expr.replace_strict(
+        list(mapping),
+        list(mapping.values()),
+        default=None,
+        return_dtype=exercise_enum(),
+    )
@@ -0,0 +1,71 @@
+"""Bronze cache: raw sensor files normalised once, re-read many times.
+
+Entries live under ``settings.CACHE_DIR/<kind>/<stem>.parquet`` next to a JSON
+sidecar holding the source fingerprint and `CACHE_VERSION`; an entry is
+rebuilt when the source's content changes (size/mtime first, hash only when
+those moved) or when it was written under another version.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+
+import polars as pl
+
+from ..config import settings
+from ..utils.fingerprint import FileFingerprint, fingerprint, same_content
+
+# bump whenever the normalisation (columns, dtypes, ts parsing) changes;
+# entries written under another version are rebuilt
+CACHE_VERSION = "1"
+
+
+def _read_meta(path: Path) -> FileFingerprint | None:
+    try:
+        meta = json.loads(path.read_text())
+        if meta.pop("version", None) != CACHE_VERSION:
+            return None
+        return FileFingerprint(**meta)
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def _tmp(path: Path) -> Path:
+    """A temporary sibling of *path* no other process or thread will pick."""
+    return path.with_name(f".{path.name}.{os.getpid()}-{uuid.uuid4().hex}.tmp")
+
+
+def _write_meta(path: Path, fp: FileFingerprint) -> None:
+    tmp = _tmp(path)
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, **asdict(fp)}))
+    os.replace(tmp, path)
+
+
+def cached(src: Path, kind: str, build: Callable[[], pl.LazyFrame]) -> Path:
+    """Path of the normalised copy of *src*, (re)built from *build* if stale."""
+    if settings.CACHE_DIR is None:
+        raise RuntimeError("bronze cache is disabled (settings.CACHE_DIR is unset)")
+    dst = settings.CACHE_DIR / kind / f"{src.stem}.parquet"
+    meta = dst.with_suffix(".json")
+
+    previous = _read_meta(meta) if dst.exists() else None
+    current = fingerprint(src, previous)
+    if previous is not None and same_content(previous, current):
+        if current != previous:  # touched only: remember the new mtime
+            _write_meta(meta, current)
+        return dst
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp(dst)
+    try:
+        build().sink_parquet(tmp)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+    _write_meta(meta, current)
+    return dst
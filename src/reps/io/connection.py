@@ -0,0 +1,108 @@
+"""Shared DuckDB connections to the warehouse at ``settings.DWH_PATH``.
+
+A process opens the warehouse at most once at a time. The first `writer` or
+`reader` opens it, with the ``threads`` / ``memory_limit`` pragmas from
+settings. Nested and concurrent users share that handle, and the last one out
+closes it::
+
+    with writer(create_schema) as db:   # the single read-write connection
+        ...
+        with reader() as cur:           # a private cursor, one per thread
+            ...
+
+Readers on their own open the file read-only, so other processes can read
+at the same time. A writer always gets a read-write handle, so start the
+writer first when both are needed. The handle is not kept open between uses:
+DuckDB locks the file while it is open, and holding it would block other
+processes.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import duckdb
+
+from ..config import settings
+
+Schema = Callable[[duckdb.DuckDBPyConnection], None]
+
+
+@dataclass(slots=True)
+class _Handle:
+    con: duckdb.DuckDBPyConnection
+    path: Path
+    read_only: bool
+    users: int = 0
+    schemas: set[Schema] = field(default_factory=set)  # already applied
+
+
+_LOCK = threading.Lock()
+_HANDLE: _Handle | None = None
+
+
+def config() -> dict[str, Any]:
+    """DuckDB options from settings (unset ones keep DuckDB's defaults)."""
+    opts = {"threads": settings.DWH_THREADS, "memory_limit": settings.DWH_MEMORY_LIMIT}
+    return {k: v for k, v in opts.items() if v is not None}
+
+
+def _acquire(read_only: bool) -> _Handle:
+    global _HANDLE
+    path = settings.DWH_PATH.absolute()
+    with _LOCK:
+        h = _HANDLE
+        if h is not None and (h.path != path or (h.read_only and not read_only)):
+            mode = "read-only" if h.read_only else "read-write"
+            raise RuntimeError(
+                f"{h.path} is already open {mode} in this process; "
+                "open the writer first or close the other connection"
+            )
+        if h is None:
+            if not read_only:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            con = duckdb.connect(path, read_only=read_only, config=config())
+            h = _HANDLE = _Handle(con, path, read_only)
+        h.users += 1
+        return h
+
+
+def _release(h: _Handle) -> None:
+    global _HANDLE
+    with _LOCK:
+        h.users -= 1
+        if h.users == 0:
+            h.con.close()
+            _HANDLE = None
+
+
+@contextmanager
+def writer(schema: Schema | None = None) -> Iterator[duckdb.DuckDBPyConnection]:
+    """The process's read-write connection, with *schema* applied once."""
+    h = _acquire(read_only=False)
+    try:
+        if schema is not None and schema not in h.schemas:
+            schema(h.con)
+            h.schemas.add(schema)
+        yield h.con
+    finally:
+        _release(h)
+
+
+@contextmanager
+def reader() -> Iterator[duckdb.DuckDBPyConnection]:
+    """A cursor of its own on the shared handle; safe to use from one thread."""
+    h = _acquire(read_only=True)
+    try:
+        cur = h.con.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+    finally:
+        _release(h)
@@ -1,53 +1,232 @@
 import polars as pl
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
 from pathlib import Path
-from datetime import datetime  # noqa: F401  (will be useful later)
+from datetime import datetime
+from typing import Callable, Iterator
+from zoneinfo import ZoneInfo
+from ..config import settings
 from ..domain.models import LabelSegment  # IMURecord not used here → remove
+from .cache import cached
 
 # _TS_FMT = "%Y-%m-%d %H:%M:%S%.f"
+_TZ = "US/Eastern"
+
+_ACC_COLS = {"Accelerometer_X": "ax", "Accelerometer_Y": "ay", "Accelerometer_Z": "az"}
+_GYRO_COLS = {"Gyroscope_X": "gx", "Gyroscope_Y": "gy", "Gyroscope_Z": "gz"}
+
+
+def _raw_bound(sample: str, bound: datetime, upper: bool) -> str:
+    """Render *bound* in the raw ``Timestamp`` layout of *sample*.
+
+    Raw timestamps are fixed-width wall-clock strings, so they sort
+    lexicographically and a string bound can prune Parquet row groups.
+    """
+    if bound.tzinfo is not None:
+        bound = bound.astimezone(ZoneInfo(_TZ))
+    text = bound.strftime(f"%Y-%m-%d{sample[10]}%H:%M:%S.%f")
+    # match the sample's width; an upper bound keeps the whole last tick
+    return text.ljust(len(sample), "9" if upper else "0")[: len(sample)]
+
+
+def _parse_ts(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Replace the raw ``Timestamp`` strings with a tz-aware ``ts``."""
+    return lf.with_columns(
+        pl.col("Timestamp")
+        .str.slice(
+            0, 26
+        )  # trim from "2016-02-17T11:25:00.0000000" → "2016-02-17T11:25:00.000000"
+        .str.to_datetime(time_zone=_TZ)
+        .alias("ts")
+    ).drop("Timestamp")
+
+
+def _scan_parquet(
+    path: Path, start: datetime | None = None, end: datetime | None = None
+) -> pl.LazyFrame:
+    """Lazy counterpart of `_read_parquet`, optionally bounded to [start, end].
+
+    The bounds are pushed into the scan on the raw string column (coarse,
+    row-group pruning) and then applied exactly on the parsed ``ts``.
+    """
+    lf = pl.scan_parquet(path)
+    if "Timestamp" not in lf.collect_schema().names():
+        return lf
+
+    if start is not None or end is not None:
+        # head() is pushed into the reader; .first() would decode the column
+        head = lf.select("Timestamp").head(1).collect()
+        first = head.item() if head.height else None
+        if first is not None and len(first) > 10:
+            if start is not None:
+                lf = lf.filter(pl.col("Timestamp") >= _raw_bound(first, start, False))
+            if end is not None:
+                lf = lf.filter(pl.col("Timestamp") <= _raw_bound(first, end, True))
+
+    lf = _parse_ts(lf)
+    if start is not None:
+        lf = lf.filter(pl.col("ts") >= start)
+    if end is not None:
+        lf = lf.filter(pl.col("ts") <= end)
+    return lf
 
 
 def _read_parquet(path: Path) -> pl.DataFrame:
-    df = pl.read_parquet(path)
+    return _scan_parquet(path).collect()
 
-    if "Timestamp" in df.columns:
-        df = df.with_columns(
-            pl.col("Timestamp")
-            .str.slice(
-                0, 26
-            )  # trim from "2016-02-17T11:25:00.0000000" → "2016-02-17T11:25:00.000000"
-            .str.to_datetime(time_zone="US/Eastern")
-            .alias("ts")
-        ).drop("Timestamp")
 
-    return df
+# ── normalised views of the raw files: parsed ts, short float32 axis names ──
 
+_Scan = Callable[[Path, datetime | None, datetime | None], pl.LazyFrame]
 
-def load_acc(path: Path) -> pl.DataFrame:
+
+def _acc_cols(lf: pl.LazyFrame) -> pl.LazyFrame:
     # cols: Accelerometer_X/Y/Z  -> ax/ay/az
-    return (
-        _read_parquet(path)
-        .rename(
-            {"Accelerometer_X": "ax", "Accelerometer_Y": "ay", "Accelerometer_Z": "az"}
-        )
-        .select(["ts", "ax", "ay", "az"])
+    return lf.rename(_ACC_COLS).select("ts", pl.col("ax", "ay", "az").cast(pl.Float32))
+
+
+def _gyro_cols(lf: pl.LazyFrame) -> pl.LazyFrame:
+    # cols: Gyroscope_X/Y/Z  -> gx/gy/gz
+    return lf.rename(_GYRO_COLS).select("ts", pl.col("gx", "gy", "gz").cast(pl.Float32))
+
+
+def _label_cols(lf: pl.LazyFrame) -> pl.LazyFrame:
+    return lf.select(
+        "ts", pl.col("Exercise").cast(pl.Int32, strict=False).alias("exercise_id")
     )
 
 
+def _scan_acc_raw(
+    path: Path, start: datetime | None = None, end: datetime | None = None
+) -> pl.LazyFrame:
+    return _acc_cols(_scan_parquet(path, start, end))
+
+
+def _scan_gyro_raw(
+    path: Path, start: datetime | None = None, end: datetime | None = None
+) -> pl.LazyFrame:
+    return _gyro_cols(_scan_parquet(path, start, end))
+
+
+def _scan_labels_raw(
+    path: Path, start: datetime | None = None, end: datetime | None = None
+) -> pl.LazyFrame:
+    return _label_cols(_scan_parquet(path, start, end))
+
+
+def _scan(
+    path: Path,
+    kind: str,
+    raw: _Scan,
+    start: datetime | None,
+    end: datetime | None,
+    cache: bool = True,
+) -> pl.LazyFrame:
+    """Scan *path* through *raw*, or its bronze-cache copy when enabled.
+
+    Pass ``cache=False`` for files read once, such as stream chunks.
+    """
+    if settings.CACHE_DIR is None or not cache:
+        return raw(path, start, end)
+    lf = pl.scan_parquet(cached(path, kind, lambda: raw(path, None, None)))
+    if start is not None:
+        lf = lf.filter(pl.col("ts") >= start)
+    if end is not None:
+        lf = lf.filter(pl.col("ts") <= end)
+    return lf
+
+
+def _iter(
+    path: Path,
+    kind: str,
+    raw: _Scan,
+    cols: Callable[[pl.LazyFrame], pl.LazyFrame],
+    batch_rows: int,
+) -> Iterator[pl.DataFrame]:
+    """`_scan` in file order, *batch_rows* rows at a time.
+
+    Reads one Parquet row group at a time, so memory is bounded by the row
+    group and the batch rather than the file.
+    """
+    if settings.CACHE_DIR is not None:
+        src = cached(path, kind, lambda: raw(path, None, None))
+        for batch in pq.ParquetFile(src).iter_batches(batch_rows):
+            yield pl.from_arrow(batch)  # type: ignore[misc]
+        return
+    for batch in pq.ParquetFile(path).iter_batches(batch_rows):
+        yield cols(_parse_ts(pl.from_arrow(batch).lazy())).collect()  # type: ignore[union-attr]
+
+
+def iter_acc(path: Path, batch_rows: int) -> Iterator[pl.DataFrame]:
+    return _iter(path, "acc", _scan_acc_raw, _acc_cols, batch_rows)
+
+
+def iter_gyro(path: Path, batch_rows: int) -> Iterator[pl.DataFrame]:
+    return _iter(path, "gyro", _scan_gyro_raw, _gyro_cols, batch_rows)
+
+
+def scan_acc(
+    path: Path,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    *,
+    cache: bool = True,
+) -> pl.LazyFrame:
+    return _scan(path, "acc", _scan_acc_raw, start, end, cache)
+
+
+def scan_gyro(
+    path: Path,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    *,
+    cache: bool = True,
+) -> pl.LazyFrame:
+    return _scan(path, "gyro", _scan_gyro_raw, start, end, cache)
+
+
+def load_acc(path: Path) -> pl.DataFrame:
+    return scan_acc(path).collect()
+
+
 def load_gyro(path: Path) -> pl.DataFrame:
-    # cols: Gyroscope_X/Y/Z  -> gx/gy/gz
-    cols = {"Gyroscope_X": "gx", "Gyroscope_Y": "gy", "Gyroscope_Z": "gz"}
-    return _read_parquet(path).rename(cols).select(["ts", "gx", "gy", "gz"])
+    return scan_gyro(path).collect()
+
+
+# first row of each run of equal (null-aware) exercise ids
+_RUN_START = pl.col("exercise_id").ne_missing(pl.col("exercise_id").shift(1)) | (
+    pl.int_range(pl.len()) == 0
+)
+
+
+def load_label_segments(path: Path, batch_rows: int | None = None) -> pl.DataFrame:
+    """Run-length encode the per-sample label stream into segments.
+
+    Returns ``ts_start, ts_end, exercise_id`` – one row per run of equal
+    (null-aware) ``Exercise`` values; a segment ends where the next begins and
+    the last one at the final label timestamp. With *batch_rows* the stream is
+    read that many rows at a time and only each batch's run starts (plus its
+    last row) are kept, which is all the encoding needs.
+    """
+    # structured/unstructured label files share a stem; keep their caches apart
+    kind = f"labels_{path.parent.name}"
+    labels = _scan(path, kind, _scan_labels_raw, None, None)
+    if batch_rows is not None:
+        parts = [
+            pl.concat([batch.filter(_RUN_START), batch.tail(1)])
+            for batch in _iter(path, kind, _scan_labels_raw, _label_cols, batch_rows)
+        ]
+        labels = pl.concat([labels.clear().collect(), *parts]).lazy()
+    return (
+        labels.with_columns(pl.col("ts").last().alias("_last"))
+        .filter(_RUN_START)
+        .select(
+            pl.col("ts").alias("ts_start"),
+            pl.col("ts").shift(-1).fill_null(pl.col("_last")).alias("ts_end"),
+            "exercise_id",
+        )
+        .collect()
+    )
 
 
 def load_labels(path: Path) -> list[LabelSegment]:
-    df = _read_parquet(path).rename({"Exercise": "exercise_id"})
-    segments: list[LabelSegment] = []
-    last_id = df["exercise_id"][0]
-    start = df["ts"][0]
-    for ts, ex in zip(df["ts"][1:], df["exercise_id"][1:]):
-        if ex != last_id:
-            segments.append(LabelSegment(start, ts, last_id))
-            start, last_id = ts, ex
-    # close final segment
-    segments.append(LabelSegment(start, df["ts"][-1], last_id))
-    return segments
+    return [LabelSegment(*row) for row in load_label_segments(path).iter_rows()]
@@ -0,0 +1,282 @@
+"""Read API over the warehouse: one subject/session slice per call.
+
+`get_signal` returns aligned IMU samples with the ``exercise_id`` and
+``segment_id`` ingest stored on each one (null for rest), optionally
+restricted to one exercise and a time range; given a *resolution* it returns
+the coarsest summary level that meets it instead (`get_summary`, see
+`warehouse.build_pyramid`). `get_segments` returns the label segments. Every
+filter is part of the SQL, so DuckDB prunes row groups by subject and time
+instead of scanning a session table.
+
+Results are kept as Arrow tables in a process-wide LRU cache capped at
+``settings.QUERY_CACHE_MB``. Any write to the warehouse file drops them
+all. Timestamps are naive UTC, as stored. Tz-aware bounds are converted and
+naive ones are taken as UTC.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+import pyarrow as pa  # type: ignore[import-untyped]
+
+from ..config import settings
+from ..domain.models import exercise_map
+from .connection import reader
+from .warehouse import PYRAMID_LEVELS, SESSIONS, pyramid_table
+
+_SIGNAL_SQL = """
+SELECT ts, ax, ay, az, gx, gy, gz, exercise_id, segment_id
+FROM imu_{session}
+WHERE id = $id{where}
+"""
+
+
+# ─────────────────────────── slice cache ───────────────────────────
+
+
+class _SliceCache:
+    """Byte-bounded LRU of Arrow tables, safe to share between threads."""
+
+    def __init__(self) -> None:
+        self._items: OrderedDict[Hashable, pa.Table] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: Hashable) -> pa.Table | None:
+        with self._lock:
+            table = self._items.get(key)
+            if table is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, key: Hashable, table: pa.Table) -> None:
+        limit = settings.QUERY_CACHE_MB * 2**20
+        if table.nbytes > limit:
+            return
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key).nbytes
+            self._items[key] = table
+            self._bytes += table.nbytes
+            while self._bytes > limit:
+                self._bytes -= self._items.popitem(last=False)[1].nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def info(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_CACHE = _SliceCache()
+
+
+def cache_info() -> dict[str, int]:
+    """Entries, bytes held, hits and misses of the slice cache."""
+    return _CACHE.info()
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+def _version(db_path: Path) -> tuple[int, ...]:
+    """Changes whenever anything writes *db_path* (or its WAL)."""
+    out: list[int] = []
+    for path in (db_path, db_path.with_name(db_path.name + ".wal")):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        out += [st.st_mtime_ns, st.st_size]
+    return tuple(out)
+
+
+def _cached(key: tuple[Any, ...], sql: str, params: dict[str, Any]) -> pl.DataFrame:
+    db_path = settings.DWH_PATH.resolve()
+    key = (db_path, _version(db_path), *key)
+    table = _CACHE.get(key)
+    if table is None:
+        with reader() as con:
+            table = con.execute(sql, params).arrow()
+        _CACHE.put(key, table)
+    # a fresh frame per call: polars frames must not be shared across threads
+    return pl.DataFrame(table)
+
+
+# ─────────────────────────── queries ───────────────────────────
+
+
+def _session(session: str) -> str:
+    if session not in SESSIONS:
+        raise ValueError(f"unknown session {session!r}; expected one of {SESSIONS}")
+    return session
+
+
+def _utc(ts: datetime | None) -> datetime | None:
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(UTC).replace(tzinfo=None)
+
+
+def exercise_code(exercise: int | str) -> int:
+    """Exercise code for a code or (case-insensitive) exercise name."""
+    mapping = exercise_map()
+    if isinstance(exercise, int):
+        if exercise not in mapping:
+            raise ValueError(f"unknown exercise code {exercise}")
+        return exercise
+    codes = {name.lower(): code for code, name in mapping.items()}
+    try:
+        return codes[exercise.lower()]
+    except KeyError:
+        raise ValueError(f"unknown exercise {exercise!r}") from None
+
+
+def get_segments(subject: str, session: str = "structured") -> pl.DataFrame:
+    """Label segments ``ts_start, ts_end, exercise_id`` of one subject/session."""
+    sql = (
+        f"SELECT ts_start, ts_end, exercise_id FROM labels_{_session(session)}"
+        " WHERE id = $id ORDER BY ts_start"
+    )
+    return _cached(("segments", subject, session), sql, {"id": subject})
+
+
+def _levels(subject: str, session: str) -> list[int]:
+    """Summary levels (seconds) that hold rows for *subject*, finest first."""
+    names = {pyramid_table(_session(session), n): n for n in PYRAMID_LEVELS}
+    tables = _cached(("tables",), "SELECT table_name FROM duckdb_tables()", {})
+    present = [t for t in names if t in tables["table_name"]]
+    if not present:
+        return []
+    sql = " UNION ALL ".join(
+        f"SELECT {names[t]} AS level FROM (SELECT 1 FROM {t} WHERE id = $id LIMIT 1)"
+        for t in present
+    )
+    levels = _cached(("levels", subject, session), sql, {"id": subject})
+    return sorted(levels["level"])
+
+
+def summary_level(
+    subject: str, session: str, resolution: float | timedelta
+) -> int | None:
+    """Coarsest summary level no wider than *resolution* (seconds), or None
+    when only the raw samples are fine enough."""
+    if isinstance(resolution, timedelta):
+        resolution = resolution.total_seconds()
+    fits = [n for n in _levels(subject, session) if n <= resolution]
+    return fits[-1] if fits else None
+
+
+def shared_summary_level(
+    subjects: Iterable[str], session: str, resolution: float | timedelta
+) -> int | None:
+    """`summary_level` that every one of *subjects* has, so their slices share
+    one schema; None when any of them has only raw samples fine enough."""
+    if isinstance(resolution, timedelta):
+        resolution = resolution.total_seconds()
+    common: set[int] | None = None
+    for subject in subjects:
+        fits = {n for n in _levels(subject, session) if n <= resolution}
+        common = fits if common is None else common & fits
+        if not common:
+            return None
+    return max(common) if common else None
+
+
+def get_summary(
+    subject: str,
+    session: str,
+    seconds: int,
+    exercise: int | str | None = None,
+    t0: datetime | None = None,
+    t1: datetime | None = None,
+) -> pl.DataFrame:
+    """Buckets ``ts, n, <axis>_{min,max,mean,std} …, exercise_id, purity`` of
+    one summary level, sorted by bucket start.
+
+    *exercise* keeps the buckets it dominates; *t0* / *t1* bound the bucket
+    start inclusively.
+    """
+    if seconds not in PYRAMID_LEVELS:
+        raise ValueError(f"no {seconds} s summary level; have {PYRAMID_LEVELS}")
+    t0, t1 = _utc(t0), _utc(t1)
+    code = None if exercise is None else exercise_code(exercise)
+    sql = f"SELECT * EXCLUDE (id) FROM {pyramid_table(_session(session), seconds)}"
+    sql += " WHERE id = $id"
+    params: dict[str, Any] = {"id": subject}
+    for cond, name, value in (
+        ("exercise_id = $code", "code", code),
+        ("ts >= $t0", "t0", t0),
+        ("ts <= $t1", "t1", t1),
+    ):
+        if value is not None:
+            sql += f" AND {cond}"
+            params[name] = value
+    key = ("summary", subject, session, seconds, code, t0, t1)
+    return _cached(key, sql + " ORDER BY ts", params)
+
+
+def get_signal(
+    subject: str,
+    session: str = "structured",
+    exercise: int | str | None = None,
+    t0: datetime | None = None,
+    t1: datetime | None = None,
+    resolution: float | timedelta | None = None,
+) -> pl.DataFrame:
+    """Samples ``ts, ax … gz, exercise_id, segment_id`` of *subject*, by ts.
+
+    *exercise* (code or name) keeps only samples inside that exercise's
+    segments; *t0* / *t1* bound ``ts`` inclusively. With *resolution*
+    (seconds), the coarsest summary level no wider than it is returned
+    instead when the subject has one (`get_summary`).
+    """
+    if resolution is not None:
+        level = summary_level(subject, session, resolution)
+        if level is not None:
+            return get_summary(subject, session, level, exercise, t0, t1)
+    t0, t1 = _utc(t0), _utc(t1)
+    code = None if exercise is None else exercise_code(exercise)
+    where = ""
+    params: dict[str, Any] = {"id": subject}
+    if code is not None:
+        # narrow the scan to the exercise's span so zone maps can skip the rest
+        segs = get_segments(subject, session).filter(pl.col("exercise_id") == code)
+        if segs.is_empty():
+            where += " AND false"
+        else:
+            lo, hi = segs.select(pl.min("ts_start"), pl.max("ts_end")).row(0)
+            t0 = lo if t0 is None else max(t0, lo)
+            t1 = hi if t1 is None else min(t1, hi)
+        where += " AND exercise_id = $code"
+        params["code"] = code
+    if t0 is not None:
+        where += " AND ts >= $t0"
+        params["t0"] = t0
+    if t1 is not None:
+        where += " AND ts <= $t1"
+        params["t1"] = t1
+    sql = _SIGNAL_SQL.format(session=_session(session), where=where)
+    key = ("signal", subject, session, code, t0, t1)
+    return _cached(key, sql + " ORDER BY ts", params)
@@ -0,0 +1,291 @@
+"""Physical layout of the DuckDB warehouse.
+
+Session tables carry no ART indexes while they are written: rows go in
+sorted by ``(id, ts)`` so DuckDB's per-row-group min/max zone maps prune
+subject and time-range scans on their own. Indexes, when wanted at all
+(``settings.DWH_INDEXES``), are built once after a bulk load. `cluster`
+re-sorts tables whose order has decayed through re-ingests,
+`export_parquet` publishes a Hive-partitioned copy for external tools and
+`storage_report` shows what each column costs on disk. With
+``settings.DWH_PYRAMID`` ingest also keeps per-second and per-10-second
+summaries of every session (`build_pyramid`) for overviews of long recordings.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+SESSIONS = ("structured", "unstructured")
+PYRAMID_LEVELS = (1, 10)  # summary bucket widths, seconds
+
+
+def pyramid_table(session: str, seconds: int) -> str:
+    return f"imu_{session}_{seconds}s"
+
+
+# table -> clustering key; ingest appends one subject at a time in this order
+CLUSTER_KEYS = {
+    **{f"imu_{s}": ("id", "ts") for s in SESSIONS},
+    **{f"labels_{s}": ("id", "ts_start") for s in SESSIONS},
+    **{pyramid_table(s, n): ("id", "ts") for s in SESSIONS for n in PYRAMID_LEVELS},
+}
+
+INDEXES = {
+    f"idx_{table}_{col}": (table, col)
+    for table, (_, key) in CLUSTER_KEYS.items()
+    for col in ("id", key)
+}
+
+
+# ─────────────────────────── indexes ───────────────────────────
+
+
+def drop_indexes(db: duckdb.DuckDBPyConnection) -> None:
+    """Drop the session-table indexes (also the ones older ingests created)."""
+    for name in INDEXES:
+        db.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def create_indexes(db: duckdb.DuckDBPyConnection) -> None:
+    """Build every session-table index in one pass over the loaded data."""
+    for name, (table, col) in INDEXES.items():
+        db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({col})")
+
+
+# ─────────────────────────── clustering ───────────────────────────
+
+
+def cluster(db: duckdb.DuckDBPyConnection, tables: list[str] | None = None) -> None:
+    """Rewrite *tables* (default: all session tables) sorted by their key.
+
+    Re-ingesting a subject deletes its rows and appends new ones at the end,
+    so over time a subject's rows spread across row groups; this restores
+    one contiguous run per subject. Column types and constraints are kept.
+    """
+    for table in tables or list(CLUSTER_KEYS):
+        order = ", ".join(CLUSTER_KEYS[table])
+        db.begin()
+        try:
+            db.execute(
+                f"CREATE TEMP TABLE _cluster AS SELECT * FROM {table} ORDER BY {order}"
+            )
+            db.execute(f"DELETE FROM {table}")
+            db.execute(f"INSERT INTO {table} SELECT * FROM _cluster")
+            db.execute("DROP TABLE _cluster")
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+    db.execute("CHECKPOINT")  # reclaim the deleted row groups
+
+
+# ─────────────────────────── summary pyramid ───────────────────────────
+
+_AXES = ("ax", "ay", "az", "gx", "gy", "gz")
+_STATS = {"min": "min", "max": "max", "mean": "avg", "std": "stddev_pop"}
+
+_PYRAMID_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id VARCHAR NOT NULL USING COMPRESSION dictionary,
+    ts TIMESTAMP NOT NULL,  -- bucket start
+    n INTEGER NOT NULL,
+    {axes},
+    exercise_id INTEGER,  -- most frequent per-sample label, NULL for rest
+    purity REAL  -- share of the bucket's samples with that label
+)
+"""
+
+_PYRAMID_SQL = """
+INSERT INTO {table}
+WITH s AS (
+    SELECT time_bucket(INTERVAL {seconds} SECOND, ts) AS ts, {axes},
+        coalesce(exercise_id, -1) AS label
+    FROM imu_{session}
+    WHERE id = $id
+),
+agg AS (SELECT ts, count(*) AS n, {aggs} FROM s GROUP BY ts),
+lab AS (SELECT ts, label, count(*) AS c FROM s GROUP BY ts, label),
+dom AS (SELECT ts, arg_max(label, c) AS label, max(c) AS c FROM lab GROUP BY ts)
+SELECT $id, agg.*, nullif(dom.label, -1), dom.c / agg.n
+FROM agg JOIN dom USING (ts)
+ORDER BY ts
+"""
+
+
+def create_pyramid_tables(db: duckdb.DuckDBPyConnection) -> None:
+    axes = ", ".join(f"{a}_{stat} REAL" for a in _AXES for stat in _STATS)
+    for session in SESSIONS:
+        for seconds in PYRAMID_LEVELS:
+            table = pyramid_table(session, seconds)
+            db.execute(_PYRAMID_DDL.format(table=table, axes=axes))
+
+
+def build_pyramid(db: duckdb.DuckDBPyConnection, session: str, subject_id: str) -> int:
+    """(Re)compute every summary level of one subject/session from its rows.
+
+    Each bucket holds min/max/mean/std per axis, the dominant label and its
+    purity. Runs inside the caller's transaction; returns the rows written.
+    """
+    aggs = ", ".join(
+        f"{f}({a}) AS {a}_{stat}" for a in _AXES for stat, f in _STATS.items()
+    )
+    rows = 0
+    for seconds in PYRAMID_LEVELS:
+        table = pyramid_table(session, seconds)
+        db.execute(f"DELETE FROM {table} WHERE id = ?", [subject_id])
+        sql = _PYRAMID_SQL.format(
+            table=table,
+            seconds=seconds,
+            session=session,
+            axes=", ".join(_AXES),
+            aggs=aggs,
+        )
+        rows += db.execute(sql, {"id": subject_id}).fetchone()[0]  # type: ignore[index]
+    return rows
+
+
+def rebuild_pyramid(db: duckdb.DuckDBPyConnection) -> int:
+    """`build_pyramid` for every subject and session, one transaction each."""
+    rows = 0
+    for session in SESSIONS:
+        ids = db.execute(f"SELECT DISTINCT id FROM imu_{session} ORDER BY id")
+        for (sid,) in ids.fetchall():
+            db.begin()
+            try:
+                rows += build_pyramid(db, session, sid)
+                db.commit()
+            except BaseException:
+                db.rollback()
+                raise
+    return rows
+
+
+# ─────────────────────────── Parquet export ───────────────────────────
+
+
+def _union(kind: str, cols: str, order: str) -> str:
+    return (
+        " UNION ALL ".join(
+            f"SELECT id AS subject, '{s}' AS session, {cols} FROM {kind}_{s}"
+            for s in SESSIONS
+        )
+        + f" ORDER BY subject, session, {order}"
+    )
+
+
+_EXPORTS = {
+    "imu": _union("imu", "ts, ax, ay, az, gx, gy, gz", "ts"),
+    "labels": _union("labels", "ts_start, ts_end, exercise_id", "ts_start"),
+}
+
+
+def export_parquet(db: duckdb.DuckDBPyConnection, root: Path) -> list[Path]:
+    """Write ``root/{imu,labels}/subject=<id>/session=<s>/*.parquet``.
+
+    Each dataset is written next to its target and swapped in afterwards, so
+    a failed export leaves the previous one intact. Returns the dataset
+    directories.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    out = []
+    for name, sql in _EXPORTS.items():
+        target, tmp = root / name, root / f".{name}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        db.execute(
+            f"COPY ({sql}) TO '{tmp.as_posix()}' "
+            "(FORMAT parquet, COMPRESSION zstd, PARTITION_BY (subject, session))"
+        )
+        shutil.rmtree(target, ignore_errors=True)
+        tmp.rename(target)
+        out.append(target)
+    return out
+
+
+def scan_export(root: Path, name: str = "imu") -> pl.LazyFrame:
+    """Lazy scan of an `export_parquet` dataset with partition pruning.
+
+    Partition keys are read as strings, so subject ``"001"`` stays ``"001"``.
+    """
+    return pl.scan_parquet(
+        root / name / "**" / "*.parquet",
+        hive_partitioning=True,
+        hive_schema={"subject": pl.String, "session": pl.String},
+    )
+
+
+# ─────────────────────────── storage report ───────────────────────────
+
+# Segments of several columns share a block; each persistent segment is
+# charged up to the next segment's offset in its block (or the block end), so
+# the figures are a slight upper bound. Constant segments take no block.
+_STORAGE_SQL = """
+WITH seg AS (
+    {segments}
+),
+sized AS (
+    SELECT *,
+        CASE WHEN block_id < 0 THEN 0 ELSE
+            coalesce(
+                lead(block_offset) OVER (PARTITION BY block_id ORDER BY block_offset),
+                {block_size}
+            ) - block_offset
+        END AS bytes
+    FROM seg
+)
+SELECT
+    table_name AS "table",
+    column_name AS "column",
+    (sum(count) FILTER (WHERE segment_type <> 'VALIDITY'))::BIGINT AS rows,
+    sum(bytes)::BIGINT AS bytes,
+    string_agg(DISTINCT compression, ', ' ORDER BY compression)
+        FILTER (WHERE segment_type <> 'VALIDITY') AS compression
+FROM sized
+GROUP BY ALL
+"""
+
+
+def storage_report(
+    db: duckdb.DuckDBPyConnection, tables: list[str] | None = None
+) -> pl.DataFrame:
+    """Approximate on-disk bytes per table and column, and per sample (row).
+
+    Only checkpointed data is counted; every writer checkpoints on close.
+    A ``*`` row per table holds its total.
+    """
+    if tables is None:
+        rows = db.execute(
+            "SELECT table_name FROM duckdb_tables() WHERE NOT temporary ORDER BY 1"
+        ).fetchall()
+        tables = [r[0] for r in rows]
+    if not tables:
+        return pl.DataFrame(
+            schema={
+                "table": pl.String,
+                "column": pl.String,
+                "rows": pl.Int64,
+                "bytes": pl.Int64,
+                "compression": pl.String,
+                "bytes_per_sample": pl.Float64,
+            }
+        )
+    segments = " UNION ALL ".join(
+        f"SELECT '{t}' AS table_name, * FROM pragma_storage_info('{t}')" for t in tables
+    )
+    block_size = db.execute("SELECT block_size FROM pragma_database_size()").fetchone()
+    sql = _STORAGE_SQL.format(segments=segments, block_size=block_size[0])  # type: ignore[index]
+    cols = db.execute(sql).pl()
+    totals = cols.group_by("table").agg(
+        pl.lit("*").alias("column"),
+        pl.col("rows").max(),
+        pl.col("bytes").sum(),
+        pl.lit(None, pl.String).alias("compression"),
+    )
+    return (
+        pl.concat([cols, totals])
+        .with_columns(bytes_per_sample=pl.col("bytes") / pl.col("rows"))
+        .sort("table", pl.col("column") == "*", "column")
+    )
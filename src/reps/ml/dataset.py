@@ -0,0 +1,215 @@
+"""Memory-mapped training dataset: export from the warehouse, batch from disk.
+
+`export_dataset` writes one shard per (session, subject)::
+
+    <root>/meta.json                       window geometry + shard list
+    <root>/<session>/<subject>.f32         (n_samples, n_channels) float32, C order
+    <root>/<session>/<subject>.idx.npy     per-window offset/label/purity/start_ts
+
+`MemmapDataset` maps the shards read-only and gathers shuffled mini-batches
+with one fancy-index per shard, so opening a cohort costs a few ``mmap`` calls
+and an epoch never decodes Parquet or touches DuckDB. Leave-one-subject-out is
+just a different shard selection (see `loso`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..config import worker_pool
+from ..io.connection import reader
+from ..processing.window import CHANNELS, sliding_windows
+from .store import load_session, warehouse_subjects
+
+SESSIONS = ("structured", "unstructured")
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", np.int64),  # first sample row of the window in the shard
+        ("label", np.int32),
+        ("purity", np.float32),
+        ("start_ts", "datetime64[us]"),
+    ]
+)
+
+
+# ─────────────────────────── export ───────────────────────────
+
+
+def _export_shard(
+    subject_id: str, session: str, root: Path, size: int, step: int
+) -> dict[str, Any]:
+    with reader() as con:
+        imu, _ = load_session(con, subject_id, session)
+    windows = sliding_windows(imu, size, step, label_col="exercise_id")
+    buf = np.ascontiguousarray(imu.select(CHANNELS).to_numpy(), dtype=np.float32)
+
+    index = np.empty(len(windows), dtype=INDEX_DTYPE)
+    index["offset"] = np.arange(len(windows), dtype=np.int64) * step
+    index["label"] = windows.labels
+    index["purity"] = windows.purity
+    index["start_ts"] = windows.start_ts
+
+    out = root / session
+    out.mkdir(parents=True, exist_ok=True)
+    data_path, index_path = out / f"{subject_id}.f32", out / f"{subject_id}.idx.npy"
+    tmp = out / f"{subject_id}.tmp"
+    buf.tofile(tmp)
+    os.replace(tmp, data_path)
+    with open(tmp, "wb") as fh:
+        np.save(fh, index)
+    os.replace(tmp, index_path)
+    return {
+        "subject_id": subject_id,
+        "session": session,
+        "data": data_path.relative_to(root).as_posix(),
+        "index": index_path.relative_to(root).as_posix(),
+        "n_samples": int(buf.shape[0]),
+        "n_windows": len(windows),
+    }
+
+
+def export_dataset(
+    root: Path,
+    size: int,
+    step: int,
+    *,
+    sessions: Sequence[str] = SESSIONS,
+    subject_ids: Iterable[str] | None = None,
+    workers: int = 1,
+) -> dict[str, Any]:
+    """Write memmap shards for *sessions* × subjects under *root*.
+
+    Subjects default to everyone in the warehouse. ``meta.json`` is written
+    last, so a reader never sees a half-exported dataset.
+    """
+    wanted = None if subject_ids is None else set(subject_ids)
+    jobs = [
+        (sid, session)
+        for session in sessions
+        for sid in warehouse_subjects(session)
+        if wanted is None or sid in wanted
+    ]
+    args = [[j[0] for j in jobs], [j[1] for j in jobs]]
+    rest = [[a] * len(jobs) for a in (root, size, step)]
+    if workers <= 1:
+        shards = list(map(_export_shard, *args, *rest))
+    else:
+        with worker_pool(workers) as pool:
+            shards = list(pool.map(_export_shard, *args, *rest))
+
+    meta = {
+        "size": size,
+        "step": step,
+        "channels": list(CHANNELS),
+        "dtype": "float32",
+        "shards": shards,
+    }
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / "meta.json.tmp"
+    tmp.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp, root / "meta.json")
+    return meta
+
+
+# ─────────────────────────── loader ───────────────────────────
+
+
+class MemmapDataset:
+    """Windows of selected shards, batched straight from the memmaps.
+
+    *subjects* keeps only those subjects, *exclude* drops some (LOSO), and
+    *min_purity* drops windows whose majority label covers too few samples.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        sessions: Sequence[str] | None = None,
+        subjects: Iterable[str] | None = None,
+        exclude: Iterable[str] = (),
+        min_purity: float = 0.0,
+    ) -> None:
+        self.root = Path(root)
+        meta = json.loads((self.root / "meta.json").read_text())
+        self.size: int = meta["size"]
+        self.step: int = meta["step"]
+        self.channels: tuple[str, ...] = tuple(meta["channels"])
+
+        keep = None if subjects is None else set(subjects)
+        drop = set(exclude)
+        self.shards = [
+            s
+            for s in meta["shards"]
+            if (sessions is None or s["session"] in sessions)
+            and (keep is None or s["subject_id"] in keep)
+            and s["subject_id"] not in drop
+            and s["n_windows"] > 0
+        ]
+        self._data = [
+            np.memmap(
+                self.root / s["data"],
+                dtype=np.float32,
+                mode="r",
+                shape=(s["n_samples"], len(self.channels)),
+            )
+            for s in self.shards
+        ]
+        shard_ids, offsets, labels = [], [], []
+        for i, s in enumerate(self.shards):
+            index = np.load(self.root / s["index"], mmap_mode="r")
+            ok = index["purity"] >= min_purity
+            offsets.append(index["offset"][ok])
+            labels.append(index["label"][ok])
+            shard_ids.append(np.full(int(ok.sum()), i, dtype=np.int32))
+        self._shard = np.concatenate(shard_ids) if shard_ids else np.empty(0, np.int32)
+        self._offset = np.concatenate(offsets) if offsets else np.empty(0, np.int64)
+        self.labels = np.concatenate(labels) if labels else np.empty(0, np.int32)
+        self._steps = np.arange(self.size)
+
+    def __len__(self) -> int:
+        return self._shard.shape[0]
+
+    @property
+    def subjects(self) -> list[str]:
+        return sorted({s["subject_id"] for s in self.shards})
+
+    def take(self, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """``(x, y)`` for window positions *idx*: ``(n, size, channels)``, ``(n,)``."""
+        x = np.empty((len(idx), self.size, len(self.channels)), dtype=np.float32)
+        shard = self._shard[idx]
+        for s in np.unique(shard):
+            rows = np.flatnonzero(shard == s)
+            x[rows] = self._data[s][self._offset[idx[rows]][:, None] + self._steps]
+        return x, self.labels[idx]
+
+    def batches(
+        self,
+        batch_size: int = 256,
+        *,
+        shuffle: bool = True,
+        seed: int | None = None,
+        drop_last: bool = False,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """One epoch of ``(x, y)`` mini-batches."""
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        stop = len(order) - (len(order) % batch_size if drop_last else 0)
+        for lo in range(0, stop, batch_size):
+            yield self.take(order[lo : lo + batch_size])
+
+
+def loso(
+    root: Path, held_out: str, **kwargs: Any
+) -> tuple[MemmapDataset, MemmapDataset]:
+    """``(train, test)`` split that leaves subject *held_out* out."""
+    train = MemmapDataset(root, exclude=[held_out], **kwargs)
+    test = MemmapDataset(root, subjects=[held_out], **kwargs)
+    return train, test
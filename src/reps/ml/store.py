@@ -0,0 +1,176 @@
+"""Versioned on-disk feature store.
+
+One Parquet file per (feature group, group version, window size/step,
+session, subject, warehouse data key)::
+
+    FEATURE_ROOT/<group>/v<version>/size=<size>_step=<step>/<session>/<subject>-<key>.parquet
+
+The data key is derived from the subject's `ingest_manifest` rows and the
+extent of its warehouse rows, so a re-ingested or stream-appended subject gets
+fresh features while everything else is reused, and bumping one group's
+version only recomputes that group.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from ..config import settings, worker_pool
+from ..io.connection import reader
+from ..processing.window import CHANNELS, Windows, sliding_windows
+from .features import GROUPS, extract
+
+
+def _data_key(con: duckdb.DuckDBPyConnection, subject_id: str, session: str) -> str:
+    # `reps stream` appends without a manifest entry, so the row counts and
+    # time extent of the session tables are part of the key too
+    rows = con.execute(
+        """
+        SELECT kind, sha256, ingest_version FROM ingest_manifest
+        WHERE subject_id = ? ORDER BY kind
+        """,
+        [subject_id],
+    ).fetchall()
+    rows += con.execute(
+        f"""
+        SELECT count(*), min(ts), max(ts) FROM imu_{session} WHERE id = $id
+        UNION ALL
+        SELECT count(*), min(ts_start), max(ts_end) FROM labels_{session}
+        WHERE id = $id
+        """,
+        {"id": subject_id},
+    ).fetchall()
+    return hashlib.sha256(repr(rows).encode()).hexdigest()[:12]
+
+
+_INDEX = "_index"  # per-window subject/session/start_ts/label/purity
+
+
+def feature_path(
+    group: str, size: int, step: int, session: str, subject_id: str, key: str
+) -> Path:
+    version = "" if group == _INDEX else f"v{GROUPS[group].version}"
+    return (
+        settings.FEATURE_ROOT
+        / group
+        / version
+        / f"size={size}_step={step}"
+        / session
+        / f"{subject_id}-{key}.parquet"
+    )
+
+
+def _index(subject_id: str, session: str, windows: Windows) -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "subject_id": [subject_id] * len(windows),
+            "session": [session] * len(windows),
+            "start_ts": windows.start_ts,
+            "label": windows.labels,
+            "purity": windows.purity,
+        }
+    )
+
+
+def _write(df: pl.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.write_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def load_session(
+    con: duckdb.DuckDBPyConnection, subject_id: str, session: str
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Aligned IMU (sorted by ``ts``, with its per-sample ``exercise_id``) and
+    label segments of one subject/session."""
+    cols = ", ".join([*CHANNELS, "exercise_id"])
+    imu = con.execute(
+        f"SELECT ts, {cols} FROM imu_{session} WHERE id = ? ORDER BY ts", [subject_id]
+    ).pl()
+    segs = con.execute(
+        f"SELECT ts_start, ts_end, exercise_id FROM labels_{session} WHERE id = ?",
+        [subject_id],
+    ).pl()
+    return imu, segs
+
+
+def load_windows(
+    con: duckdb.DuckDBPyConnection,
+    subject_id: str,
+    session: str,
+    size: int,
+    step: int,
+) -> Windows:
+    """Windows of one subject/session straight from the warehouse."""
+    imu, _ = load_session(con, subject_id, session)
+    return sliding_windows(imu, size, step, label_col="exercise_id")
+
+
+def subject_features(
+    subject_id: str,
+    session: str,
+    size: int,
+    step: int,
+    groups: Sequence[str] | None = None,
+) -> pl.DataFrame:
+    """Feature table for one subject/session, computing only missing groups.
+
+    Each row is a window: ``subject_id, session, start_ts, label, purity``
+    followed by the requested groups' columns.
+    """
+    groups = list(groups or GROUPS)
+    with reader() as con:
+        key = _data_key(con, subject_id, session)
+        windows: Windows | None = None
+        frames: list[pl.DataFrame] = []
+        for group in [_INDEX, *groups]:
+            path = feature_path(group, size, step, session, subject_id, key)
+            if path.exists():
+                frames.append(pl.read_parquet(path))
+                continue
+            if windows is None:
+                windows = load_windows(con, subject_id, session, size, step)
+            if group == _INDEX:
+                df = _index(subject_id, session, windows)
+            else:
+                df = extract(windows, group, CHANNELS)
+            _write(df, path)
+            frames.append(df)
+    return pl.concat(frames, how="horizontal")
+
+
+def warehouse_subjects(session: str) -> list[str]:
+    with reader() as con:
+        rows = con.execute(f"SELECT DISTINCT id FROM imu_{session} ORDER BY id")
+        return [r[0] for r in rows.fetchall()]
+
+
+def build_features(
+    subject_ids: Iterable[str],
+    session: str,
+    size: int,
+    step: int,
+    groups: Sequence[str] | None = None,
+    workers: int = 1,
+) -> pl.DataFrame:
+    """`subject_features` for many subjects, one process per subject."""
+    ids = list(subject_ids)
+    if workers <= 1:
+        frames = [subject_features(s, session, size, step, groups) for s in ids]
+    else:
+        with worker_pool(workers) as pool:
+            frames = list(
+                pool.map(
+                    subject_features,
+                    ids,
+                    *[[a] * len(ids) for a in (session, size, step, groups)],
+                )
+            )
+    return pl.concat(frames) if frames else pl.DataFrame()
@@ -1,115 +1,729 @@
 from __future__ import annotations
-from dataclasses import asdict
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
+import re
+import shutil
+import tempfile
+from typing import Iterable
 import duckdb
 import polars as pl
-from ..config import settings
-from ..io.parquet import load_acc, load_gyro, load_labels
-from ..processing.resample import align_acc_gyro
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+from ..config import settings, worker_pool
+from ..domain.models import ACC_LIMIT, GYRO_LIMIT, exercise_map
+from ..io import connection
+from ..io.parquet import (
+    iter_acc,
+    iter_gyro,
+    load_label_segments,
+    scan_acc,
+    scan_gyro,
+)
+from ..io.warehouse import (
+    CLUSTER_KEYS,
+    PYRAMID_LEVELS,
+    build_pyramid,
+    create_indexes,
+    create_pyramid_tables,
+    drop_indexes,
+    pyramid_table,
+)
+from ..processing.resample import StreamAligner, align_acc_gyro_lazy
+from ..utils import metrics
+from .manifest import (
+    MANIFEST_DDL,
+    Manifest,
+    current_manifest,
+    load_manifest,
+    record_manifest,
+    unchanged,
+)
+
+# bump whenever prepare_subject's output changes; forces a full re-ingest
+INGEST_VERSION = "5"
 
 _STRUCTURED = "structured"
 _UNSTRUCTURED = "unstructured"
 
+# raw samples read either side of a label window so interpolation and
+# forward-fill at the clip edges see the same neighbours as a full-file align;
+# raw streams share a 10 ms grid, so the window's timeline lines up with it
+_PAD = timedelta(seconds=10)
+_EVERY = timedelta(milliseconds=10)  # the aligned grid
+
+# peak working set of the in-memory path per aligned sample (raw, aligned and
+# labelled frames; ~170 B measured on synthetic recordings); sizes both the
+# `INGEST_MEMORY_LIMIT` check and the slices of the out-of-core path
+_BYTES_PER_SAMPLE = 200
+_SIZE_UNITS = {"B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12}
+_SIZE_UNITS |= {"KIB": 2**10, "MIB": 2**20, "GIB": 2**30, "TIB": 2**40}
+
+# id and ts compression is pinned: rows are clustered by (id, ts), so a
+# dictionary id and delta-bitpacked 10 ms timestamps cost well under a byte per
+# sample. The axes are left to DuckDB's analyzer, which picks ALP for sensor
+# values and ALPRD for full-precision floats (forcing ALP on those stores them
+# uncompressed). `reps storage-report` shows the result per column.
+#
+# Every sample carries the label segment it falls in (`sample_labels` rules,
+# NULL outside all segments) so labelled reads are plain column scans; both
+# columns are runs of equal values and compress to almost nothing. The ALTERs
+# upgrade warehouses created before they existed; the INGEST_VERSION bump
+# then refills every subject.
 _DDL = """
 CREATE TABLE IF NOT EXISTS {tbl} (
-    id VARCHAR NOT NULL,
-    ts TIMESTAMP NOT NULL,
+    id VARCHAR NOT NULL USING COMPRESSION dictionary,
+    ts TIMESTAMP NOT NULL USING COMPRESSION bitpacking,
     ax REAL, ay REAL, az REAL,
-    gx REAL, gy REAL, gz REAL
+    gx REAL, gy REAL, gz REAL,
+    exercise_id INTEGER,
+    segment_id INTEGER
 );
 CREATE TABLE IF NOT EXISTS {lbl} (
     id VARCHAR NOT NULL,
     ts_start TIMESTAMP NOT NULL,
     ts_end TIMESTAMP NOT NULL,
-    exercise_id INTEGER
+    exercise_id INTEGER,
+    segment_id INTEGER
 );
+ALTER TABLE {tbl} ADD COLUMN IF NOT EXISTS exercise_id INTEGER;
+ALTER TABLE {tbl} ADD COLUMN IF NOT EXISTS segment_id INTEGER;
+ALTER TABLE {lbl} ADD COLUMN IF NOT EXISTS segment_id INTEGER;
 """
 
 
-def _open_db() -> duckdb.DuckDBPyConnection:
-    db_path = settings.DWH_PATH
-    db_path.parent.mkdir(parents=True, exist_ok=True)  # ← add this
-    db = duckdb.connect(db_path, read_only=False)
+_STATS_DDL = """
+CREATE TABLE IF NOT EXISTS imu_stats (
+    id VARCHAR NOT NULL,
+    session VARCHAR NOT NULL,
+    first_ts TIMESTAMP,
+    last_ts TIMESTAMP,
+    n_samples BIGINT NOT NULL,
+    max_abs_ax REAL, max_abs_ay REAL, max_abs_az REAL,
+    max_abs_gx REAL, max_abs_gy REAL, max_abs_gz REAL,
+    n_saturated BIGINT NOT NULL,
+    worst_ts TIMESTAMP[],
+    label_coverage DOUBLE,
+    acc_gaps BIGINT,
+    gyro_gaps BIGINT,
+    PRIMARY KEY (id, session)
+);
+"""
+
+# the views `reps validate` reads; created by the writer, not by every validation
+_VIEWS = """
+CREATE OR REPLACE VIEW imu AS
+SELECT
+    id AS subject_id,
+    ts,
+    ax AS acc_x, ay AS acc_y, az AS acc_z,
+    gx AS gyroscope_x, gy AS gyroscope_y, gz AS gyroscope_z,
+    exercise_id AS label, segment_id,
+    'structured' AS session
+FROM imu_structured
+UNION ALL
+SELECT
+    id AS subject_id,
+    ts,
+    ax AS acc_x, ay AS acc_y, az AS acc_z,
+    gx AS gyroscope_x, gy AS gyroscope_y, gz AS gyroscope_z,
+    exercise_id AS label, segment_id,
+    'unstructured' AS session
+FROM imu_unstructured;
+
+CREATE OR REPLACE VIEW labels AS
+SELECT
+    id AS subject_id,
+    ts_start AS ts,
+    ts_end,
+    exercise_id AS label,
+    segment_id,
+    'structured' AS session
+FROM labels_structured
+UNION ALL
+SELECT
+    id AS subject_id,
+    ts_start AS ts,
+    ts_end,
+    exercise_id AS label,
+    segment_id,
+    'unstructured' AS session
+FROM labels_unstructured;
+"""
+
+# raw inter-sample intervals longer than this count as a gap in imu_stats
+_GAP = timedelta(milliseconds=20)
+# saturated timestamps kept per session, worst first
+_STATS_TOP_K = 10
+
+
+@dataclass(slots=True)
+class SessionBatch:
+    """Aligned, clipped frames for one (subject, session), ready to append."""
+
+    session: str
+    imu: pl.DataFrame | Path  # or its Parquet spool when prepared out-of-core
+    labels: pl.DataFrame
+    stats: pl.DataFrame
+
+
+@dataclass(slots=True)
+class SubjectBatch:
+    subject_id: str
+    sessions: list[SessionBatch]
+    files: Manifest = field(default_factory=dict)  # raw inputs it was built from
+    spool: Path | None = None  # directory of spooled frames; the writer removes it
+
+
+def _ensure_exercise_lookup(db: duckdb.DuckDBPyConnection) -> None:
+    """(Re)create the ``exercise`` ENUM type and ``exercises`` lookup table.
+
+    Rebuilt from `exercise_map` on every writer open so the warehouse always
+    mirrors the YAML; twelve rows, so this is effectively free.
+    """
+    mapping = exercise_map()
+    labels = ", ".join("'" + name.replace("'", "''") + "'" for name in mapping.values())
+    db.execute("DROP TABLE IF EXISTS exercises;")
+    db.execute("DROP TYPE IF EXISTS exercise;")
+    db.execute(f"CREATE TYPE exercise AS ENUM ({labels});")
+    db.execute(
+        """
+        CREATE TABLE exercises (
+            exercise_id INTEGER PRIMARY KEY,
+            name exercise NOT NULL
+        );
+        """
+    )
+    db.executemany("INSERT INTO exercises VALUES (?, ?)", list(mapping.items()))
+
+
+def create_schema(db: duckdb.DuckDBPyConnection) -> None:
+    """Tables, views and lookups ingest writes; pass to `connection.writer`."""
     db.execute(_DDL.format(tbl="imu_structured", lbl="labels_structured"))
     db.execute(_DDL.format(tbl="imu_unstructured", lbl="labels_unstructured"))
-    return db
+    db.execute(MANIFEST_DDL)
+    db.execute(_STATS_DDL)
+    db.execute(_VIEWS)
+    create_pyramid_tables(db)
+    _ensure_exercise_lookup(db)
 
 
 def _session_kind(label_path: Path) -> str:
     return _STRUCTURED if "structured" in label_path.parts else _UNSTRUCTURED
 
 
-def ingest_subject(subject_id: str, /) -> None:
-    root = settings.RAW_ROOT
-    acc_p = root / "acc" / f"REPS-{subject_id}_acc.parquet"
-    gyro_p = root / "gyro" / f"REPS-{subject_id}_gyro.parquet"
+def discover_subjects(root: Path | None = None) -> list[str]:
+    """Subject IDs with a raw accelerometer file under *root*/acc."""
+    acc_dir = (root or settings.RAW_ROOT) / "acc"
+    return sorted(
+        p.name.split("_")[0].split("-")[1] for p in acc_dir.glob("REPS-*_acc.parquet")
+    )
 
-    acc = load_acc(acc_p)
-    gyro = load_gyro(gyro_p)
-    df = (
-        align_acc_gyro(acc, gyro)
-        .with_columns(pl.lit(subject_id).alias("id"))
-        .select(["ts", "ax", "ay", "az", "gx", "gy", "gz", "id"])
+
+# ───────────────────────── load / align / clip (CPU bound) ─────────────────────────
+
+
+def _gaps(raw: pl.LazyFrame, start: datetime, end: datetime) -> pl.LazyFrame:
+    ts = pl.col("ts")
+    return raw.filter(ts.is_between(start, end)).select(
+        (ts.diff() > _GAP).sum().alias("gaps")
     )
 
-    for label_p, session in [
-        (
-            root
-            / "exercise_labels"
-            / "structured"
-            / f"REPS-{subject_id}_labels.parquet",
-            "structured",
-        ),
-        (
-            root
-            / "exercise_labels"
-            / "unstructured"
-            / f"REPS-{subject_id}_labels.parquet",
-            "unstructured",
+
+def _imu_summary(imu: pl.DataFrame) -> pl.DataFrame:
+    """The sample-derived `imu_stats` columns of *imu*, as one row.
+
+    Rows of consecutive pieces of a session combine with `_merge_summaries`;
+    ``_worst_sev`` keeps the severities ``worst_ts`` is ranked by.
+    """
+    axes = ["ax", "ay", "az", "gx", "gy", "gz"]
+    acc_max = pl.max_horizontal(pl.col("ax", "ay", "az").abs())
+    gyro_max = pl.max_horizontal(pl.col("gx", "gy", "gz").abs())
+    severity = pl.max_horizontal(acc_max / ACC_LIMIT, gyro_max / GYRO_LIMIT)
+    sat = (acc_max > ACC_LIMIT) | (gyro_max > GYRO_LIMIT)
+    ts = pl.col("ts")
+    if isinstance(imu.schema["ts"], pl.Datetime) and imu.schema["ts"].time_zone:
+        ts = ts.dt.convert_time_zone("UTC").dt.replace_time_zone(None)
+
+    return imu.select(
+        pl.col("ts").min().alias("first_ts"),
+        pl.col("ts").max().alias("last_ts"),
+        pl.len().alias("n_samples"),
+        *[pl.col(c).abs().max().alias(f"max_abs_{c}") for c in axes],
+        sat.sum().alias("n_saturated"),
+        ts.filter(sat)
+        .sort_by(severity.filter(sat), descending=True, maintain_order=True)
+        .head(_STATS_TOP_K)
+        .implode()
+        .alias("worst_ts"),
+        severity.filter(sat)
+        .sort(descending=True)
+        .head(_STATS_TOP_K)
+        .implode()
+        .alias("_worst_sev"),
+    )
+
+
+def _merge_summaries(parts: pl.DataFrame) -> pl.DataFrame:
+    """Combine time-ordered `_imu_summary` rows into that of the whole."""
+    worst = (
+        parts.select(pl.col("worst_ts", "_worst_sev").explode())
+        .drop_nulls()
+        .sort("_worst_sev", descending=True, maintain_order=True)
+        .head(_STATS_TOP_K)
+    )
+    return parts.select(
+        pl.col("first_ts").min(),
+        pl.col("last_ts").max(),
+        pl.col("n_samples").sum(),
+        pl.col("^max_abs_.*$").max(),
+        pl.col("n_saturated").sum(),
+    ).with_columns(worst_ts=worst["worst_ts"].implode())
+
+
+def _session_stats(
+    subject_id: str,
+    session: str,
+    summary: pl.DataFrame,
+    labels: pl.DataFrame,
+    acc_gaps: int,
+    gyro_gaps: int,
+) -> pl.DataFrame:
+    """One `imu_stats` row for a clipped session from its `_imu_summary` rows."""
+    span = labels.select(
+        (pl.col("ts_end").max() - pl.col("ts_start").min()).dt.total_microseconds()
+    ).item()
+    labelled = (
+        labels.filter(pl.col("exercise_id").is_not_null())
+        .select((pl.col("ts_end") - pl.col("ts_start")).dt.total_microseconds().sum())
+        .item()
+    )
+
+    return _merge_summaries(summary).select(
+        pl.lit(subject_id).alias("id"),
+        pl.lit(session).alias("session"),
+        pl.all(),
+        pl.lit(labelled / span if span else None, dtype=pl.Float64).alias(
+            "label_coverage"
         ),
-    ]:
+        pl.lit(acc_gaps, dtype=pl.Int64).alias("acc_gaps"),
+        pl.lit(gyro_gaps, dtype=pl.Int64).alias("gyro_gaps"),
+    )
+
+
+_LABEL_COLS = ("exercise_id", "segment_id")
+
+
+def _attach_labels(imu: pl.LazyFrame, segments: pl.DataFrame) -> pl.LazyFrame:
+    """Add each sample's ``exercise_id`` / ``segment_id`` with a sorted as-of join.
+
+    Same rule as `sample_labels`: the last segment starting at or before the
+    sample, if the sample is not past its end; both are null otherwise.
+    """
+    inside = pl.col("ts") <= pl.col("ts_end")
+    return imu.join_asof(
+        segments.lazy().select("ts_start", "ts_end", *_LABEL_COLS),
+        left_on="ts",
+        right_on="ts_start",
+        strategy="backward",
+    ).with_columns(pl.when(inside).then(pl.col(c)).alias(c) for c in _LABEL_COLS)
+
+
+def _imu_rows(
+    aligned: pl.LazyFrame, labels: pl.DataFrame, subject_id: str
+) -> pl.LazyFrame:
+    """Label and tag aligned samples with the `imu_*` table's columns."""
+    return (
+        _attach_labels(aligned, labels)
+        .with_columns(pl.lit(subject_id).alias("id"))
+        .select(["ts", "ax", "ay", "az", "gx", "gy", "gz", *_LABEL_COLS, "id"])
+    )
+
+
+def _budget() -> int | None:
+    """``settings.INGEST_MEMORY_LIMIT`` in bytes ("2GB", "512MiB", …)."""
+    limit = settings.INGEST_MEMORY_LIMIT
+    if limit is None:
+        return None
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]i?B|B)?\s*", limit, re.IGNORECASE)
+    if m is None:
+        raise ValueError(f"unreadable INGEST_MEMORY_LIMIT: {limit!r}")
+    return int(float(m[1]) * _SIZE_UNITS[(m[2] or "B").upper()])
+
+
+def _spool_session(
+    subject_id: str,
+    acc_p: Path,
+    gyro_p: Path,
+    labels: pl.DataFrame,
+    start: datetime,
+    end: datetime,
+    rows: int,
+    path: Path,
+) -> tuple[pl.DataFrame | Path, pl.DataFrame, int, int]:
+    """Align, clip and label one session *rows* raw samples at a time into *path*.
+
+    Both raw files are read batch by batch in time order, always advancing
+    the stream that is behind, and only samples within `_PAD` of the labels
+    (the in-memory plan's window) are pushed to a `StreamAligner`. It keeps
+    each stream's neighbours across batches, so its output is exactly the
+    in-memory align. Finished grid rows are clipped, labelled and appended to
+    the Parquet file; raw gaps are counted on the way. Returns *path* (or the
+    empty frame if nothing was aligned), the pieces' `_imu_summary` rows and
+    the acc/gyro gap counts. The raw files must be sorted by time.
+    """
+    lo, hi = start - _PAD, end + _PAD
+    empty = (
+        _imu_rows(
+            align_acc_gyro_lazy(scan_acc(acc_p, lo, hi), scan_gyro(gyro_p, lo, hi)),
+            labels,
+            subject_id,
+        )
+        .clear()  # the output schema, without reading anything
+        .collect()
+    )
+    summaries = [_imu_summary(empty)]
+    sources = {"acc": iter_acc(acc_p, rows), "gyro": iter_gyro(gyro_p, rows)}
+    latest: dict[str, datetime] = {}  # last raw ts read per stream
+    tail: dict[str, pl.Series] = {}  # last in-session ts per stream, for gaps
+    gaps = {"acc": 0, "gyro": 0}
+    aligner = StreamAligner(every=_EVERY, chunk_size=rows)
+    writer = None
+
+    def spool(aligned: pl.DataFrame) -> None:
+        nonlocal writer
+        clipped = aligned.lazy().filter(pl.col("ts").is_between(start, end))
+        imu = _imu_rows(clipped, labels, subject_id).collect()
+        if imu.is_empty():
+            return
+        summaries.append(_imu_summary(imu))
+        table = _utc(imu).to_arrow()
+        writer = writer or pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+
+    try:
+        while sources:
+            name = min(sources, key=lambda k: latest.get(k, lo))
+            batch = next(sources[name], None)
+            if batch is None:
+                del sources[name]
+                continue
+            if batch.is_empty():
+                continue
+            ts = batch["ts"]
+            if not ts.is_sorted() or (name in latest and ts[0] < latest[name]):
+                raise ValueError(
+                    f"[{subject_id}] {name} samples are not in time order; "
+                    "ingest without INGEST_MEMORY_LIMIT"
+                )
+            latest[name] = ts[-1]
+            if latest[name] > hi:
+                del sources[name]  # the rest is past this session
+
+            inside = ts.filter(ts.is_between(start, end))
+            if inside.len():
+                inside = pl.concat([tail[name], inside]) if name in tail else inside
+                gaps[name] += int((inside.diff() > _GAP).sum())
+                tail[name] = inside.tail(1)
+            batch = batch.filter(pl.col("ts").is_between(lo, hi))
+            if batch.height:
+                with metrics.span("spool", subject=subject_id) as sp:
+                    aligner.push(name, batch)
+                    spool(aligner.emit())
+                    sp.rows = batch.height
+        spool(aligner.finish())
+    finally:
+        if writer is not None:
+            writer.close()
+    imu = path if writer is not None else empty
+    return imu, pl.concat(summaries), gaps["acc"], gaps["gyro"]
+
+
+def _prepare_spooled(
+    subject_id: str,
+    acc_p: Path,
+    gyro_p: Path,
+    found: list[tuple[str, pl.DataFrame, datetime, datetime]],
+    rows: int,
+) -> SubjectBatch:
+    """`prepare_subject` for *found* sessions via `_spool_session`.
+
+    The spool directory sits next to the warehouse (a tmpfs ``/tmp`` would
+    put the frames back in memory) and is removed here on failure.
+    """
+    settings.DWH_PATH.parent.mkdir(parents=True, exist_ok=True)
+    spool = Path(
+        tempfile.mkdtemp(prefix=f".ingest-{subject_id}-", dir=settings.DWH_PATH.parent)
+    )
+    batches = []
+    try:
+        for session, labels, start, end in found:
+            imu, summary, acc_gaps, gyro_gaps = _spool_session(
+                subject_id,
+                acc_p,
+                gyro_p,
+                labels,
+                start,
+                end,
+                rows,
+                spool / f"imu_{session}.parquet",
+            )
+            stats = _session_stats(
+                subject_id, session, summary, labels, acc_gaps, gyro_gaps
+            )
+            batches.append(SessionBatch(session, imu, labels, stats))
+    except BaseException:
+        shutil.rmtree(spool, ignore_errors=True)
+        raise
+    return SubjectBatch(subject_id, batches, spool=spool)
+
+
+def prepare_subject(subject_id: str, root: Path | None = None) -> SubjectBatch:
+    """Read, align and clip one subject without touching the warehouse.
+
+    Labels are read first; each session then becomes a lazy scan → align →
+    clip → label plan bounded to its label window (plus `_PAD`), and all plans are
+    collected together, so samples outside any session are never aligned.
+    Per-session `imu_stats` rows are derived from the same frames.
+    Safe to run in a worker process: the result only holds Polars frames.
+
+    If the sessions' estimated working set exceeds
+    ``settings.INGEST_MEMORY_LIMIT`` they are prepared out-of-core instead
+    (`_spool_session`): label files are read in batches too, and the batch
+    holds spooled Parquet files in ``spool``, which `_store` removes once
+    they are written.
+    """
+    root = root or settings.RAW_ROOT
+    acc_p = root / "acc" / f"REPS-{subject_id}_acc.parquet"
+    gyro_p = root / "gyro" / f"REPS-{subject_id}_gyro.parquet"
+
+    # samples the budget holds at once; None without INGEST_MEMORY_LIMIT
+    budget = _budget()
+    batch_rows = max(budget // _BYTES_PER_SAMPLE, 1) if budget is not None else None
+    found: list[tuple[str, pl.DataFrame, datetime, datetime]] = []
+    for session in (_STRUCTURED, _UNSTRUCTURED):
+        label_p = (
+            root / "exercise_labels" / session / f"REPS-{subject_id}_labels.parquet"
+        )
         if not label_p.exists():
             continue
 
         print(f"[{subject_id}] ingesting {session}")
 
-        labels = load_labels(label_p)
-        start = min(seg.ts_start for seg in labels)
-        end = max(seg.ts_end for seg in labels)
-        df_clip = df.filter((pl.col("ts") >= start) & (pl.col("ts") <= end))
-        lbl_df = pl.from_dicts([asdict(seg) | {"id": subject_id} for seg in labels])
-        imu_tbl = f"imu_{session}"
-        lbl_tbl = f"labels_{session}"
-
-        db_path = settings.DWH_PATH
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-        with duckdb.connect(db_path, read_only=False) as db:
-            db.execute(
-                f"""
-                CREATE TABLE IF NOT EXISTS {imu_tbl} (
-                    id VARCHAR NOT NULL,
-                    ts TIMESTAMP NOT NULL,
-                    ax FLOAT, ay FLOAT, az FLOAT,
-                    gx FLOAT, gy FLOAT, gz FLOAT
-                );
-            """
-            )
-            db.execute(
-                f"""
-                CREATE TABLE IF NOT EXISTS {lbl_tbl} (
-                    id VARCHAR NOT NULL,
-                    ts_start TIMESTAMP NOT NULL,
-                    ts_end TIMESTAMP NOT NULL,
-                    exercise_id INTEGER
-                );
-            """
-            )
-            db.execute(f"CREATE INDEX IF NOT EXISTS idx_{imu_tbl}_ts ON {imu_tbl}(ts);")
-            db.execute(f"CREATE INDEX IF NOT EXISTS idx_{imu_tbl}_id ON {imu_tbl}(id);")
-            db.execute(
-                f"CREATE INDEX IF NOT EXISTS idx_{lbl_tbl}_start ON {lbl_tbl}(ts_start);"
+        with metrics.span("labels", subject=subject_id, session=session) as sp:
+            labels = load_label_segments(label_p, batch_rows)
+            sp.rows, sp.bytes = labels.height, label_p.stat().st_size
+        if labels.is_empty():
+            continue
+        start, end = labels.select(
+            pl.col("ts_start").min(), pl.col("ts_end").max()
+        ).row(0)
+        labels = labels.sort("ts_start").with_row_index("segment_id")
+        labels = labels.with_columns(
+            pl.col("segment_id").cast(pl.Int32), pl.lit(subject_id).alias("id")
+        )
+        found.append((session, labels, start, end))
+
+    samples = sum((end - start) // _EVERY + 1 for _, _, start, end in found)
+    if batch_rows is not None and samples > batch_rows:
+        print(f"[{subject_id}] ~{samples:,} samples, over budget: out-of-core")
+        return _prepare_spooled(subject_id, acc_p, gyro_p, found, batch_rows)
+
+    plans: list[pl.LazyFrame] = []
+    for _, labels, start, end in found:
+        acc = scan_acc(acc_p, start - _PAD, end + _PAD)
+        gyro = scan_gyro(gyro_p, start - _PAD, end + _PAD)
+        aligned = align_acc_gyro_lazy(acc, gyro, _EVERY).filter(
+            (pl.col("ts") >= start) & (pl.col("ts") <= end)
+        )
+        plans += [
+            _imu_rows(aligned, labels, subject_id),
+            _gaps(acc, start, end),
+            _gaps(gyro, start, end),
+        ]
+
+    sessions = [session for session, *_ in found]
+    names = [f"{s}/{p}" for s in sessions for p in ("imu", "acc_gaps", "gyro_gaps")]
+    frames = metrics.collect_all(plans, names, subject=subject_id)
+    batches = []
+    for i, (session, labels, _, _) in enumerate(found):
+        imu, acc_gaps, gyro_gaps = frames[3 * i : 3 * i + 3]
+        with metrics.span("stats", subject=subject_id, session=session) as sp:
+            stats = _session_stats(
+                subject_id,
+                session,
+                _imu_summary(imu),
+                labels,
+                acc_gaps.item(),
+                gyro_gaps.item(),
             )
-            db.execute(f"CREATE INDEX IF NOT EXISTS idx_{lbl_tbl}_id ON {lbl_tbl}(id);")
+            sp.rows = imu.height
+        batches.append(SessionBatch(session, imu, labels, stats))
+    return SubjectBatch(subject_id, batches)
+
+
+# ───────────────────────── single-writer warehouse stage ─────────────────────────
+
+
+def _utc(df: pl.DataFrame) -> pl.DataFrame:
+    """*df* with tz-aware columns as UTC wall time, as the warehouse stores them."""
+    return df.with_columns(
+        pl.col(pl.Datetime(time_zone="*"))
+        .dt.convert_time_zone("UTC")
+        .dt.replace_time_zone(None)
+    )
+
+
+def append_samples(
+    db: duckdb.DuckDBPyConnection, table: str, df: pl.DataFrame | Path
+) -> None:
+    """Append *df* to *table* by column name, handing DuckDB the Arrow buffers.
+
+    tz-aware columns are stored as UTC wall time so the result does not depend
+    on the connection's ``TimeZone`` setting. Session tables are filled in
+    their `CLUSTER_KEYS` order so zone maps stay tight. A Parquet spool from
+    `_spool_session` is already both and is streamed in as it is.
+    """
+    if isinstance(df, Path):
+        db.execute(
+            f"INSERT INTO {table} BY NAME SELECT * FROM read_parquet(?)", [str(df)]
+        )
+        return
+    order = (
+        f" ORDER BY {', '.join(CLUSTER_KEYS[table])}" if table in CLUSTER_KEYS else ""
+    )
+    db.register("_staged", _utc(df).to_arrow())
+    try:
+        db.execute(f"INSERT INTO {table} BY NAME SELECT * FROM _staged{order}")
+    finally:
+        db.unregister("_staged")
+
+
+def write_subject(db: duckdb.DuckDBPyConnection, batch: SubjectBatch) -> None:
+    """Replace *batch*'s subject in the warehouse in a single transaction.
+
+    Existing rows for the subject are deleted from every session table before
+    the new frames go in, and the manifest is updated in the same transaction,
+    so re-ingesting never duplicates rows and a failure leaves the old data.
+    With ``settings.DWH_PYRAMID`` the summary levels are rebuilt from the new
+    rows in the same transaction.
+    """
+    sid = batch.subject_id
+    db.begin()
+    try:
+        with metrics.span("delete", subject=sid):
+            for session in (_STRUCTURED, _UNSTRUCTURED):
+                db.execute(f"DELETE FROM imu_{session} WHERE id = ?", [sid])
+                db.execute(f"DELETE FROM labels_{session} WHERE id = ?", [sid])
+                for seconds in PYRAMID_LEVELS:
+                    table = pyramid_table(session, seconds)
+                    db.execute(f"DELETE FROM {table} WHERE id = ?", [sid])
+            db.execute("DELETE FROM imu_stats WHERE id = ?", [sid])
+
+        for sb in batch.sessions:
+            for table, df in (
+                (f"imu_{sb.session}", sb.imu),
+                (f"labels_{sb.session}", sb.labels),
+                ("imu_stats", sb.stats),
+            ):
+                with metrics.span("append", subject=sid, table=table) as sp:
+                    append_samples(db, table, df)
+                    if isinstance(df, Path):
+                        sp.bytes = df.stat().st_size
+                    else:
+                        sp.rows, sp.bytes = df.height, int(df.estimated_size())
+            if settings.DWH_PYRAMID:
+                with metrics.span("pyramid", subject=sid, session=sb.session) as sp:
+                    sp.rows = build_pyramid(db, sb.session, sid)
+
+        if batch.files:
+            record_manifest(db, sid, batch.files, INGEST_VERSION)
+        with metrics.span("commit", subject=sid):
+            db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+
+def _prepare_changed(
+    subject_id: str, previous: Manifest | None, force: bool
+) -> tuple[Manifest, SubjectBatch | None, list[dict]]:
+    """Fingerprint the subject's raw files and prepare it only if they changed.
+
+    Also hands back the `metrics` records made on the way, since this may run
+    in a worker process.
+    """
+    with metrics.span("fingerprint", subject=subject_id):
+        files = current_manifest(subject_id, settings.RAW_ROOT, previous)
+    if not force and unchanged(previous, files):
+        return files, None, metrics.drain()
+    with metrics.span("prepare", subject=subject_id):
+        batch = prepare_subject(subject_id)
+    batch.files = files
+    return files, batch, metrics.drain()
+
+
+def _store(
+    db: duckdb.DuckDBPyConnection,
+    subject_id: str,
+    previous: Manifest | None,
+    result: tuple[Manifest, SubjectBatch | None, list[dict]],
+) -> bool:
+    files, batch, records = result
+    metrics.extend(records)
+    if batch is None:
+        print(f"[{subject_id}] unchanged, skipping")
+        if files != previous:  # touched but identical: remember the new mtimes
+            record_manifest(db, subject_id, files, INGEST_VERSION)
+        return False
+    try:
+        with metrics.span("write", subject=subject_id):
+            write_subject(db, batch)
+    finally:
+        if batch.spool is not None:
+            shutil.rmtree(batch.spool, ignore_errors=True)
+    return True
+
+
+def ingest_subject(subject_id: str, /, *, force: bool = False) -> bool:
+    """Ingest one subject; returns False if its raw files were unchanged."""
+    return bool(ingest_many([subject_id], force=force))
+
+
+def ingest_many(
+    subject_ids: Iterable[str], *, workers: int = 1, force: bool = False
+) -> list[str]:
+    """Ingest several subjects, preparing them on *workers* processes.
+
+    Only the calling process opens the warehouse, so DuckDB's single-writer
+    lock is never contended; workers hand back finished frames. Subjects whose
+    raw files match the manifest for `INGEST_VERSION` are skipped unless
+    *force*. Returns the IDs that were (re)written.
+    """
+    ids = list(subject_ids)
+    written: list[str] = []
+    with connection.writer(create_schema) as db:
+        manifest = load_manifest(db, INGEST_VERSION)
+
+        def store(
+            sid: str, result: tuple[Manifest, SubjectBatch | None, list[dict]]
+        ) -> None:
+            if result[1] is not None and not written:
+                drop_indexes(db)  # indexes only slow the bulk appends that follow
+            if _store(db, sid, manifest.get(sid), result):
+                written.append(sid)
 
-            db.append(imu_tbl, df_clip.to_pandas(), by_name=True)
-            db.append(lbl_tbl, lbl_df.to_pandas(), by_name=True)
+        if workers <= 1:
+            for sid in ids:
+                store(sid, _prepare_changed(sid, manifest.get(sid), force))
+        else:
+            with worker_pool(workers) as pool:
+                futures = {
+                    pool.submit(_prepare_changed, sid, manifest.get(sid), force): sid
+                    for sid in ids
+                }
+                for fut in as_completed(futures):
+                    store(futures[fut], fut.result())
+        if written and settings.DWH_INDEXES:  # untouched indexes stay as they are
+            create_indexes(db)
+    return sorted(written)
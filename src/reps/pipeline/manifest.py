@@ -0,0 +1,86 @@
+"""Raw-file manifest: which inputs (and ingest version) each subject was built from."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+
+from ..utils.fingerprint import FileFingerprint, fingerprint, same_content
+
+MANIFEST_DDL = """
+CREATE TABLE IF NOT EXISTS ingest_manifest (
+    subject_id VARCHAR NOT NULL,
+    kind VARCHAR NOT NULL,
+    path VARCHAR NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    sha256 VARCHAR NOT NULL,
+    ingest_version VARCHAR NOT NULL,
+    ingested_at TIMESTAMP DEFAULT current_timestamp,
+    PRIMARY KEY (subject_id, kind)
+);
+"""
+
+Manifest = dict[str, FileFingerprint]
+
+
+def raw_files(subject_id: str, root: Path) -> dict[str, Path]:
+    """Raw inputs of *subject_id* keyed by kind; label files only if present."""
+    files = {
+        "acc": root / "acc" / f"REPS-{subject_id}_acc.parquet",
+        "gyro": root / "gyro" / f"REPS-{subject_id}_gyro.parquet",
+    }
+    for session in ("structured", "unstructured"):
+        p = root / "exercise_labels" / session / f"REPS-{subject_id}_labels.parquet"
+        if p.exists():
+            files[f"labels_{session}"] = p
+    return files
+
+
+def load_manifest(db: duckdb.DuckDBPyConnection, version: str) -> dict[str, Manifest]:
+    """Recorded fingerprints per subject, ignoring rows from other versions."""
+    rows = db.execute(
+        """
+        SELECT subject_id, kind, path, size, mtime_ns, sha256
+        FROM ingest_manifest WHERE ingest_version = ?
+        """,
+        [version],
+    ).fetchall()
+    out: dict[str, Manifest] = {}
+    for sid, kind, *fp in rows:
+        out.setdefault(sid, {})[kind] = FileFingerprint(*fp)
+    return out
+
+
+def current_manifest(
+    subject_id: str, root: Path, previous: Manifest | None = None
+) -> Manifest:
+    previous = previous or {}
+    return {
+        kind: fingerprint(path, previous.get(kind))
+        for kind, path in raw_files(subject_id, root).items()
+    }
+
+
+def unchanged(previous: Manifest | None, current: Manifest) -> bool:
+    if not previous or previous.keys() != current.keys():
+        return False
+    return all(same_content(previous[k], current[k]) for k in current)
+
+
+def record_manifest(
+    db: duckdb.DuckDBPyConnection, subject_id: str, files: Manifest, version: str
+) -> None:
+    db.execute("DELETE FROM ingest_manifest WHERE subject_id = ?", [subject_id])
+    db.executemany(
+        """
+        INSERT INTO ingest_manifest
+            (subject_id, kind, path, size, mtime_ns, sha256, ingest_version)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            [subject_id, kind, fp.path, fp.size, fp.mtime_ns, fp.sha256, version]
+            for kind, fp in files.items()
+        ],
+    )
@@ -0,0 +1,138 @@
+"""Micro-batch ingest of a session while it is being recorded.
+
+The recorder drops raw chunk files, in the same format as the full exports,
+into a spool directory::
+
+    <source>/acc/<name>.parquet
+    <source>/gyro/<name>.parquet
+    <source>/_END                 (optional) recording finished
+
+Chunks of one stream are read in file-name order, so names must sort in time
+order (e.g. a zero-padded counter); write them under a dot-prefixed name and
+rename when complete, since hidden files are ignored. Samples are aligned
+with `StreamAligner`, which gives exactly `align_acc_gyro`'s output, and
+appended to ``imu_<session>`` once *batch_rows* rows are pending or the oldest
+has waited *max_latency* seconds. The warehouse is only opened to write a
+batch, so other processes can query it in between.
+
+Only aligned IMU rows are streamed, with null ``exercise_id`` /
+``segment_id``; labels and ``imu_stats`` come from a regular ``reps ingest``
+once the session's files are complete.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+import polars as pl
+
+from ..io.connection import reader, writer
+from ..io.parquet import scan_acc, scan_gyro
+from ..processing.resample import StreamAligner
+from ..utils import metrics
+from .ingest import append_samples, create_schema
+
+END_MARKER = "_END"
+_SCANS = {"acc": scan_acc, "gyro": scan_gyro}
+
+
+@dataclass(slots=True)
+class ChunkDir:
+    """New chunk files under a spool directory, oldest name first."""
+
+    root: Path
+    _seen: set[Path] = field(default_factory=set)
+
+    def poll(self) -> list[tuple[str, Path]]:
+        new = []
+        for kind in _SCANS:
+            for path in sorted((self.root / kind).glob("[!._]*.parquet")):
+                if path not in self._seen:
+                    self._seen.add(path)
+                    new.append((kind, path))
+        return new
+
+    @property
+    def finished(self) -> bool:
+        return (self.root / END_MARKER).exists()
+
+
+def _resume_point(subject_id: str, session: str) -> datetime | None:
+    with reader() as con:
+        row = con.execute(
+            f"SELECT max(ts) FROM imu_{session} WHERE id = ?", [subject_id]
+        ).fetchone()
+    return row[0] if row else None
+
+
+def stream_ingest(
+    source: Path,
+    subject_id: str,
+    session: str = "structured",
+    *,
+    poll_s: float = 1.0,
+    batch_rows: int = 6_000,
+    max_latency_s: float = 5.0,
+    idle_timeout_s: float | None = None,
+) -> int:
+    """Follow *source* until its end marker (or *idle_timeout_s* without new
+    chunks) and append the aligned samples; returns the rows appended.
+
+    Rows at or before the subject's latest ``ts`` already in ``imu_<session>``
+    are skipped, so restarting after an interruption does not duplicate data.
+    """
+    with writer(create_schema):  # once; batches skip the schema setup
+        pass
+    resume = _resume_point(subject_id, session)
+    chunks = ChunkDir(source)
+    aligner = StreamAligner()
+    pending: list[pl.DataFrame] = []
+    oldest: float | None = None  # monotonic time the oldest pending row arrived
+    last_chunk = time.monotonic()
+    appended = 0
+
+    def flush() -> None:
+        nonlocal pending, oldest, appended
+        rows = [df for df in pending if df.height]
+        pending, oldest = [], None
+        if not rows:
+            return
+        batch = pl.concat(rows).with_columns(id=pl.lit(subject_id))
+        if resume is not None:  # stored as naive UTC
+            since = resume.replace(tzinfo=UTC)
+            batch = batch.filter(pl.col("ts").dt.convert_time_zone("UTC") > since)
+        if batch.is_empty():
+            return
+        with metrics.span("stream_append", subject=subject_id, session=session) as sp:
+            with writer() as db:
+                append_samples(db, f"imu_{session}", batch)
+            sp.rows = batch.height
+        appended += batch.height
+
+    while True:
+        new = chunks.poll()
+        for kind, path in new:
+            # one-shot chunks; their generic names would collide in the cache
+            aligner.push(kind, _SCANS[kind](path, cache=False).collect())
+        if new:
+            last_chunk = time.monotonic()
+            out = aligner.emit()
+            if out.height:
+                pending.append(out)
+                oldest = oldest or time.monotonic()
+
+        now = time.monotonic()
+        idle = idle_timeout_s is not None and now - last_chunk >= idle_timeout_s
+        if not new and (chunks.finished or idle):
+            pending.append(aligner.finish())
+            flush()
+            return appended
+        if sum(df.height for df in pending) >= batch_rows or (
+            oldest is not None and now - oldest >= max_latency_s
+        ):
+            flush()
+        if not new:
+            time.sleep(poll_s)
@@ -2,99 +2,161 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
 
 import duckdb
 import polars as pl
+import pyarrow as pa  # type: ignore[import-untyped]
 
-DB = Path("dwh/reps.duckdb")  # adjust if your DB lives elsewhere
+from ..domain.models import ACC_LIMIT, GYRO_LIMIT
+from ..io.connection import reader
+from ..utils import metrics
 
 
 class ValidationError(Exception):
     """Raised when a rule fails."""
 
 
-def _ensure_views():
-    if "tiny" in str(DB):
-        return  # skip view creation in tests
-    con = duckdb.connect(DB, read_only=False)
-    con.execute(
-        """
-        CREATE OR REPLACE VIEW imu AS
-        SELECT
-            id AS subject_id,
-            ts,
-            ax AS acc_x, ay AS acc_y, az AS acc_z,
-            gx AS gyroscope_x, gy AS gyroscope_y, gz AS gyroscope_z,
-            'structured' AS session
-        FROM imu_structured
-        UNION ALL
-        SELECT
-            id AS subject_id,
-            ts,
-            ax AS acc_x, ay AS acc_y, az AS acc_z,
-            gx AS gyroscope_x, gy AS gyroscope_y, gz AS gyroscope_z,
-            'unstructured' AS session
-        FROM imu_unstructured;
-
-        CREATE OR REPLACE VIEW labels AS
-        SELECT
-            id AS subject_id,
-            ts_start AS ts,
-            exercise_id AS label,
-            'structured' AS session
-        FROM labels_structured
-        UNION ALL
-        SELECT
-            id AS subject_id,
-            ts_start AS ts,
-            exercise_id AS label,
-            'unstructured' AS session
-        FROM labels_unstructured;
-    """
+# ─────────────────────────────── Engine ───────────────────────────────
+#
+# Every rule works off one small per-(subject, session) "spans" frame. It is
+# read from the ``imu_stats`` table that ingest maintains; pairs whose stats
+# row is missing or out of date (rows appended by ``reps stream``, subjects
+# not re-ingested since stats existed) are recomputed from ``imu``, found by
+# comparing each pair's row count and last ``ts``. Without ``imu_stats``, or
+# when a full scan is requested, everything is recomputed in one pass over
+# ``imu``. Rules that still need SQL run concurrently, each on its own cursor
+# of the run's warehouse connection.
+
+_SPANS_SQL = """
+WITH s AS (
+    SELECT subject_id, session, ts,
+           GREATEST(ABS(acc_x), ABS(acc_y), ABS(acc_z)) AS acc_max,
+           GREATEST(ABS(gyroscope_x), ABS(gyroscope_y), ABS(gyroscope_z))
+               AS gyro_max
+    FROM imu{join}
+)
+SELECT subject_id, session,
+       MIN(ts) AS first_ts, MAX(ts) AS last_ts, COUNT(*) AS n_samples,
+       COUNT(*) FILTER (WHERE acc_max > {acc} OR gyro_max > {gyro}) AS n_saturated,
+       MAX(acc_max) AS acc_max, MAX(gyro_max) AS gyro_max,
+       max_by(ts, GREATEST(acc_max / {acc}, gyro_max / {gyro}), {k})
+           FILTER (WHERE acc_max > {acc} OR gyro_max > {gyro}) AS worst_ts
+FROM s
+GROUP BY subject_id, session
+"""
+
+_STATS_SQL = """
+WITH stale AS MATERIALIZED (
+    SELECT w.subject_id, w.session
+    FROM (
+        SELECT subject_id, session, COUNT(*) AS n, MAX(ts) AS last_ts
+        FROM imu
+        GROUP BY subject_id, session
+    ) AS w
+    ANTI JOIN imu_stats AS st
+        ON st.id = w.subject_id AND st.session = w.session
+        AND st.n_samples = w.n AND st.last_ts IS NOT DISTINCT FROM w.last_ts
+)
+SELECT id AS subject_id, session, first_ts, last_ts, n_samples, n_saturated,
+       GREATEST(max_abs_ax, max_abs_ay, max_abs_az) AS acc_max,
+       GREATEST(max_abs_gx, max_abs_gy, max_abs_gz) AS gyro_max,
+       CASE WHEN n_saturated > 0 THEN worst_ts[1:{k}] END AS worst_ts
+FROM imu_stats
+ANTI JOIN stale
+    ON stale.subject_id = imu_stats.id AND stale.session = imu_stats.session
+UNION ALL BY NAME
+SELECT * REPLACE (acc_max::REAL AS acc_max, gyro_max::REAL AS gyro_max)
+FROM ({spans})
+ORDER BY subject_id, session
+"""
+
+
+@dataclass(slots=True)
+class Context:
+    """Shared state for one validation run."""
+
+    con: duckdb.DuckDBPyConnection | None = None  # None: a connection per query
+    summary: bool = False
+    top_k: int = 5
+    full_scan: bool = False
+    _spans: pa.Table | None = field(default=None, repr=False)
+    _spans_lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
     )
-    con.close()
 
+    def q(self, sql: str, **frames: pl.DataFrame) -> pl.DataFrame:
+        """Run *sql* on a private cursor (safe to call from several threads).
+
+        Keyword *frames* are visible to the query under their names.
+        """
+        if self.con is None:
+            with reader() as cur:
+                return self._q(cur, sql, frames)
+        cur = self.con.cursor()
+        try:
+            return self._q(cur, sql, frames)
+        finally:
+            cur.close()
+
+    @staticmethod
+    def _q(
+        cur: duckdb.DuckDBPyConnection, sql: str, frames: dict[str, pl.DataFrame]
+    ) -> pl.DataFrame:
+        for name, frame in frames.items():
+            cur.register(name, frame.to_arrow())
+        return pl.from_arrow(cur.execute(sql).arrow())  # type: ignore[return-value]
+
+    def has_table(self, name: str) -> bool:
+        sql = f"SELECT count(*) FROM duckdb_tables() WHERE table_name = '{name}'"
+        return bool(self.q(sql).item())
+
+    @property
+    def spans(self) -> pl.DataFrame:
+        """Per-(subject, session) extent and saturation stats.
+
+        Kept as an immutable Arrow table; each caller gets its own polars
+        frame, since one frame must not be used from several threads. The
+        first caller runs the query; concurrent callers wait for it.
+        """
+        with self._spans_lock:
+            if self._spans is None:
+                limits = {"acc": ACC_LIMIT, "gyro": GYRO_LIMIT, "k": self.top_k}
+                if not self.full_scan and self.has_table("imu_stats"):
+                    stale = " SEMI JOIN stale USING (subject_id, session)"
+                    spans = _SPANS_SQL.format(join=stale, **limits)
+                    sql = _STATS_SQL.format(k=self.top_k, spans=spans)
+                else:
+                    sql = _SPANS_SQL.format(join="", **limits)
+                    sql += "ORDER BY subject_id, session"
+                self._spans = self.q(sql).to_arrow()
+        return pl.from_arrow(self._spans)  # type: ignore[return-value]
 
-def _q(sql: str, read_only: bool = True) -> Union[pl.DataFrame, pl.Series]:
-    """Execute *sql* against the DuckDB warehouse and return a Polars object.
 
-    The return value is a *DataFrame* for multi‑column results or a *Series*
-    for single‑column results, matching `polars.from_arrow` behaviour.
-    """
-    con = duckdb.connect(DB, read_only=read_only)
-    try:
-        return pl.from_arrow(con.execute(sql).arrow())
-    finally:
-        con.close()
+def _context(summary: bool = False, top_k: int = 5, full_scan: bool = False) -> Context:
+    return Context(None, summary, top_k, full_scan)
 
 
 # ───────────────────────── V‑1: trials must start/end NULL ─────────────────────────
 
 
-def check_null_padding() -> None:
+def check_null_padding(ctx: Context | None = None) -> None:
+    ctx = ctx or _context()
     sql = """
-    WITH span AS (
-        SELECT subject_id, session,
-               MIN(ts) AS first_ts, MAX(ts) AS last_ts
-        FROM imu
-        GROUP BY subject_id, session
-    ),
-    viol AS (
-        SELECT s.subject_id, s.session, 'label_at_start' AS reason
-        FROM span s
-        JOIN labels l ON l.subject_id=s.subject_id AND l.session=s.session
-                      AND l.ts=s.first_ts AND l.label IS NOT NULL
-        UNION ALL
-        SELECT s.subject_id, s.session, 'label_at_end'
-        FROM span s
-        JOIN labels l ON l.subject_id=s.subject_id AND l.session=s.session
-                      AND l.ts=s.last_ts AND l.label IS NOT NULL
-    )
-    SELECT * FROM viol;
+    SELECT s.subject_id, s.session, 'label_at_start' AS reason
+    FROM spans s
+    JOIN labels l ON l.subject_id=s.subject_id AND l.session=s.session
+                  AND l.ts=s.first_ts AND l.label IS NOT NULL
+    UNION ALL
+    SELECT s.subject_id, s.session, 'label_at_end'
+    FROM spans s
+    JOIN labels l ON l.subject_id=s.subject_id AND l.session=s.session
+                  AND l.ts=s.last_ts AND l.label IS NOT NULL
     """
-    bad = _q(sql)
+    bad = ctx.q(sql, spans=ctx.spans)
     if bad.shape[0]:
         raise ValidationError(
             "Labels present at start/end of recording:\n" + bad.__repr__()
@@ -104,63 +166,85 @@ def check_null_padding() -> None:
 # ──────────────────────── V‑2: session boundaries separate ────────────────────────
 
 
-def check_session_gap() -> None:
-    sql = """
-    WITH ends AS (
-        SELECT subject_id, MAX(ts) AS structured_end
-        FROM imu WHERE session='structured'
-        GROUP BY subject_id
-    ),
-    starts AS (
-        SELECT subject_id, MIN(ts) AS unstructured_start
-        FROM imu WHERE session='unstructured'
-        GROUP BY subject_id
+def check_session_gap(ctx: Context | None = None) -> None:
+    spans = (ctx or _context()).spans
+    ends = spans.filter(pl.col("session") == "structured").select(
+        "subject_id", pl.col("last_ts").alias("structured_end")
+    )
+    starts = spans.filter(pl.col("session") == "unstructured").select(
+        "subject_id", pl.col("first_ts").alias("unstructured_start")
+    )
+    bad = ends.join(starts, on="subject_id").filter(
+        pl.col("structured_end") >= pl.col("unstructured_start")
     )
-    SELECT e.subject_id, structured_end, unstructured_start
-    FROM ends e JOIN starts s USING (subject_id)
-    WHERE structured_end >= unstructured_start;
-    """
-    bad = _q(sql)
     if bad.shape[0]:
         raise ValidationError("Structured/unstructured overlap:\n" + bad.__repr__())
 
 
 # ───────────────────────── V‑3: sensor physical limits ─────────────────────────
 
-# gyro saturates at 2000 but float values slightly exceed 2000 so limit set to 2001
 
-
-def check_physical_limits() -> None:
-    sql = """
-    WITH viol AS (
-        SELECT subject_id, ts,
-               acc_x, acc_y, acc_z, gyroscope_x, gyroscope_y, gyroscope_z,
-               GREATEST(ABS(acc_x), ABS(acc_y), ABS(acc_z)) AS acc_max,
-               GREATEST(ABS(gyroscope_x), ABS(gyroscope_y), ABS(gyroscope_z)) AS gyro_max
-        FROM imu
-    )
-    SELECT subject_id, ts, acc_max, gyro_max
-    FROM viol
-    WHERE acc_max > 8 * 9.80665 OR gyro_max > 2001 
-    ORDER BY subject_id, ts;
-    """
-    bad = _q(sql)
-    if bad.shape[0]:
-        raise ValidationError(
-            "Sensor saturation (>8 g or >2000 °/s):\n" + bad.__repr__()
+def check_physical_limits(ctx: Context | None = None) -> None:
+    ctx = ctx or _context()
+    offenders = ctx.spans.filter(pl.col("n_saturated") > 0)
+    if not offenders.shape[0]:
+        return
+    if ctx.summary:
+        bad = offenders.select(
+            "subject_id", "session", "n_saturated", "acc_max", "gyro_max", "worst_ts"
         )
+    else:
+        bad = ctx.q(
+            f"""
+            WITH viol AS (
+                SELECT subject_id, ts,
+                       GREATEST(ABS(acc_x), ABS(acc_y), ABS(acc_z)) AS acc_max,
+                       GREATEST(ABS(gyroscope_x), ABS(gyroscope_y), ABS(gyroscope_z))
+                           AS gyro_max
+                FROM imu
+                WHERE subject_id IN (SELECT subject_id FROM spans)
+            )
+            SELECT subject_id, ts, acc_max, gyro_max
+            FROM viol
+            WHERE acc_max > {ACC_LIMIT} OR gyro_max > {GYRO_LIMIT}
+            ORDER BY subject_id, ts;
+            """,
+            spans=offenders,
+        )
+    raise ValidationError("Sensor saturation (>8 g or >2000 °/s):\n" + bad.__repr__())
 
 
 # ──────────────────────────────── Runner ────────────────────────────────
 
+RULES: tuple[Callable[[Context], None], ...] = (
+    check_null_padding,
+    check_session_gap,
+    check_physical_limits,
+)
 
-def run() -> list[str]:
-    """Run all validators; return list of error strings (empty if clean)."""
-    _ensure_views()
-    errors: list[str] = []
-    for fn in (check_null_padding, check_session_gap, check_physical_limits):
-        try:
-            fn()
-        except ValidationError as err:
-            errors.append(str(err))
-    return errors
+
+def run(
+    summary: bool = False, top_k: int = 5, full_scan: bool = False, workers: int = 3
+) -> list[str]:
+    """Run all validators; return list of error strings (empty if clean).
+
+    With *summary*, saturation is reported as per-subject counts plus the
+    *top_k* worst timestamps instead of a dump of every offending sample.
+    *full_scan* ignores ``imu_stats`` and re-derives everything from ``imu``.
+    """
+    with reader() as con:
+        ctx = Context(con, summary, top_k, full_scan)
+        with metrics.span("validate_spans", full_scan=full_scan) as sp:
+            sp.rows = len(ctx.spans)  # computed once, shared by every rule
+
+        def _one(fn: Callable[[Context], None]) -> str | None:
+            with metrics.span("validate", rule=fn.__name__):
+                try:
+                    fn(ctx)
+                except ValidationError as err:
+                    return str(err)
+            return None
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            results = list(pool.map(_one, RULES))
+    return [r for r in results if r is not None]
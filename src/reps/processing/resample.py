@@ -1,20 +1,431 @@
+"""Resampling of irregular sensor streams onto a fixed-rate timeline.
+
+Values at each grid point come from sorted as-of joins against the nearest
+samples before/after it, so no outer join, global re-sort or full-timeline
+left join is needed and long recordings can be processed chunk by chunk.
+
+`align_streams` puts any number of `Stream`s on one grid this way: each
+stream is merged into the grid with its own as-of joins, so the cost is
+linear in the total number of samples however many sensors there are.
+`align_acc_gyro` is the two-stream case used by ingest.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
 import polars as pl
 
+Strategy = Literal["linear", "nearest", "hold"]
+Spec = Mapping[str, Strategy]
+
+DEFAULT_EVERY = "10ms"
+DEFAULT_CHUNK = 1_000_000  # grid points per chunk in the eager engine
+
+_ACC: Spec = {"ax": "linear", "ay": "linear", "az": "linear"}
+_GYRO: Spec = {"gx": "hold", "gy": "hold", "gz": "hold"}
+
+_UNITS = {"us": 1, "ms": 1_000, "s": 1_000_000, "m": 60_000_000, "h": 3_600_000_000}
+
+
+def _period(every: str | timedelta) -> timedelta:
+    if isinstance(every, timedelta):
+        return every
+    m = re.fullmatch(r"(\d+)(us|ms|s|m|h)", every)
+    if m is None:
+        raise ValueError(f"unsupported resampling interval: {every!r}")
+    return timedelta(microseconds=int(m[1]) * _UNITS[m[2]])
+
+
+def _spec(strategy: Strategy | Spec, columns: Sequence[str]) -> Spec:
+    if isinstance(strategy, str):
+        return {c: strategy for c in columns if c != "ts"}
+    return strategy
+
+
+@dataclass(slots=True)
+class Stream:
+    """One sensor stream to align: its samples and how the grid is filled.
+
+    *columns* is a strategy for every non-``ts`` column or a per-column
+    mapping, as in `resample`. Grid points further than *max_gap* from the
+    samples they would be filled from get null instead, so a dropout is not
+    papered over; it defaults to two sampling periods when *rate_hz* is
+    given and is unbounded otherwise.
+    """
+
+    data: pl.DataFrame | pl.LazyFrame
+    columns: Strategy | Spec = "linear"
+    rate_hz: float | None = None
+    max_gap: str | timedelta | None = None
+
+    def spec(self) -> Spec:
+        return _spec(self.columns, self.data.collect_schema().names())
+
+    def gap(self) -> timedelta | None:
+        if self.max_gap is not None:
+            return _period(self.max_gap)
+        if self.rate_hz:
+            return timedelta(seconds=2 / self.rate_hz)
+        return None
+
+
+def _specs(streams: Sequence[Stream]) -> list[Spec]:
+    """Each stream's column spec; a column may come from one stream only."""
+    specs: list[Spec] = []
+    seen: set[str] = {"ts"}
+    for stream in streams:
+        spec = stream.spec()
+        if clash := seen & spec.keys():
+            raise ValueError(f"columns {sorted(clash)} appear in more than one stream")
+        seen |= spec.keys()
+        specs.append(spec)
+    return specs
+
+
+def _sample_at(
+    grid: pl.LazyFrame,
+    stream: pl.LazyFrame,
+    spec: Spec,
+    max_gap: timedelta | None = None,
+) -> pl.LazyFrame:
+    """Add *stream*'s columns to *grid*, evaluated at each grid ``ts``.
+
+    ``hold`` takes the last sample at or before the grid point, ``nearest``
+    the closer neighbour (earlier on ties) and ``linear`` interpolates in time
+    between the two neighbours, holding the last value past the final sample.
+    Before a stream's first sample every strategy but ``nearest`` yields null.
+    Neighbours further than *max_gap* from the grid point are ignored.
+    Both frames must be sorted by ``ts``.
+    """
+    cols = list(spec)
+    # samples with missing values never act as neighbours
+    stream = stream.select("ts", *cols).drop_nulls(cols)
+    out = grid.join_asof(
+        stream.select(
+            pl.col("ts").alias("_t0"), *[pl.col(c).alias(f"{c}_0") for c in cols]
+        ),
+        left_on="ts",
+        right_on="_t0",
+        strategy="backward",
+        tolerance=max_gap,
+    )
+    if any(s != "hold" for s in spec.values()):
+        out = out.join_asof(
+            stream.select(
+                pl.col("ts").alias("_t1"), *[pl.col(c).alias(f"{c}_1") for c in cols]
+            ),
+            left_on="ts",
+            right_on="_t1",
+            strategy="forward",
+            tolerance=max_gap,
+        )
+
+    t, t0, t1 = pl.col("ts"), pl.col("_t0"), pl.col("_t1")
+    exprs: list[pl.Expr] = []
+    for c, how in spec.items():
+        v0, v1 = pl.col(f"{c}_0"), pl.col(f"{c}_1")
+        if how == "hold":
+            e = v0
+        elif how == "nearest":
+            e = (
+                pl.when(t0.is_null() | (t1.is_not_null() & ((t1 - t) < (t - t0))))
+                .then(v1)
+                .otherwise(v0)
+            )
+        elif how == "linear":
+            w = (t - t0).dt.total_microseconds() / (t1 - t0).dt.total_microseconds()
+            e = (
+                pl.when(t1.is_null() | (t1 == t0))
+                .then(v0)
+                .otherwise(v0 + (v1 - v0) * w)
+            )
+        else:
+            raise ValueError(f"unknown strategy {how!r} for column {c!r}")
+        exprs.append(e.cast(stream.collect_schema()[c]).alias(c))
+    return out.select(*grid.collect_schema().names(), *exprs)
+
+
+def _iter_chunks(
+    streams: Sequence[Stream],
+    *,
+    every: str | timedelta,
+    start: datetime | None,
+    end: datetime | None,
+    chunk_size: int,
+) -> Iterator[pl.DataFrame]:
+    """Resample *streams* onto one grid, *chunk_size* grid points at a time.
+
+    Each chunk only sees the zero-copy slice of every stream that spans it
+    (plus one neighbour either side), so working memory is bounded by the
+    chunk, not the recording. The grid runs from *start* (default: first
+    sample of any stream) to *end* (default: last sample) in UTC steps.
+    """
+    specs = _specs(streams)
+    gaps = [s.gap() for s in streams]
+    frames = [
+        (s.data if isinstance(s.data, pl.DataFrame) else s.data.collect())
+        .with_columns(pl.col("ts").dt.cast_time_unit("us"))
+        .sort("ts")
+        for s in streams
+    ]
+    keys = [df["ts"].to_physical() for df in frames]  # µs since epoch, UTC
+    if not any(k.len() for k in keys):
+        return
+    dtype = frames[0].schema["ts"]
+
+    def _us(bound: datetime | None, first: bool) -> int:
+        if bound is None:  # keys are sorted: their ends are the extremes
+            ends = [k[0] if first else k[-1] for k in keys if k.len()]
+            return min(ends) if first else max(ends)
+        return pl.select(pl.lit(bound).cast(dtype).to_physical()).item()
+
+    period = _period(every) // timedelta(microseconds=1)
+    g, last = _us(start, True), _us(end, False)
+    while g <= last:
+        g1 = min(g + period * (chunk_size - 1), last)
+        out = pl.LazyFrame().select(
+            pl.int_range(g, g1 + 1, period, dtype=pl.Int64).cast(dtype).alias("ts")
+        )
+        for df, spec, gap, key in zip(frames, specs, gaps, keys):
+            lo = max(key.search_sorted(g, side="right") - 1, 0)
+            hi = key.search_sorted(g1, side="left") + 1
+            out = _sample_at(out, df.slice(lo, hi - lo).lazy(), spec, gap)
+        yield out.collect()
+        g = g1 + period
+
+
+def iter_align_streams(
+    streams: Sequence[Stream],
+    *,
+    every: str | timedelta = DEFAULT_EVERY,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> Iterator[pl.DataFrame]:
+    """Chunked `align_streams`: yields consecutive, time-ordered pieces."""
+    yield from _iter_chunks(
+        streams, every=every, start=start, end=end, chunk_size=chunk_size
+    )
+
+
+def align_streams(
+    streams: Sequence[Stream],
+    *,
+    every: str | timedelta = DEFAULT_EVERY,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> pl.DataFrame:
+    """Put every stream's columns on one *every* grid spanning all of them.
+
+    Columns come out in stream order; a column name may appear in only one
+    stream. All ``ts`` columns must share a time zone.
+    """
+    return pl.concat(
+        iter_align_streams(
+            streams, every=every, start=start, end=end, chunk_size=chunk_size
+        )
+    )
+
+
+def align_streams_lazy(
+    streams: Sequence[Stream], every: str | timedelta = DEFAULT_EVERY
+) -> pl.LazyFrame:
+    """Lazy `align_streams`: nothing is materialised until the plan is collected."""
+    specs = _specs(streams)
+    frames = [s.data.lazy().sort("ts") for s in streams]
+    ts = pl.concat([lf.select("ts") for lf in frames])
+    out = ts.select(
+        pl.datetime_range(pl.col("ts").min(), pl.col("ts").max(), _period(every)).alias(
+            "ts"
+        )
+    )
+    for lf, spec, stream in zip(frames, specs, streams):
+        out = _sample_at(out, lf, spec, stream.gap())
+    return out
 
-def align_acc_gyro(acc: pl.DataFrame, gyro: pl.DataFrame) -> pl.DataFrame:
-    df = acc.join(gyro, on="ts", how="full").sort("ts")
 
-    ts_start, ts_end = df["ts"][0], df["ts"][-1]
-    timeline = pl.DataFrame(
-        {"ts": pl.datetime_range(ts_start, ts_end, "10ms", eager=True)}
+def iter_resample(
+    df: pl.DataFrame,
+    strategy: Strategy | Spec = "linear",
+    *,
+    every: str | timedelta = DEFAULT_EVERY,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> Iterator[pl.DataFrame]:
+    """Chunked `resample`: yields consecutive, time-ordered pieces of the result."""
+    yield from iter_align_streams(
+        [Stream(df, strategy)],
+        every=every,
+        start=start,
+        end=end,
+        chunk_size=chunk_size,
     )
-    df = timeline.join(df, on="ts", how="left")
 
-    # linear‑interpolate acc columns, series‑wise (avoids the stub mismatch)
-    interp_cols = ["ax", "ay", "az"]
-    df = df.with_columns([pl.col(c).interpolate() for c in interp_cols])
 
-    # forward‑fill remaining gaps (gyro, any residual)
-    df = df.fill_null(strategy="forward")
+def resample(
+    df: pl.DataFrame,
+    strategy: Strategy | Spec = "linear",
+    *,
+    every: str | timedelta = DEFAULT_EVERY,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> pl.DataFrame:
+    """Resample one ``ts``-keyed stream onto a regular *every* grid.
+
+    *strategy* is one of ``linear``/``nearest``/``hold`` for every column, or
+    a per-column mapping (columns not listed are dropped).
+    """
+    return pl.concat(
+        iter_resample(
+            df, strategy, every=every, start=start, end=end, chunk_size=chunk_size
+        )
+    )
+
+
+def iter_align_acc_gyro(
+    acc: pl.DataFrame,
+    gyro: pl.DataFrame,
+    *,
+    every: str | timedelta = DEFAULT_EVERY,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> Iterator[pl.DataFrame]:
+    yield from iter_align_streams(
+        [Stream(acc, _ACC), Stream(gyro, _GYRO)], every=every, chunk_size=chunk_size
+    )
+
+
+def align_acc_gyro_lazy(
+    acc: pl.LazyFrame, gyro: pl.LazyFrame, every: str | timedelta = DEFAULT_EVERY
+) -> pl.LazyFrame:
+    """Lazy `align_acc_gyro`: nothing is materialised until the plan is collected."""
+    return align_streams_lazy([Stream(acc, _ACC), Stream(gyro, _GYRO)], every)
+
 
-    return df
+def _instant(us: int, dtype: pl.DataType) -> datetime:
+    """µs since the epoch as a datetime `_iter_chunks` maps back to *us* exactly."""
+    if getattr(dtype, "time_zone", None):
+        return datetime(1970, 1, 1, tzinfo=UTC) + timedelta(microseconds=us)
+    return datetime(1970, 1, 1) + timedelta(microseconds=us)
+
+
+class StreamAligner:
+    """Incremental `align_acc_gyro` for samples that arrive in chunks.
+
+    `push` adds a time-ordered chunk of one stream; `emit` returns the grid
+    points no future chunk can change any more: those up to the earliest
+    "latest sample" across streams, since every later value may still be
+    interpolated or held from samples yet to come. `finish` emits the rest,
+    up to the last sample of any stream. Concatenated, the emitted frames
+    equal `align_acc_gyro` on the complete streams.
+
+    Only a carry-over of each stream is kept between calls: the last sample
+    at or before the next grid point plus whatever arrived after it, so
+    memory is bounded by how far one stream runs ahead of the other.
+    """
+
+    def __init__(
+        self,
+        streams: Mapping[str, Spec] | None = None,
+        *,
+        every: str | timedelta = DEFAULT_EVERY,
+        chunk_size: int = DEFAULT_CHUNK,
+    ) -> None:
+        self._specs = dict(streams or {"acc": _ACC, "gyro": _GYRO})
+        self._buf: dict[str, pl.DataFrame] = {}
+        self._every = every
+        self._period = _period(every) // timedelta(microseconds=1)
+        self._chunk_size = chunk_size
+        self._next: int | None = None  # next grid point to emit, µs
+
+    def push(self, name: str, chunk: pl.DataFrame) -> None:
+        """Add a chunk of stream *name* (``ts`` plus its value columns)."""
+        cols = list(self._specs[name])
+        chunk = chunk.select(pl.col("ts").dt.cast_time_unit("us"), *cols).drop_nulls()
+        if name in self._buf:
+            chunk = pl.concat([self._buf[name], chunk])
+        self._buf[name] = chunk.sort("ts")
+
+    @property
+    def buffered(self) -> int:
+        """Rows currently held across all streams."""
+        return sum(df.height for df in self._buf.values())
+
+    def _empty(self, name: str | None = None) -> pl.DataFrame:
+        """No rows, with the output schema (or stream *name*'s buffer schema)."""
+        ts = next((df.schema["ts"] for df in self._buf.values()), pl.Datetime("us"))
+        schema: dict[str, pl.DataType] = {"ts": ts}
+        for stream, spec in self._specs.items():
+            if name in (None, stream):
+                buf = self._buf.get(stream)
+                schema |= {
+                    c: buf.schema[c] if buf is not None else pl.Float32() for c in spec
+                }
+        return pl.DataFrame(schema=schema)
+
+    def _keys(self) -> list[pl.Series]:
+        return [df["ts"].to_physical() for df in self._buf.values() if df.height]
+
+    def _emit(self, end: int) -> pl.DataFrame:
+        if self._next is None:
+            self._next = min(k[0] for k in self._keys())  # grid origin, as offline
+        if end < self._next:
+            return self._empty()
+        dtype = next(iter(self._buf.values())).schema["ts"]
+        streams = [
+            Stream(self._buf.get(name, self._empty(name)), spec)
+            for name, spec in self._specs.items()
+        ]
+        out = pl.concat(
+            _iter_chunks(
+                streams,
+                every=self._every,
+                start=_instant(self._next, dtype),
+                end=_instant(end, dtype),
+                chunk_size=self._chunk_size,
+            )
+        )
+        self._next = out["ts"].to_physical()[-1] + self._period
+        for name, df in self._buf.items():
+            key = df["ts"].to_physical()
+            self._buf[name] = df.slice(
+                max(key.search_sorted(self._next, "right") - 1, 0)
+            )
+        return out
+
+    def emit(self) -> pl.DataFrame:
+        """Grid rows that are final; none until every stream has data."""
+        if len(self._buf) < len(self._specs) or not all(
+            df.height for df in self._buf.values()
+        ):
+            return self._empty()
+        return self._emit(min(k[-1] for k in self._keys()))
+
+    def finish(self) -> pl.DataFrame:
+        """Remaining grid rows, up to the last sample of any stream."""
+        if not any(df.height for df in self._buf.values()):
+            return self._empty()
+        return self._emit(max(k[-1] for k in self._keys()))
+
+
+def align_acc_gyro(
+    acc: pl.DataFrame,
+    gyro: pl.DataFrame,
+    *,
+    every: str | timedelta = DEFAULT_EVERY,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> pl.DataFrame:
+    """Put acc (linear) and gyro (hold) on one *every* grid spanning both.
+
+    Acc axes are interpolated, gyro axes carry the last reading forward.
+    """
+    return align_streams(
+        [Stream(acc, _ACC), Stream(gyro, _GYRO)], every=every, chunk_size=chunk_size
+    )
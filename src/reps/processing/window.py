@@ -0,0 +1,150 @@
+"""Fixed-length, overlapping windows over aligned IMU data.
+
+Signals are copied once into a C-contiguous ``(n_samples, n_channels)``
+float32 buffer; every window is then a strided view into it, so generating
+windows costs no memory beyond that buffer and the per-window label arrays.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+from numpy.lib.stride_tricks import as_strided
+
+from ..domain.models import LabelSegment
+
+CHANNELS = ("ax", "ay", "az", "gx", "gy", "gz")
+REST = -1  # label code for rest / unlabelled samples
+
+
+@dataclass(slots=True)
+class Windows:
+    data: np.ndarray  # (n_windows, size, n_channels) read-only view, float32
+    start_ts: np.ndarray  # datetime64[us] (UTC) of each window's first sample
+    labels: np.ndarray  # int32 majority exercise_id, REST when none
+    purity: np.ndarray  # float32 share of samples carrying the majority label
+    size: int
+    step: int
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+
+def _segments_frame(segments: pl.DataFrame | Sequence[LabelSegment]) -> pl.DataFrame:
+    if isinstance(segments, pl.DataFrame):
+        return segments
+    return pl.DataFrame(
+        {
+            "ts_start": [s.ts_start for s in segments],
+            "ts_end": [s.ts_end for s in segments],
+            "exercise_id": [s.exercise_id for s in segments],
+        },
+        schema_overrides={"exercise_id": pl.Int32},
+    )
+
+
+def _us(s: pl.Series) -> np.ndarray:
+    return s.dt.cast_time_unit("us").to_physical().to_numpy()
+
+
+def sample_labels(
+    ts: pl.Series, segments: pl.DataFrame | Sequence[LabelSegment]
+) -> np.ndarray:
+    """Interval-join sorted timestamps *ts* to label *segments*.
+
+    Returns one int32 code per sample: the ``exercise_id`` of the segment with
+    ``ts_start <= ts <= ts_end`` (later segment wins on shared boundaries) or
+    `REST`. Both inputs must use the same time base (tz-aware or naive UTC).
+    """
+    seg = _segments_frame(segments).sort("ts_start")
+    t = _us(ts)
+    starts, ends = _us(seg["ts_start"]), _us(seg["ts_end"])
+    codes = seg["exercise_id"].fill_null(REST).cast(pl.Int32).to_numpy()
+
+    idx = np.searchsorted(starts, t, side="right") - 1
+    ok = idx >= 0
+    ok[ok] = t[ok] <= ends[idx[ok]]
+    out = np.full(t.shape, REST, dtype=np.int32)
+    out[ok] = codes[idx[ok]]
+    return out
+
+
+def _majority(codes: np.ndarray, size: int, step: int, n: int):
+    """Majority code and its share for *n* windows, O(samples × classes)."""
+    best = np.full(n, REST, dtype=np.int32)
+    best_count = np.zeros(n, dtype=np.int64)
+    lo = np.arange(n) * step
+    for k in np.unique(codes):
+        csum = np.concatenate(([0], np.cumsum(codes == k)))
+        count = csum[lo + size] - csum[lo]
+        better = count > best_count
+        best[better], best_count[better] = k, count[better]
+    return best, (best_count / size).astype(np.float32)
+
+
+def sliding_windows(
+    df: pl.DataFrame,
+    size: int,
+    step: int,
+    *,
+    channels: Sequence[str] = CHANNELS,
+    segments: pl.DataFrame | Sequence[LabelSegment] | None = None,
+    label_col: str | None = None,
+) -> Windows:
+    """Windows of *size* samples every *step* samples over one recording.
+
+    *df* is `align_acc_gyro` output (or one subject/session of an ``imu_*``
+    table) sorted by ``ts``. With *segments*, or a per-sample *label_col*
+    such as the warehouse's ``exercise_id``, each window gets its majority
+    label and purity; otherwise every window is `REST` with purity 1.
+    """
+    if size < 1 or step < 1:
+        raise ValueError("window size and step must be positive")
+    buf = np.ascontiguousarray(
+        df.select(pl.col(c).cast(pl.Float32) for c in channels).to_numpy(),
+        dtype=np.float32,
+    )
+    n = max((buf.shape[0] - size) // step + 1, 0)
+    row, col = buf.strides
+    data = as_strided(
+        buf,
+        shape=(n, size, buf.shape[1]),
+        strides=(row * step, row, col),
+        writeable=False,
+    )
+    start_ts = _us(df["ts"])[: n * step : step].astype("datetime64[us]")
+
+    if label_col is not None:
+        codes = df[label_col].fill_null(REST).cast(pl.Int32).to_numpy()
+        labels, purity = _majority(codes, size, step, n)
+    elif segments is not None:
+        labels, purity = _majority(sample_labels(df["ts"], segments), size, step, n)
+    else:
+        labels = np.full(n, REST, dtype=np.int32)
+        purity = np.ones(n, dtype=np.float32)
+    return Windows(data, start_ts, labels, purity, size, step)
+
+
+def iter_windows(
+    df: pl.DataFrame,
+    size: int,
+    step: int,
+    *,
+    by: str = "id",
+    channels: Sequence[str] = CHANNELS,
+    segments: pl.DataFrame | None = None,
+) -> Iterator[tuple[object, Windows]]:
+    """`sliding_windows` per *by* group, so no window spans two subjects.
+
+    *segments*, if given, is filtered to the group when it has a *by* column.
+    """
+    for (key,), part in (
+        df.sort(by, "ts").partition_by(by, maintain_order=True, as_dict=True).items()
+    ):
+        seg = segments
+        if seg is not None and by in seg.columns:
+            seg = seg.filter(pl.col(by) == key)
+        yield key, sliding_windows(part, size, step, channels=channels, segments=seg)
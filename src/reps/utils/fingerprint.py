@@ -0,0 +1,39 @@
+"""Cheap change detection for raw input files."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(slots=True, frozen=True)
+class FileFingerprint:
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def fingerprint(path: Path, previous: FileFingerprint | None = None) -> FileFingerprint:
+    """Fingerprint *path*, re-hashing only when size or mtime moved.
+
+    If *previous* describes the same file with the same size and mtime its
+    hash is reused, so an unchanged file costs one ``stat``.
+    """
+    st = path.stat()
+    if (
+        previous is not None
+        and previous.path == str(path)
+        and previous.size == st.st_size
+        and previous.mtime_ns == st.st_mtime_ns
+    ):
+        return previous
+    with path.open("rb") as fh:
+        digest = hashlib.file_digest(fh, "sha256").hexdigest()
+    return FileFingerprint(str(path), st.st_size, st.st_mtime_ns, digest)
+
+
+def same_content(a: FileFingerprint, b: FileFingerprint) -> bool:
+    """True when *a* and *b* describe identical bytes (mtime may differ)."""
+    return a.size == b.size and a.sha256 == b.sha256
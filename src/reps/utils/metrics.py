@@ -0,0 +1,254 @@
+"""Opt-in per-stage profiling: timed spans written as JSON lines.
+
+Pipeline code wraps each stage in `span`; with ``settings.PROFILE`` off that
+returns a shared no-op context manager, so instrumented code costs a function
+call per stage. With it on, every span appends one record::
+
+    {"stage": "append", "subject": "001", "table": "imu_structured",
+     "seconds": 0.41, "rows": 720000, "bytes": 20160000,
+     "rss_mb": 612.3, "peak_rss_mb": 640.1, "pid": 4242, "start": "..."}
+
+``rss_mb`` / ``peak_rss_mb`` are always present: from ``/proc`` and
+``getrusage`` on Linux and macOS, from ``GetProcessMemoryInfo`` on Windows,
+and ``null`` where the platform cannot tell (current RSS on macOS).
+
+`collect_all` stands in for `polars.collect_all`: when profiling, it runs each
+plan through ``LazyFrame.profile`` and adds a per-node breakdown (read,
+timestamp parse, sort, align, other) to the plan's record.
+Records live in a per-process buffer: a worker process returns `drain()` with
+its result, the parent passes that to `extend`, and the CLI finally writes
+everything with `write_jsonl`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+import polars as pl
+
+from ..config import settings
+
+_RECORDS: list[dict[str, Any]] = []
+
+# Polars profile node name prefix -> reported stage, first match wins
+_NODE_STAGES = (
+    ("parquet(", "read"),
+    ("with_column(ts)", "parse_ts"),
+    ("sort(", "sort"),
+    ("join(", "align"),
+)
+
+
+def _windows_memory(pid: int | None = None) -> tuple[float | None, float | None]:
+    """Working set and its peak in MiB of this process or process *pid*,
+    via psapi's ``GetProcessMemoryInfo``."""
+    if sys.platform != "win32":
+        return None, None
+    import ctypes
+    from ctypes import wintypes
+
+    class _Counters(ctypes.Structure):  # PROCESS_MEMORY_COUNTERS
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _Counters()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    if pid is None:
+        process = kernel32.GetCurrentProcess()
+    else:  # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+        process = kernel32.OpenProcess(0x1000 | 0x0010, False, pid)
+        if not process:
+            return None, None
+    try:
+        ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+            process, ctypes.byref(counters), counters.cb
+        )
+    finally:
+        if pid is not None:
+            kernel32.CloseHandle(process)
+    if not ok:
+        return None, None
+    return counters.WorkingSetSize / 2**20, counters.PeakWorkingSetSize / 2**20
+
+
+def _memory() -> dict[str, float | None]:
+    """Current and peak RSS in MiB; None for what the platform does not report."""
+    if sys.platform == "win32":
+        rss, peak = _windows_memory()
+        return {"rss_mb": rss, "peak_rss_mb": peak}
+
+    import resource
+
+    rss = None
+    try:
+        with open("/proc/self/statm") as fh:
+            rss = int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:  # macOS: no /proc
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB elsewhere
+    peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return {"rss_mb": rss, "peak_rss_mb": peak_mb}
+
+
+def peak_rss_mb(pid: int | None = None) -> float | None:
+    """Peak RSS in MiB of this process, or None if the platform cannot tell.
+
+    On Windows *pid* names another process instead; it may have exited as long
+    as a handle to it (e.g. its `subprocess.Popen`) is still open.
+    """
+    if pid is not None:
+        return _windows_memory(pid)[1]
+    return _memory()["peak_rss_mb"]
+
+
+class Span:
+    """One timed stage; set `rows` / `bytes` inside the ``with`` block."""
+
+    __slots__ = ("stage", "fields", "rows", "bytes", "_t0", "_start")
+
+    def __init__(self, stage: str, fields: dict[str, Any]) -> None:
+        self.stage = stage
+        self.fields = fields
+        self.rows: int | None = None
+        self.bytes: int | None = None
+
+    def __enter__(self) -> Span:
+        self._start = datetime.now(UTC)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        seconds = time.perf_counter() - self._t0
+        record: dict[str, Any] = {"stage": self.stage, **self.fields}
+        record["seconds"] = round(seconds, 6)
+        if self.rows is not None:
+            record["rows"] = self.rows
+        if self.bytes is not None:
+            record["bytes"] = self.bytes
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record |= _memory()
+        record["pid"] = os.getpid()
+        record["start"] = self._start.isoformat()
+        _RECORDS.append(record)
+
+
+class _Off(Span):
+    """What `span` hands out while profiling is disabled."""
+
+    def __init__(self) -> None:
+        pass
+
+    def __enter__(self) -> Span:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: object) -> None:
+        pass
+
+
+_OFF = _Off()
+
+
+def span(stage: str, **fields: Any) -> Span:
+    """Time the enclosed block as *stage*; *fields* (subject, table…) are kept."""
+    return Span(stage, fields) if settings.PROFILE else _OFF
+
+
+def _node_stage(node: str) -> str:
+    for prefix, stage in _NODE_STAGES:
+        if node.startswith(prefix):
+            return stage
+    return "other"
+
+
+def collect_all(
+    plans: list[pl.LazyFrame], names: Iterable[str], **fields: Any
+) -> list[pl.DataFrame]:
+    """`polars.collect_all`, or per-plan profiled collects when profiling."""
+    if not settings.PROFILE:
+        return pl.collect_all(plans)
+    frames = []
+    for plan, name in zip(plans, names, strict=True):
+        with span("collect", plan=name, **fields) as s:
+            df, prof = plan.profile()
+            s.rows = df.height
+            s.bytes = int(df.estimated_size())
+            nodes = (
+                prof.group_by(
+                    pl.col("node").map_elements(_node_stage, return_dtype=pl.String)
+                )
+                .agg(((pl.col("end") - pl.col("start")).sum() / 1e6).alias("s"))
+                .sort("node")
+            )
+            s.fields["nodes"] = dict(zip(nodes["node"], nodes["s"].round(6)))
+        frames.append(df)
+    return frames
+
+
+def drain() -> list[dict[str, Any]]:
+    """Take (and clear) this process's records."""
+    out = _RECORDS[:]
+    del _RECORDS[: len(out)]
+    return out
+
+
+def extend(records: Iterable[dict[str, Any]]) -> None:
+    """Add records handed back by a worker process."""
+    _RECORDS.extend(records)
+
+
+def write_jsonl(path: Path, records: Iterable[dict[str, Any]]) -> None:
+    """Append *records* to *path*, one JSON object per line."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as fh:
+        for rec in records:
+            fh.write(json.dumps(rec, default=str) + "\n")
+
+
+def summary(records: list[dict[str, Any]]) -> pl.DataFrame:
+    """Per-stage totals: calls, seconds, rows, rows/s and the highest peak RSS."""
+    if not records:
+        return pl.DataFrame()
+    df = pl.DataFrame(records, infer_schema_length=None)
+    aggs = [pl.len().alias("calls"), pl.col("seconds").sum()]
+    for col, agg in (
+        (
+            "rows",
+            pl.when(pl.col("rows").is_not_null().any()).then(pl.col("rows").sum()),
+        ),
+        ("peak_rss_mb", pl.col("peak_rss_mb").max()),
+    ):
+        if col in df.columns:
+            aggs.append(agg)
+    out = df.group_by("stage", maintain_order=True).agg(aggs)
+    if "rows" in out.columns:
+        out = out.with_columns(rows_per_s=(pl.col("rows") / pl.col("seconds")).round(0))
+    return out
@@ -0,0 +1,135 @@
+"""Deterministic synthetic raw data in the REPS on-disk layout.
+
+`generate` writes, for each subject, the same files a real export has::
+
+    <root>/acc/REPS-<id>_acc.parquet
+    <root>/gyro/REPS-<id>_gyro.parquet
+    <root>/exercise_labels/{structured,unstructured}/REPS-<id>_labels.parquet
+
+with string ``Timestamp`` columns, per-stream timestamp jitter, sensor
+dropouts and runs of exercise labels separated by rest (null ``Exercise``).
+The first half of each recording is the structured session, the second half
+the unstructured one. Output depends only on the `SyntheticSpec` and subject
+index, so benchmarks run on identical bytes across commits and machines.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from ..domain.models import exercise_map
+
+_G = 9.80665
+
+
+@dataclass(frozen=True, slots=True)
+class SyntheticSpec:
+    hours: float = 0.1  # recording length per subject, both sessions together
+    rate_hz: int = 100
+    jitter_ms: float = 1.0  # uniform ± jitter on each sensor's timestamps
+    gaps_per_hour: float = 6.0  # dropouts per stream and hour
+    gap_s: tuple[float, float] = (0.05, 2.0)
+    set_s: tuple[float, float] = (20.0, 60.0)  # length of one exercise run
+    rest_s: tuple[float, float] = (30.0, 90.0)
+    start: datetime = datetime(2020, 1, 1, 9)  # wall time of the first sample
+    seed: int = 0
+
+
+def _timestamps(us: np.ndarray) -> pl.Series:
+    return pl.from_epoch(pl.Series(us), time_unit="us").dt.strftime(
+        "%Y-%m-%d %H:%M:%S%.6f"
+    )
+
+
+def _codes(rng: np.random.Generator, n: int, spec: SyntheticSpec) -> np.ndarray:
+    """Per-sample exercise code, 0 for rest; alternates rest and exercise runs."""
+    ids = np.array(sorted(exercise_map()))
+    out = np.zeros(n, dtype=np.int32)
+    i = 0
+    while i < n:
+        i += int(rng.uniform(*spec.rest_s) * spec.rate_hz)
+        run = int(rng.uniform(*spec.set_s) * spec.rate_hz)
+        out[i : i + run] = rng.choice(ids)
+        i += run
+    return out
+
+
+def _dropouts(rng: np.random.Generator, n: int, spec: SyntheticSpec) -> np.ndarray:
+    keep = np.ones(n, dtype=bool)
+    for _ in range(rng.poisson(spec.gaps_per_hour * spec.hours)):
+        lo = int(rng.integers(0, n))
+        keep[lo : lo + int(rng.uniform(*spec.gap_s) * spec.rate_hz)] = False
+    return keep
+
+
+def _stream(
+    rng: np.random.Generator,
+    grid_us: np.ndarray,
+    values: dict[str, np.ndarray],
+    spec: SyntheticSpec,
+) -> pl.DataFrame:
+    jitter = rng.uniform(-1, 1, grid_us.shape) * spec.jitter_ms * 1_000
+    keep = _dropouts(rng, grid_us.shape[0], spec)
+    cols = {k: np.round(v, 4)[keep] for k, v in values.items()}
+    return pl.DataFrame(cols).with_columns(
+        Timestamp=_timestamps((grid_us + jitter.astype(np.int64))[keep])
+    )
+
+
+def write_subject(root: Path, subject_id: str, index: int, spec: SyntheticSpec) -> None:
+    """Write one synthetic subject's raw files under *root*."""
+    rng = np.random.default_rng((spec.seed, index))
+    n = int(spec.hours * 3600 * spec.rate_hz)
+    period_us = 1_000_000 // spec.rate_hz
+    t0 = int(spec.start.replace(tzinfo=UTC).timestamp() * 1_000_000)
+    grid = t0 + np.arange(n, dtype=np.int64) * period_us
+    t = np.arange(n) / spec.rate_hz
+
+    codes = _codes(rng, n, spec)
+    active = codes > 0
+    # each exercise moves at its own cadence; rest is just sensor noise
+    phase = 2 * np.pi * (0.3 + 0.05 * codes) * t
+    noise = rng.normal(0, 0.05, (6, n))
+    acc = {
+        "Accelerometer_X": active * 0.8 * _G * np.sin(phase) + noise[0],
+        "Accelerometer_Y": active * 0.3 * _G * np.cos(phase) + noise[1],
+        "Accelerometer_Z": _G + active * 0.5 * _G * np.sin(2 * phase) + noise[2],
+    }
+    gyro = {
+        "Gyroscope_X": active * 120 * np.cos(phase) + 5 * noise[3],
+        "Gyroscope_Y": active * 60 * np.sin(phase) + 5 * noise[4],
+        "Gyroscope_Z": active * 30 * np.sin(2 * phase) + 5 * noise[5],
+    }
+    for kind, values in (("acc", acc), ("gyro", gyro)):
+        path = root / kind / f"REPS-{subject_id}_{kind}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _stream(rng, grid, values, spec).write_parquet(path)
+
+    half = n // 2
+    for session, part in (
+        ("structured", slice(0, half)),
+        ("unstructured", slice(half, n)),
+    ):
+        path = root / "exercise_labels" / session / f"REPS-{subject_id}_labels.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        exercise = np.where(active[part], codes[part], np.nan)
+        pl.DataFrame(
+            {
+                "Exercise": pl.Series(exercise, nan_to_null=True),
+                "Timestamp": _timestamps(grid[part]),
+            }
+        ).write_parquet(path)
+
+
+def generate(root: Path, subjects: int, spec: SyntheticSpec | None = None) -> list[str]:
+    """Write *subjects* synthetic subjects under *root*; returns their IDs."""
+    spec = spec or SyntheticSpec()
+    ids = [f"{i + 1:03d}" for i in range(subjects)]
+    for i, sid in enumerate(ids):
+        write_subject(root, sid, i, spec)
+    return ids
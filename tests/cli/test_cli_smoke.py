@@ -5,3 +5,15 @@ def test_validate_help(runner):
     result = runner.invoke(cli_main.app, ["validate", "--help"])
     assert result.exit_code == 0
     assert "Run warehouse‑sanity checks" in result.output
+
+
+def test_session_is_restricted(runner, tmp_path):
+    for args in (
+        ["stream", "-s", "x", "--source", str(tmp_path)],
+        ["features"],
+        ["export-dataset", "-o", str(tmp_path)],
+        ["export", "-o", str(tmp_path / "out.parquet")],
+    ):
+        result = runner.invoke(cli_main.app, [*args, "--session", "x; DROP TABLE t"])
+        assert result.exit_code == 2, args
+        assert "Invalid value" in result.output
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+# nothing reps --help needs; each costs tens to hundreds of ms to import
+HEAVY = ("duckdb", "polars", "pyarrow", "pandas", "numpy", "pydantic_settings")
+
+_PROBE = """
+import sys
+from reps.cli.main import app
+try:
+    app(["--help"])
+except SystemExit:
+    pass
+print(" ".join(m for m in {heavy!r} if m in sys.modules), file=sys.stderr)
+"""
+
+
+def _importtime(code: str) -> tuple[dict[str, int], str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = proc.stderr.splitlines()
+    self_us = {}
+    for line in lines:
+        if line.startswith("import time:") and "|" in line:
+            us, _, name = line.removeprefix("import time:").split("|")
+            if us.strip().isdigit():
+                self_us[name.strip()] = int(us)
+    return self_us, lines[-1]
+
+
+def test_help_skips_heavy_imports():
+    self_us, loaded = _importtime(_PROBE.format(heavy=HEAVY))
+    assert loaded == "", f"reps --help imported {loaded}"
+    own_ms = sum(us for name, us in self_us.items() if name.startswith("reps")) / 1e3
+    assert own_ms < 50, f"reps modules took {own_ms:.1f} ms to import"
@@ -21,3 +21,45 @@ def sample_parquet_path(tmp_path: Path) -> Path:
 @pytest.fixture
 def runner() -> CliRunner:
     return CliRunner()
+
+
+class Workspace:
+    """Raw-data tree + warehouse path under tmp, wired into `settings`."""
+
+    def __init__(self, root: Path):
+        self.raw_root = root / "raw"
+        self.db_path = root / "reps.duckdb"
+        for sub in ("acc", "gyro", "exercise_labels/structured"):
+            (self.raw_root / sub).mkdir(parents=True, exist_ok=True)
+
+    def add_subject(self, sid: str, n: int = 5, base: float = 1.0) -> None:
+        ts = [f"2020-01-01 00:00:00.{i * 10:03d}000" for i in range(n)]
+        for kind, prefix, offset in (
+            ("acc", "Accelerometer", 0.0),
+            ("gyro", "Gyroscope", 3.0),
+        ):
+            v = base + offset
+            pl.DataFrame(
+                {
+                    f"{prefix}_X": [v] * n,
+                    f"{prefix}_Y": [v + 1] * n,
+                    f"{prefix}_Z": [v + 2] * n,
+                    "Timestamp": ts,
+                }
+            ).write_parquet(self.raw_root / kind / f"REPS-{sid}_{kind}.parquet")
+        pl.DataFrame({"Exercise": [1] * n, "Timestamp": ts}).write_parquet(
+            self.raw_root
+            / "exercise_labels"
+            / "structured"
+            / f"REPS-{sid}_labels.parquet"
+        )
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch) -> Workspace:
+    from reps.config import settings
+
+    ws = Workspace(tmp_path)
+    monkeypatch.setattr(settings, "RAW_ROOT", ws.raw_root, raising=False)
+    monkeypatch.setattr(settings, "DWH_PATH", ws.db_path, raising=False)
+    return ws
@@ -0,0 +1,28 @@
+import polars as pl
+import pytest
+
+from reps.domain import models
+
+
+def test_exercise_map_parsed_once(monkeypatch):
+    models.exercise_map.cache_clear()
+    calls = []
+    real = models.yaml.safe_load
+    monkeypatch.setattr(
+        models.yaml, "safe_load", lambda fh: calls.append(1) or real(fh)
+    )
+    assert models.exercise_name(1) == "Bench Press"
+    assert models.exercise_name(12) == "Calf Raises"
+    assert models.exercise_name(None) is None
+    assert len(calls) == 1
+    with pytest.raises(TypeError):  # shared by every caller, so read-only
+        models.exercise_map()[1] = "Deadlift"  # type: ignore[index]
+    models.exercise_map.cache_clear()
+
+
+def test_exercise_name_expr_enum():
+    df = pl.DataFrame({"exercise_id": [2, None, 99, 2]}).select(
+        models.exercise_name_expr().alias("name")
+    )
+    assert df.schema["name"] == models.exercise_enum()
+    assert df["name"].to_list() == ["Shoulder Press", None, None, "Shoulder Press"]
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from reps.config import settings
+from reps.io.parquet import load_acc, load_label_segments
+
+
+def _acc(path: Path, x: float, n: int = 3) -> None:
+    pl.DataFrame(
+        {
+            "Accelerometer_X": [x] * n,
+            "Accelerometer_Y": [0.0] * n,
+            "Accelerometer_Z": [0.0] * n,
+            "Timestamp": [f"2016-02-17 00:00:0{i}.000000" for i in range(n)],
+        }
+    ).write_parquet(path)
+
+
+def test_bronze_cache_transparent(tmp_path: Path, monkeypatch):
+    src = tmp_path / "REPS-001_acc.parquet"
+    _acc(src, 1.0)
+    uncached = load_acc(src)
+
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(settings, "CACHE_DIR", cache, raising=False)
+    assert load_acc(src).equals(uncached)
+
+    entry = cache / "acc" / "REPS-001_acc.parquet"
+    bronze = pl.read_parquet(entry)
+    assert bronze.schema["ts"] == pl.Datetime("us", "US/Eastern")
+    assert bronze.schema["ax"] == pl.Float32
+
+    built = entry.stat().st_mtime_ns
+    load_acc(src)
+    assert entry.stat().st_mtime_ns == built  # reused, not rebuilt
+
+    _acc(src, 2.0, n=4)
+    out = load_acc(src)
+    assert out.height == 4 and out["ax"][0] == 2.0
+
+
+def test_bronze_cache_labels_per_session(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR", tmp_path / "cache", raising=False)
+    for session, code in (("structured", 1), ("unstructured", 2)):
+        (tmp_path / session).mkdir()
+        pl.DataFrame(
+            {"Exercise": [code], "Timestamp": ["2016-02-17 00:00:00.000000"]}
+        ).write_parquet(tmp_path / session / "REPS-001_labels.parquet")
+
+    for session, code in (("structured", 1), ("unstructured", 2)):
+        segs = load_label_segments(tmp_path / session / "REPS-001_labels.parquet")
+        assert segs["exercise_id"].to_list() == [code]
+
+
+def test_bronze_cache_version_invalidates(tmp_path: Path, monkeypatch):
+    from reps.io import cache
+
+    src = tmp_path / "REPS-001_acc.parquet"
+    _acc(src, 1.0)
+    monkeypatch.setattr(settings, "CACHE_DIR", tmp_path / "cache", raising=False)
+    load_acc(src)
+    entry = tmp_path / "cache" / "acc" / "REPS-001_acc.parquet"
+    built = entry.stat().st_mtime_ns
+
+    monkeypatch.setattr(cache, "CACHE_VERSION", "next")
+    load_acc(src)
+    assert entry.stat().st_mtime_ns != built  # rebuilt under the new version
+    built = entry.stat().st_mtime_ns
+    load_acc(src)
+    assert entry.stat().st_mtime_ns == built
+
+
+def test_cached_requires_cache_dir(monkeypatch):
+    from reps.io.cache import cached
+
+    monkeypatch.setattr(settings, "CACHE_DIR", None, raising=False)
+    with pytest.raises(RuntimeError, match="disabled"):
+        cached(Path("x.parquet"), "acc", lambda: pl.LazyFrame())
+
+
+def test_cached_concurrent_builds(tmp_path: Path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    src = tmp_path / "REPS-001_acc.parquet"
+    _acc(src, 1.0, n=5)
+    monkeypatch.setattr(settings, "CACHE_DIR", tmp_path / "cache", raising=False)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        frames = list(pool.map(lambda _: load_acc(src), range(8)))
+    assert all(f.height == 5 for f in frames)
+    assert sorted(p.name for p in (tmp_path / "cache" / "acc").iterdir()) == [
+        "REPS-001_acc.json",
+        "REPS-001_acc.parquet",
+    ]  # no temp files left behind
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pytest
+
+from reps.config import settings
+from reps.io.connection import reader, writer
+
+
+def test_nested_users_share_one_handle(workspace, monkeypatch):
+    monkeypatch.setattr(settings, "DWH_THREADS", 2, raising=False)
+    monkeypatch.setattr(settings, "DWH_MEMORY_LIMIT", "256MB", raising=False)
+    calls = []
+
+    def schema(db):
+        calls.append(1)
+        db.execute("CREATE TABLE IF NOT EXISTS t (x INTEGER)")
+
+    with writer(schema) as db:
+        with writer(schema) as again:
+            assert again is db
+            db.execute("INSERT INTO t VALUES (1), (2)")
+        with reader() as cur:
+            assert cur.execute("SELECT current_setting('threads')").fetchone() == (2,)
+            assert cur.execute("SELECT sum(x) FROM t").fetchone() == (3,)
+    assert calls == [1]  # schema set up once per open
+
+    # closed with the last user: other connections may open the file again
+    with duckdb.connect(workspace.db_path) as con:
+        con.execute("INSERT INTO t VALUES (3)")
+
+
+def test_concurrent_readers(workspace):
+    with writer() as db:
+        db.execute("CREATE TABLE t AS SELECT range AS x FROM range(1000)")
+
+    def total(_):
+        with reader() as cur:
+            return cur.execute("SELECT sum(x) FROM t").fetchone()[0]
+
+    with reader():  # keeps the read-only handle open for the workers
+        with ThreadPoolExecutor(4) as pool:
+            assert set(pool.map(total, range(16))) == {499500}
+        with pytest.raises(RuntimeError, match="read-only"):
+            with writer():
+                pass
@@ -33,3 +33,98 @@ def test_read_parquet_parses_timestamp(sample_parquet_path):
     assert df["ts"].dtype == pl.Datetime("us", "US/Eastern")
     assert df["ts"][0].year == 2016
     assert df["ts"][0].hour == 11
+
+
+def test_scan_acc_bounds(tmp_path: Path):
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    from reps.io.parquet import scan_acc
+
+    n = 100
+    pl.DataFrame(
+        {
+            "Accelerometer_X": [float(i) for i in range(n)],
+            "Accelerometer_Y": [0.0] * n,
+            "Accelerometer_Z": [0.0] * n,
+            "Timestamp": [f"2016-02-17T00:00:{i:02d}.0000000" for i in range(60)]
+            + [f"2016-02-17T00:01:{i:02d}.0000000" for i in range(n - 60)],
+        }
+    ).write_parquet(tmp_path / "acc.parquet", row_group_size=10)
+
+    tz = ZoneInfo("US/Eastern")
+    out = scan_acc(
+        tmp_path / "acc.parquet",
+        datetime(2016, 2, 17, 0, 0, 30, tzinfo=tz),
+        datetime(2016, 2, 17, 0, 1, 5, tzinfo=tz),
+    ).collect()
+    assert out["ax"].to_list() == [float(i) for i in range(30, 66)]
+    assert out.equals(
+        load_acc(tmp_path / "acc.parquet").filter(pl.col("ax").is_between(30, 65))
+    )
+
+
+def test_scan_acc_bounds_short_fraction(tmp_path: Path):
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    from reps.io.parquet import scan_acc
+
+    pl.DataFrame(
+        {
+            "Accelerometer_X": [float(i) for i in range(8)],
+            "Accelerometer_Y": [0.0] * 8,
+            "Accelerometer_Z": [0.0] * 8,
+            "Timestamp": [f"2016-02-17 00:00:0{i}.000" for i in range(8)],
+        }
+    ).write_parquet(tmp_path / "acc.parquet", row_group_size=2)
+
+    tz = ZoneInfo("US/Eastern")
+    out = scan_acc(
+        tmp_path / "acc.parquet",
+        datetime(2016, 2, 17, 0, 0, 3, tzinfo=tz),
+        datetime(2016, 2, 17, 0, 0, 5, tzinfo=tz),
+    ).collect()
+    assert out["ax"].to_list() == [3.0, 4.0, 5.0]
+
+
+def test_label_segments_run_length(tmp_path: Path):
+    from reps.domain.models import LabelSegment
+    from reps.io.parquet import load_label_segments, load_labels
+
+    ts = [f"2016-02-17 11:25:0{i}.000000" for i in range(7)]
+    pl.DataFrame(
+        {"Exercise": [None, None, 3.0, 3.0, None, 5.0, 5.0], "Timestamp": ts}
+    ).write_parquet(tmp_path / "labels.parquet")
+
+    segs = load_label_segments(tmp_path / "labels.parquet")
+    assert segs.columns == ["ts_start", "ts_end", "exercise_id"]
+    assert segs["exercise_id"].to_list() == [None, 3, None, 5]
+    assert [t.second for t in segs["ts_start"]] == [0, 2, 4, 5]
+    assert [t.second for t in segs["ts_end"]] == [2, 4, 5, 6]
+
+    models = load_labels(tmp_path / "labels.parquet")
+    assert all(isinstance(m, LabelSegment) for m in models)
+    assert [(m.ts_start.second, m.exercise_id) for m in models] == [
+        (0, None),
+        (2, 3),
+        (4, None),
+        (5, 5),
+    ]
+
+
+def test_label_segments_in_batches(tmp_path: Path):
+    from reps.io.parquet import load_label_segments
+
+    ex = [1, 1, None, None, 2, 2, 2, 1, 1, 1, 3]
+    pl.DataFrame(
+        {
+            "Exercise": ex,
+            "Timestamp": [f"2016-02-17 00:00:{i:02d}.000000" for i in range(len(ex))],
+        }
+    ).write_parquet(tmp_path / "labels.parquet", row_group_size=4)
+
+    whole = load_label_segments(tmp_path / "labels.parquet")
+    assert whole["exercise_id"].to_list() == [1, None, 2, 1, 3]
+    for rows in (1, 2, 3, 100):
+        assert load_label_segments(tmp_path / "labels.parquet", rows).equals(whole)
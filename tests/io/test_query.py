@@ -0,0 +1,120 @@
+from datetime import UTC, datetime
+
+import polars as pl
+import pytest
+
+from reps.cli import main as cli_main
+from reps.domain.models import exercise_map
+from reps.io import query
+from reps.pipeline.ingest import ingest_subject
+from reps.processing.window import REST, sample_labels
+from reps.utils.synthetic import SyntheticSpec, generate
+
+
+@pytest.fixture
+def warehouse(workspace):
+    generate(workspace.raw_root, 1, SyntheticSpec(hours=0.05))
+    ingest_subject("001")
+    query.clear_cache()
+    yield workspace
+    query.clear_cache()
+
+
+def test_get_signal_labels_and_filters(warehouse):
+    sig = query.get_signal("001")
+    segs = query.get_segments("001")
+    assert sig["ts"].is_sorted()
+    assert (
+        sig["exercise_id"].fill_null(REST).to_numpy() == sample_labels(sig["ts"], segs)
+    ).all()
+
+    code = int(segs["exercise_id"].drop_nulls()[0])
+    name = exercise_map()[code]
+    one = query.get_signal("001", exercise=name.upper())
+    assert one.height == (sig["exercise_id"] == code).sum() > 0
+    assert one["exercise_id"].unique().to_list() == [code]
+
+    t0 = sig["ts"][100].replace(tzinfo=UTC)  # tz-aware bounds are converted
+    t1 = datetime(2020, 1, 1, 14, 1)
+    part = query.get_signal("001", t0=t0, t1=t1)
+    assert part["ts"].min() == sig["ts"][100] and part["ts"].max() <= t1
+
+    with pytest.raises(ValueError):
+        query.get_signal("001", exercise="no such exercise")
+
+
+def test_slices_are_cached_until_the_warehouse_changes(warehouse):
+    first = query.get_signal("001")
+    assert query.get_signal("001").equals(first)
+    assert query.cache_info()["hits"] == 1
+
+    ingest_subject("001", force=True)
+    query.get_signal("001")
+    assert query.cache_info()["misses"] == 2
+
+
+def test_cache_evicts_least_recently_used(warehouse, monkeypatch):
+    query.get_signal("001")
+    size = query.cache_info()["bytes"]
+    monkeypatch.setattr(query.settings, "QUERY_CACHE_MB", 1.5 * size / 2**20)
+    query.get_signal("001", t0=datetime(2020, 1, 1, 14, 0, 30))
+    query.get_signal("001")
+    info = query.cache_info()
+    assert info["entries"] == 1 and info["bytes"] == size
+
+
+def test_cli_export(warehouse, runner, tmp_path):
+    out = tmp_path / "squat.csv"
+    code = int(query.get_segments("001")["exercise_id"].drop_nulls()[0])
+    result = runner.invoke(cli_main.app, ["export", "-o", str(out), "-e", str(code)])
+    assert result.exit_code == 0, result.output
+    df = pl.read_csv(out)
+    assert df.columns[:2] == ["subject_id", "ts"]
+    assert df.height == query.get_signal("001", exercise=code).height
+
+
+def test_resolution_picks_coarsest_summary(workspace, monkeypatch):
+    monkeypatch.setattr(query.settings, "DWH_PYRAMID", True)
+    generate(workspace.raw_root, 1, SyntheticSpec(hours=0.05))
+    ingest_subject("001")
+    query.clear_cache()
+
+    assert query.summary_level("001", "structured", 0.5) is None
+    assert query.summary_level("001", "structured", 5) == 1
+    assert query.summary_level("001", "structured", 60) == 10
+    assert query.summary_level("001", "unstructured", 60) == 10
+
+    raw = query.get_signal("001", resolution=0.5)
+    coarse = query.get_signal("001", resolution=30)
+    assert "n" not in raw.columns
+    assert coarse["n"].sum() == raw.height
+    assert coarse.height == query.get_summary("001", "structured", 10).height
+
+    code = int(query.get_segments("001")["exercise_id"].drop_nulls()[0])
+    buckets = query.get_signal("001", exercise=code, resolution=1)
+    assert buckets.height > 0 and buckets["exercise_id"].unique().to_list() == [code]
+
+
+def test_cli_export_resolution_mixed_pyramid(workspace, runner, tmp_path, monkeypatch):
+    generate(workspace.raw_root, 2, SyntheticSpec(hours=0.05))
+    monkeypatch.setattr(query.settings, "DWH_PYRAMID", True)
+    ingest_subject("001")
+    monkeypatch.setattr(query.settings, "DWH_PYRAMID", False)
+    ingest_subject("002")
+    query.clear_cache()
+    assert query.summary_level("001", "structured", 30) == 10
+    assert query.shared_summary_level(["001", "002"], "structured", 30) is None
+
+    out = tmp_path / "all.parquet"
+    result = runner.invoke(
+        cli_main.app, ["export", "-o", str(out), "--resolution", "30"]
+    )
+    assert result.exit_code == 0, result.output
+    df = pl.read_parquet(out)
+    assert "n" not in df.columns  # raw for both, since 002 has no summary
+    assert df["subject_id"].unique().sort().to_list() == ["001", "002"]
+
+    only = tmp_path / "one.parquet"
+    args = ["export", "-o", str(only), "-s", "001", "--resolution", "30"]
+    assert runner.invoke(cli_main.app, args).exit_code == 0
+    assert pl.read_parquet(only)["n"].sum() == query.get_signal("001").height
@@ -0,0 +1,149 @@
+import duckdb
+import polars as pl
+
+from reps.config import settings
+from reps.io.warehouse import (
+    INDEXES,
+    cluster,
+    export_parquet,
+    scan_export,
+    storage_report,
+)
+from reps.pipeline.ingest import ingest_subject
+
+
+def _indexes(path) -> set[str]:
+    with duckdb.connect(path, read_only=True) as con:
+        return {
+            r[0]
+            for r in con.execute("SELECT index_name FROM duckdb_indexes()").fetchall()
+        }
+
+
+def test_ingest_builds_no_indexes_unless_asked(workspace, monkeypatch):
+    workspace.add_subject("001")
+    ingest_subject("001")
+    assert _indexes(workspace.db_path) == set()
+
+    monkeypatch.setattr(settings, "DWH_INDEXES", True)
+    ingest_subject("001", force=True)
+    assert _indexes(workspace.db_path) == set(INDEXES)
+
+    from reps.pipeline import ingest
+
+    rebuilt = []
+    monkeypatch.setattr(ingest, "create_indexes", lambda db: rebuilt.append(1))
+    monkeypatch.setattr(ingest, "drop_indexes", lambda db: rebuilt.append(0))
+    assert ingest_subject("001") is False  # unchanged: indexes left alone
+    assert rebuilt == []
+
+
+def test_cluster_sorts_and_export_prunes(workspace, tmp_path):
+    for sid in ("002", "001"):
+        workspace.add_subject(sid)
+        ingest_subject(sid)
+    ingest_subject("002", force=True)  # 002 now sits after 001 again
+
+    with duckdb.connect(workspace.db_path) as db:
+        before = db.execute("SELECT * FROM imu_structured ORDER BY id, ts").pl()
+        cluster(db)
+        after = db.execute("SELECT * FROM imu_structured").pl()
+        assert after.equals(before)  # physical order == (id, ts)
+        export_parquet(db, tmp_path / "out")
+
+    assert (tmp_path / "out/imu/subject=001/session=structured").is_dir()
+    lf = scan_export(tmp_path / "out").filter(pl.col("subject") == "001")
+    got = lf.select("ts", "ax").collect()
+    assert got.equals(before.filter(pl.col("id") == "001").select("ts", "ax"))
+    labels = scan_export(tmp_path / "out", "labels").collect()
+    assert set(labels["subject"]) == {"001", "002"}
+
+
+def test_storage_report_bytes_per_sample(workspace):
+    workspace.add_subject("001", n=50)
+    ingest_subject("001")
+    with duckdb.connect(workspace.db_path, read_only=True) as db:
+        report = storage_report(db, ["imu_structured"])
+        on_disk = db.execute(
+            "SELECT compression FROM pragma_storage_info('imu_structured') "
+            "WHERE column_name = 'ts' AND segment_type <> 'VALIDITY'"
+        ).fetchall()
+    cols = dict(zip(report["column"], report["rows"]))
+    assert cols["*"] == cols["ts"] == 50
+    assert set(report["column"]) == {
+        "id",
+        "ts",
+        "ax",
+        "ay",
+        "az",
+        "gx",
+        "gy",
+        "gz",
+        "exercise_id",
+        "segment_id",
+        "*",
+    }
+    total = report.filter(pl.col("column") == "*").row(0, named=True)
+    assert total["bytes"] == report.filter(pl.col("column") != "*")["bytes"].sum()
+    assert total["bytes_per_sample"] == total["bytes"] / 50
+    assert on_disk and {c for (c,) in on_disk} <= {"BitPacking", "Constant"}
+
+
+def test_pyramid_summarises_each_bucket(workspace, monkeypatch):
+    from reps.io.query import get_signal
+    from reps.utils.synthetic import SyntheticSpec, generate
+
+    generate(workspace.raw_root, 1, SyntheticSpec(hours=0.02))
+    monkeypatch.setattr(settings, "DWH_PYRAMID", True)
+    ingest_subject("001")
+
+    sig = get_signal("001")
+    with duckdb.connect(workspace.db_path, read_only=True) as db:
+        got = db.execute(
+            "SELECT ts, n, ax_min, gz_max, ay_mean, exercise_id, purity"
+            " FROM imu_structured_10s WHERE id = '001' ORDER BY ts"
+        ).pl()
+    labels = (
+        sig.group_by(pl.col("ts").dt.truncate("10s"), "exercise_id")
+        .len()
+        .sort("ts", "len", descending=[False, True])
+        .group_by("ts", maintain_order=True)
+        .first()
+    )
+    want = (
+        sig.group_by(pl.col("ts").dt.truncate("10s"))
+        .agg(
+            pl.len().cast(pl.Int32).alias("n"),
+            pl.col("ax").min().alias("ax_min"),
+            pl.col("gz").max().alias("gz_max"),
+            pl.col("ay").mean().alias("ay_mean"),
+        )
+        .join(labels, on="ts")
+        .sort("ts")
+    )
+    assert got["ts"].equals(want["ts"])
+    assert got["n"].equals(want["n"])
+    assert got["ax_min"].equals(want["ax_min"]) and got["gz_max"].equals(want["gz_max"])
+    assert (got["ay_mean"] - want["ay_mean"]).abs().max() < 1e-4
+    pure = got["purity"] == 1.0  # ties may resolve either way; unique winners not
+    assert got.filter(pure)["exercise_id"].equals(want.filter(pure)["exercise_id"])
+    majority = (got["purity"] * got["n"]).round().cast(pl.UInt32)
+    assert majority.equals(want["len"], check_names=False)
+
+    ingest_subject("001", force=True)  # rebuilt, not appended
+    with duckdb.connect(workspace.db_path, read_only=True) as db:
+        n = db.execute("SELECT count(*) FROM imu_structured_10s").fetchone()
+    assert n == (got.height,)
+
+
+def test_exercise_lookup_in_warehouse(workspace):
+    workspace.add_subject("001")
+    ingest_subject("001")
+    with duckdb.connect(workspace.db_path, read_only=True) as con:
+        row = con.execute(
+            """
+            SELECT l.exercise_id, e.name::VARCHAR, typeof(e.name) LIKE 'ENUM(%'
+            FROM labels_structured l JOIN exercises e USING (exercise_id)
+            """
+        ).fetchone()
+    assert row == (1, "Bench Press", True)
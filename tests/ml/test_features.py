@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+from reps.config import settings
+from reps.ml import store
+from reps.ml.features import GROUPS, FeatureGroup, extract
+from reps.pipeline.ingest import ingest_subject
+from reps.processing.window import CHANNELS, sliding_windows
+
+
+def _imu(n: int) -> pl.DataFrame:
+    t = np.arange(n, dtype=np.float32) / 100
+    return pl.DataFrame(
+        {
+            "ts": [
+                datetime(2024, 1, 1) + timedelta(milliseconds=10 * i) for i in range(n)
+            ],
+            "ax": np.sin(2 * np.pi * 2 * t),  # 2 Hz
+            "ay": 2 * np.sin(2 * np.pi * 2 * t),
+            "az": np.zeros(n),
+            "gx": np.full(n, 3.0),
+            "gy": np.cos(2 * np.pi * 7 * t),  # 7 Hz
+            "gz": t,
+        }
+    )
+
+
+def test_feature_groups_vectorised():
+    w = sliding_windows(_imu(400), size=200, step=100)
+    stats = extract(w, "stats", CHANNELS, batch_size=2)
+    assert stats.height == 3
+    assert np.allclose(stats["gx_mean"], 3.0) and np.allclose(stats["gx_std"], 0)
+
+    corr = extract(w, "corr", CHANNELS)
+    assert np.allclose(corr["corr_ax_ay"], 1.0, atol=1e-5)
+    assert (corr["corr_ax_az"] == 0).all()  # constant axis → 0, not NaN
+
+    fft = extract(w, "fft", CHANNELS)
+    assert (fft["ax_fft_1_3"] > 100 * fft["ax_fft_3_5"]).all()
+    assert (fft["gy_fft_5_10"] > 100 * fft["gy_fft_1_3"]).all()
+
+    jerk = extract(w, "jerk", CHANNELS)
+    assert np.allclose(jerk["gz_jerk_mean_abs"], 1.0, atol=1e-3)  # d/dt of t
+
+
+def test_feature_store_recomputes_only_changed_group(workspace, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "FEATURE_ROOT", tmp_path / "features", raising=False)
+    workspace.add_subject("001", n=60)
+    ingest_subject("001")
+
+    first = store.subject_features("001", "structured", 20, 10)
+    assert first.height == 5
+    assert first["label"].to_list() == [1] * 5
+
+    calls = []
+    real = GROUPS["jerk"]
+    monkeypatch.setitem(
+        GROUPS,
+        "jerk",
+        FeatureGroup("jerk", 2, lambda x, c: calls.append(1) or real.fn(x, c)),
+    )
+    monkeypatch.setattr(
+        store, "extract", lambda w, g, c: calls.append(g) or extract(w, g, c)
+    )
+    again = store.subject_features("001", "structured", 20, 10)
+    assert calls == ["jerk", 1]  # only the bumped group was recomputed
+    assert again.equals(first)
+
+
+def test_feature_store_refreshes_streamed_rows(workspace, tmp_path, monkeypatch):
+    from reps.io.connection import writer
+    from reps.pipeline.ingest import append_samples
+
+    monkeypatch.setattr(settings, "FEATURE_ROOT", tmp_path / "features", raising=False)
+    workspace.add_subject("001", n=60)
+    ingest_subject("001")
+    assert store.subject_features("001", "structured", 20, 10).height == 5
+
+    more = pl.DataFrame(  # appended the way `reps stream` does, no manifest row
+        {
+            "id": ["001"] * 40,
+            "ts": [
+                datetime(2020, 1, 1, 0, 1) + timedelta(milliseconds=10 * i)
+                for i in range(40)
+            ],
+            **{c: [0.0] * 40 for c in CHANNELS},
+        }
+    )
+    with writer() as db:
+        append_samples(db, "imu_structured", more)
+    assert store.subject_features("001", "structured", 20, 10).height == 9
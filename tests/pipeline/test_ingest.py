@@ -55,3 +55,79 @@ def test_ingest_roundtrip(tmp_path: Path, monkeypatch):
     assert result is not None
     ax, gx = result
     assert ax == 1.0 and gx == 4.0
+
+
+def test_ingest_many_parallel(workspace):
+    from reps.pipeline.ingest import discover_subjects, ingest_many
+
+    for sid in ("001", "002", "003"):
+        workspace.add_subject(sid)
+    ids = discover_subjects()
+    assert ids == ["001", "002", "003"]
+
+    ingest_many(ids, workers=2)
+
+    conn = duckdb.connect(workspace.db_path, read_only=True)
+    rows = conn.execute(
+        "SELECT id, count(*) FROM imu_structured GROUP BY id ORDER BY id"
+    ).fetchall()
+    assert rows == [("001", 5), ("002", 5), ("003", 5)]
+
+
+def test_append_arrow_utc(tmp_path: Path):
+    from datetime import datetime
+
+    from reps.pipeline.ingest import _DDL, append_samples
+
+    df = pl.DataFrame(
+        {"id": ["000"], "ts": [datetime(2020, 1, 1, 12)], "ax": [1.5]}
+    ).with_columns(pl.col("ts").dt.replace_time_zone("US/Eastern"))
+    with duckdb.connect(tmp_path / "a.duckdb") as db:
+        db.execute("SET TimeZone = 'Asia/Tokyo'")
+        db.execute(_DDL.format(tbl="imu_structured", lbl="labels_structured"))
+        append_samples(db, "imu_structured", df)
+        row = db.execute("SELECT id, ts, ax, gx FROM imu_structured").fetchone()
+    assert row == ("000", datetime(2020, 1, 1, 17), 1.5, None)
+
+
+def test_samples_carry_their_label_segment(workspace):
+    from reps.processing.window import REST, sample_labels
+    from reps.utils.synthetic import SyntheticSpec, generate
+
+    generate(workspace.raw_root, 1, SyntheticSpec(hours=0.05))
+    ingest_subject("001")
+    with duckdb.connect(workspace.db_path, read_only=True) as con:
+        imu = con.execute(
+            "SELECT ts, exercise_id, segment_id FROM imu_structured ORDER BY ts"
+        ).pl()
+        segs = con.execute("SELECT * FROM labels_structured ORDER BY ts_start").pl()
+    assert segs["segment_id"].to_list() == list(range(segs.height))
+    want = sample_labels(imu["ts"], segs)
+    assert (imu["exercise_id"].fill_null(REST).to_numpy() == want).all()
+    # every sample's segment holds its timestamp and label
+    joined = imu.join(segs, on="segment_id", suffix="_seg")
+    assert joined.height == imu.height
+    assert joined.filter(
+        (pl.col("ts") < pl.col("ts_start")) | (pl.col("ts") > pl.col("ts_end"))
+    ).is_empty()
+    assert joined["exercise_id"].equals(joined["exercise_id_seg"], check_names=False)
+
+
+def test_out_of_core_ingest_matches_in_memory(workspace, monkeypatch):
+    from reps.utils.synthetic import SyntheticSpec, generate
+
+    generate(workspace.raw_root, 1, SyntheticSpec(hours=0.05))
+    tables = ["imu_structured", "labels_structured", "imu_stats"]
+
+    def dump():
+        with duckdb.connect(workspace.db_path, read_only=True) as con:
+            return [con.execute(f"SELECT * FROM {t}").pl() for t in tables]
+
+    ingest_subject("001")
+    in_memory = dump()
+    # 200 B/sample → 1,000-row batches against ~18,000 aligned samples
+    monkeypatch.setattr(settings, "INGEST_MEMORY_LIMIT", "200KB")
+    ingest_subject("001", force=True)
+    for want, got in zip(in_memory, dump()):
+        assert got.equals(want)
+    assert not list(workspace.db_path.parent.glob(".ingest-*"))  # spool removed
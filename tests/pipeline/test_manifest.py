@@ -0,0 +1,54 @@
+import os
+
+import duckdb
+
+from reps.pipeline.ingest import ingest_many, ingest_subject
+
+
+def _counts(db_path):
+    with duckdb.connect(db_path, read_only=True) as con:
+        return con.execute(
+            """
+            SELECT id, count(*), max(ax) FROM imu_structured GROUP BY id ORDER BY id
+            """
+        ).fetchall()
+
+
+def test_reingest_is_idempotent(workspace):
+    workspace.add_subject("001")
+    assert ingest_subject("001") is True
+    assert ingest_subject("001") is False  # unchanged → skipped
+    assert ingest_subject("001", force=True) is True
+    assert _counts(workspace.db_path) == [("001", 5, 1.0)]
+
+    with duckdb.connect(workspace.db_path, read_only=True) as con:
+        kinds = con.execute(
+            "SELECT kind FROM ingest_manifest WHERE subject_id='001' ORDER BY kind"
+        ).fetchall()
+    assert kinds == [("acc",), ("gyro",), ("labels_structured",)]
+
+
+def test_only_changed_subjects_replaced(workspace):
+    workspace.add_subject("001")
+    workspace.add_subject("002")
+    assert ingest_many(["001", "002"]) == ["001", "002"]
+
+    workspace.add_subject("002", n=7, base=9.0)
+    assert ingest_many(["001", "002"]) == ["002"]
+    assert _counts(workspace.db_path) == [("001", 5, 1.0), ("002", 7, 9.0)]
+
+
+def test_touched_file_not_reingested(workspace):
+    workspace.add_subject("001")
+    ingest_subject("001")
+
+    acc = workspace.raw_root / "acc" / "REPS-001_acc.parquet"
+    st = acc.stat()
+    os.utime(acc, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert ingest_subject("001") is False
+
+    with duckdb.connect(workspace.db_path, read_only=True) as con:
+        (mtime,) = con.execute(
+            "SELECT mtime_ns FROM ingest_manifest WHERE kind='acc'"
+        ).fetchone()
+    assert mtime == st.st_mtime_ns + 10**9
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from reps.config import settings
+from reps.io.parquet import load_acc, load_gyro
+from reps.pipeline.stream import END_MARKER, stream_ingest
+from reps.processing.resample import align_acc_gyro
+from reps.utils.synthetic import SyntheticSpec, generate
+
+
+def _spool(raw: Path, spool: Path, kind: str, rows: int) -> None:
+    df = pl.read_parquet(raw / kind / f"REPS-001_{kind}.parquet")
+    (spool / kind).mkdir(parents=True)
+    for i, chunk in enumerate(df.iter_slices(rows)):
+        chunk.write_parquet(spool / kind / f"{i:05d}.parquet")
+
+
+def test_stream_ingest_matches_batch_alignment(workspace, tmp_path, monkeypatch):
+    generate(workspace.raw_root, 1, SyntheticSpec(hours=0.02))
+    spool = tmp_path / "spool"
+    _spool(workspace.raw_root, spool, "acc", 500)
+    _spool(workspace.raw_root, spool, "gyro", 730)
+    (spool / END_MARKER).touch()
+
+    monkeypatch.setattr(settings, "CACHE_DIR", tmp_path / "cache", raising=False)
+    n = stream_ingest(spool, "001", poll_s=0, batch_rows=1_000, max_latency_s=60)
+    assert not (tmp_path / "cache").exists()  # chunks bypass the bronze cache
+
+    raw = workspace.raw_root
+    expected = align_acc_gyro(
+        load_acc(raw / "acc" / "REPS-001_acc.parquet"),
+        load_gyro(raw / "gyro" / "REPS-001_gyro.parquet"),
+    ).with_columns(pl.col("ts").dt.convert_time_zone("UTC").dt.replace_time_zone(None))
+    with duckdb.connect(workspace.db_path, read_only=True) as con:
+        got = con.execute(
+            "SELECT ts, ax, ay, az, gx, gy, gz FROM imu_structured"
+            " WHERE id = '001' ORDER BY ts"
+        ).pl()
+    assert n == expected.height == got.height
+    assert got.equals(expected.cast(got.schema))
+
+    # restarting over the same chunks appends nothing
+    assert stream_ingest(spool, "001", poll_s=0) == 0
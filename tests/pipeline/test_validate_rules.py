@@ -1,5 +1,6 @@
 import duckdb
 import pytest
+from reps.config import settings
 from reps.pipeline import validate
 
 
@@ -29,13 +30,7 @@ def test_null_padding_fail(tiny_db, monkeypatch):
     con.sql("INSERT INTO labels VALUES (1,'structured',0,42);")
     con.close()
 
-    monkeypatch.setattr(validate, "DB", tiny_db)
-
-    # Prevent recursion: store original before patching
-    orig_q = validate._q
-    monkeypatch.setattr(
-        validate, "_q", lambda sql, read_only=True: orig_q(sql, read_only=False)
-    )
+    monkeypatch.setattr(settings, "DWH_PATH", tiny_db, raising=False)
 
     errs = validate.run()
     assert any("label_at_start" in e for e in errs)
@@ -51,12 +46,7 @@ def test_session_overlap_fail(tiny_db, monkeypatch):
     """
     )
     con.close()
-    monkeypatch.setattr(validate, "DB", tiny_db)
-    # Prevent recursion: store original before patching
-    orig_q = validate._q
-    monkeypatch.setattr(
-        validate, "_q", lambda sql, read_only=True: orig_q(sql, read_only=False)
-    )
+    monkeypatch.setattr(settings, "DWH_PATH", tiny_db, raising=False)
     errs = validate.run()
     assert any("overlap" in e for e in errs)
 
@@ -65,11 +55,116 @@ def test_physical_limit_fail(tiny_db, monkeypatch):
     con = duckdb.connect(tiny_db)
     con.sql("INSERT INTO imu VALUES (1,'structured',0,100,0,0,0,0,0)")  # ~10 g
     con.close()
-    monkeypatch.setattr(validate, "DB", tiny_db)
-    # Prevent recursion: store original before patching
-    orig_q = validate._q
-    monkeypatch.setattr(
-        validate, "_q", lambda sql, read_only=True: orig_q(sql, read_only=False)
-    )
+    monkeypatch.setattr(settings, "DWH_PATH", tiny_db, raising=False)
     errs = validate.run()
     assert any("saturation" in e for e in errs)
+
+
+def test_physical_limit_summary(tiny_db, monkeypatch):
+    con = duckdb.connect(tiny_db)
+    con.sql(
+        """
+        INSERT INTO imu VALUES
+        (1,'structured',0,100,0,0,0,0,0),
+        (1,'structured',1,0,0,0,0,0,3000),
+        (1,'structured',2,90,0,0,0,0,0),
+        (1,'structured',3,0,0,0,0,0,0),
+        (2,'structured',0,0,0,0,0,0,0)
+    """
+    )
+    con.close()
+    monkeypatch.setattr(settings, "DWH_PATH", tiny_db, raising=False)
+
+    errs = validate.run(summary=True, top_k=2)
+    assert len(errs) == 1 and "saturation" in errs[0]
+
+    ctx = validate._context(summary=True, top_k=2)
+    row = ctx.spans.filter(subject_id=1).row(0, named=True)
+    assert row["n_saturated"] == 3 and row["n_samples"] == 4
+    assert row["worst_ts"] == [1.0, 0.0]  # gyro 1.5x limit, then acc ~1.27x
+
+
+def test_stats_match_full_scan(workspace, monkeypatch):
+    import polars as pl
+
+    from reps.pipeline.ingest import ingest_subject
+
+    workspace.add_subject("001", n=50)
+    workspace.add_subject("002", n=30, base=100.0)  # acc ≈ 10 g → saturated
+    ingest_subject("001")
+    ingest_subject("002")
+
+    from_stats = validate._context(top_k=3)
+    full = validate._context(top_k=3, full_scan=True)
+    assert from_stats.has_table("imu_stats")
+    cols = ["subject_id", "session", "first_ts", "last_ts", "n_samples"]
+    cols += ["n_saturated", "acc_max", "gyro_max"]
+    assert from_stats.spans.select(cols).equals(
+        full.spans.select(cols).with_columns(
+            pl.col("acc_max", "gyro_max").cast(pl.Float32)
+        )
+    )
+    assert from_stats.spans["worst_ts"].list.len().to_list() == [None, 3]
+
+    stats = from_stats.q("SELECT * FROM imu_stats WHERE id = '001'")
+    assert stats["label_coverage"].to_list() == [1.0]
+    assert stats["acc_gaps"].to_list() == [0]
+
+    errs = validate.run(summary=True)
+    assert any("saturation" in e for e in errs)
+    assert any("label_at_start" in e for e in errs)  # fixture labels every sample
+
+
+def test_spans_computed_once_across_threads(workspace, monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from reps.pipeline.ingest import ingest_subject
+
+    workspace.add_subject("001", n=20)
+    ingest_subject("001")
+
+    calls = []
+    real_q = validate.Context.q
+
+    def slow_q(self, sql, **frames):
+        calls.append(sql)
+        time.sleep(0.05)  # widen the window a racing caller would slip into
+        return real_q(self, sql, **frames)
+
+    monkeypatch.setattr(validate.Context, "q", slow_q)
+    ctx = validate._context(full_scan=True)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        heights = list(pool.map(lambda _: len(ctx.spans), range(4)))
+    assert heights == [1] * 4
+    assert len(calls) == 1
+
+
+def test_streamed_rows_without_stats_are_checked(workspace):
+    from datetime import datetime
+
+    import polars as pl
+
+    from reps.io.connection import writer
+    from reps.pipeline.ingest import append_samples, create_schema, ingest_subject
+
+    workspace.add_subject("001", n=20)
+    ingest_subject("001")
+    assert not any("saturation" in e for e in validate.run(summary=True))
+
+    streamed = pl.DataFrame(  # how `reps stream` appends: no imu_stats row
+        {
+            "id": ["001", "002"],
+            "ts": [datetime(2020, 1, 1, 0, 5), datetime(2020, 1, 1, 0, 5)],
+            "ax": [500.0, 500.0],
+        }
+    )
+    with writer(create_schema) as db:
+        append_samples(db, "imu_structured", streamed)
+
+    spans = validate._context().spans
+    full = validate._context(full_scan=True).spans
+    assert spans["n_saturated"].to_list() == full["n_saturated"].to_list() == [1, 1]
+    assert spans["n_samples"].to_list() == full["n_samples"].to_list() == [21, 1]
+    errs = validate.run(summary=True)
+    assert any("saturation" in e for e in errs)
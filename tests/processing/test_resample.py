@@ -29,3 +29,119 @@ def test_align_lengths():
     df = align_acc_gyro(acc, gyro)
     # Expect 10 rows (100 Hz window)
     assert df.height == 10
+
+
+def test_lazy_matches_eager():
+    from reps.processing.resample import align_acc_gyro_lazy
+
+    acc = pl.DataFrame(
+        {"ts": [_ts(i) for i in (0, 2, 3, 7)], "ax": [0.0, 2.0, 3.0, 7.0]}
+    ).with_columns(ay=pl.col("ax"), az=pl.col("ax"))
+    gyro = pl.DataFrame(
+        {"ts": [_ts(i) for i in (1, 5)], "gx": [1.0, 5.0]}
+    ).with_columns(gy=pl.col("gx"), gz=pl.col("gx"))
+    lazy = align_acc_gyro_lazy(acc.lazy(), gyro.lazy()).collect()
+    assert lazy.equals(align_acc_gyro(acc, gyro))
+    assert lazy["ax"].to_list() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    assert lazy["gx"].to_list() == [None, 1.0, 1.0, 1.0, 1.0, 5.0, 5.0, 5.0]
+
+
+def test_resample_strategies_off_grid():
+    from reps.processing.resample import resample
+
+    # samples at 3 ms and 17 ms; grid every 5 ms from 3 ms
+    df = pl.DataFrame(
+        {
+            "ts": [_ts(0) + timedelta(milliseconds=m) for m in (3, 17)],
+            "v": [0.0, 14.0],
+        }
+    ).with_columns(h=pl.col("v"), n=pl.col("v"))
+    out = resample(df, {"v": "linear", "h": "hold", "n": "nearest"}, every="5ms")
+    assert out["ts"].to_list() == [
+        _ts(0) + timedelta(milliseconds=m) for m in (3, 8, 13)
+    ]
+    assert out["v"].to_list() == [0.0, 5.0, 10.0]
+    assert out["h"].to_list() == [0.0, 0.0, 0.0]
+    assert out["n"].to_list() == [0.0, 0.0, 14.0]
+
+
+def test_chunked_align_matches_single_pass():
+    from reps.processing.resample import iter_align_acc_gyro
+
+    idx = [i for i in range(200) if i % 7]
+    acc = pl.DataFrame({"ts": [_ts(i) for i in idx], "ax": [float(i) for i in idx]})
+    acc = acc.with_columns(ay=-pl.col("ax"), az=pl.col("ax") * 2)
+    gyro = acc.rename({"ax": "gx", "ay": "gy", "az": "gz"}).filter(
+        pl.col("gx") % 3 != 0
+    )
+
+    whole = align_acc_gyro(acc, gyro)
+    chunks = list(iter_align_acc_gyro(acc, gyro, chunk_size=16))
+    assert len(chunks) > 1
+    assert pl.concat(chunks).equals(whole)
+    assert whole["ax"].to_list() == [float(i) for i in range(1, 200)]
+
+
+def test_stream_aligner_matches_align_acc_gyro():
+    import random
+
+    from reps.processing.resample import StreamAligner
+
+    idx = [i for i in range(600) if i % 11 and not 300 < i < 340]
+    acc = pl.DataFrame({"ts": [_ts(i) for i in idx], "ax": [float(i) for i in idx]})
+    acc = acc.with_columns(ay=-pl.col("ax"), az=pl.col("ax") * 2).cast(
+        {"ax": pl.Float32, "ay": pl.Float32, "az": pl.Float32}  # as the loaders
+    )
+    gyro = acc.rename({"ax": "gx", "ay": "gy", "az": "gz"}).filter(
+        pl.col("gx") % 5 != 0
+    )
+
+    rnd = random.Random(0)
+    pending = {"acc": acc, "gyro": gyro}
+    aligner = StreamAligner(chunk_size=32)
+    out = []
+    while any(df.height for df in pending.values()):
+        name = rnd.choice([k for k, df in pending.items() if df.height])
+        n = rnd.randint(1, 60)
+        aligner.push(name, pending[name].head(n))
+        pending[name] = pending[name].slice(n)
+        out.append(aligner.emit())
+        assert aligner.buffered < 200
+    out.append(aligner.finish())
+    assert pl.concat(out).equals(align_acc_gyro(acc, gyro))
+
+
+def test_align_streams_k_way_with_gap_limit():
+    import pytest
+
+    from reps.processing.resample import Stream, align_streams, align_streams_lazy
+
+    acc = pl.DataFrame(
+        {
+            "ts": [_ts(i) for i in range(0, 40, 2)],
+            "ax": [float(i) for i in range(0, 40, 2)],
+        }
+    )
+    gyro = pl.DataFrame(
+        {"ts": [_ts(i) for i in range(1, 40, 3)], "gx": range(1, 40, 3)}
+    )
+    # 10 Hz heart rate with a dropout between 100 and 350 ms
+    hr = pl.DataFrame({"ts": [_ts(i) for i in (0, 10, 35)], "bpm": [60.0, 61.0, 62.0]})
+    streams = [
+        Stream(acc, "linear"),
+        Stream(gyro, "hold"),
+        Stream(hr, {"bpm": "hold"}, rate_hz=10),
+    ]
+
+    out = align_streams(streams, chunk_size=7)
+    assert out.columns == ["ts", "ax", "gx", "bpm"]
+    assert out["ts"].to_list() == [_ts(i) for i in range(39)]
+    assert out["ax"].to_list()[:38] == [float(i) for i in range(38)]
+    assert out["gx"].to_list() == [None] + [1 + (i - 1) // 3 * 3 for i in range(1, 39)]
+    bpm = out["bpm"].to_list()
+    assert bpm[:10] == [60.0] * 10 and bpm[10:31] == [61.0] * 21  # held ≤ 200 ms
+    assert bpm[31:35] == [None] * 4 and bpm[35:] == [62.0] * 4
+    assert align_streams_lazy(streams).collect().equals(out)
+
+    with pytest.raises(ValueError, match="more than one stream"):
+        align_streams([Stream(acc), Stream(acc.rename({"ax": "gx"})), Stream(gyro)])
@@ -0,0 +1,60 @@
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+from reps.domain.models import LabelSegment
+from reps.processing.window import REST, iter_windows, sliding_windows
+
+
+def _ts(i: int) -> datetime:
+    return datetime(2024, 1, 1, tzinfo=UTC) + timedelta(milliseconds=10 * i)
+
+
+def _imu(n: int, sid: str = "001") -> pl.DataFrame:
+    return (
+        pl.DataFrame(
+            {"ts": [_ts(i) for i in range(n)], "ax": [float(i) for i in range(n)]}
+        )
+        .with_columns(
+            ay=-pl.col("ax"),
+            az=pl.lit(0.0),
+            gx=pl.lit(1.0),
+            gy=pl.lit(2.0),
+            gz=pl.lit(3.0),
+        )
+        .with_columns(id=pl.lit(sid))
+    )
+
+
+def test_windows_are_strided_views():
+    w = sliding_windows(_imu(10), size=4, step=3)
+    assert w.data.shape == (3, 4, 6) and w.data.dtype == np.float32
+    assert not w.data.flags.writeable
+    assert np.shares_memory(w.data[0], w.data[1])  # overlap → same buffer
+    assert w.data[2, :, 0].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert w.start_ts.tolist() == [_ts(i).replace(tzinfo=None) for i in (0, 3, 6)]
+    assert (w.labels == REST).all()
+
+
+def test_window_majority_label_and_purity():
+    segs = [
+        LabelSegment(_ts(0), _ts(3), None),
+        LabelSegment(_ts(3), _ts(9), 5),
+    ]
+    w = sliding_windows(_imu(10), size=4, step=2, segments=segs)
+    # windows start at 0, 2, 4, 6
+    assert w.labels.tolist() == [REST, 5, 5, 5]
+    assert w.purity.tolist() == [0.75, 0.75, 1.0, 1.0]
+
+    # the warehouse's per-sample column gives the same windows
+    per_sample = _imu(10).with_columns(exercise_id=pl.Series([None] * 3 + [5] * 7))
+    v = sliding_windows(per_sample, size=4, step=2, label_col="exercise_id")
+    assert v.labels.tolist() == w.labels.tolist()
+    assert v.purity.tolist() == w.purity.tolist()
+
+
+def test_iter_windows_per_subject():
+    df = pl.concat([_imu(5, "001"), _imu(7, "002")])
+    out = dict(iter_windows(df, size=3, step=1))
+    assert {k: len(w) for k, w in out.items()} == {"001": 3, "002": 5}
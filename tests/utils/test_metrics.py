@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from reps.cli import main as cli_main
+from reps.config import settings
+from reps.pipeline.ingest import ingest_many
+from reps.utils import metrics
+
+
+@pytest.fixture(autouse=True)
+def _clean_buffer():
+    metrics.drain()
+    yield
+    metrics.drain()
+
+
+def test_span_is_noop_when_disabled():
+    with metrics.span("anything", subject="001") as sp:
+        sp.rows = 10
+    assert metrics.drain() == []
+
+
+def test_worker_records_reach_parent(workspace, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE", True)
+    for sid in ("001", "002"):
+        workspace.add_subject(sid, n=20)
+    ingest_many(["001", "002"], workers=2)
+
+    records = metrics.drain()
+    stages = {(r["stage"], r.get("subject")) for r in records}
+    for sid in ("001", "002"):
+        assert {("prepare", sid), ("collect", sid), ("write", sid)} <= stages
+    imu = [
+        r for r in records if r["stage"] == "append" and r["table"] == "imu_structured"
+    ]
+    assert sorted(r["rows"] for r in imu) == [20, 20]
+    collect = next(r for r in records if r["stage"] == "collect")
+    assert "read" in collect["nodes"] and "parse_ts" in collect["nodes"]
+    assert len({r["pid"] for r in records}) > 1  # prepared in workers
+
+
+def test_cli_metrics_out(workspace, runner, tmp_path):
+    workspace.add_subject("001")
+    out = tmp_path / "m.jsonl"
+    result = runner.invoke(
+        cli_main.app, ["ingest", "-s", "001", "--profile", "--metrics-out", str(out)]
+    )
+    assert result.exit_code == 0, result.output
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert {"fingerprint", "labels", "append", "commit"} <= {r["stage"] for r in lines}
+    assert all(r["seconds"] >= 0 for r in lines)
+    # reported on every platform CI runs (Linux, Windows)
+    assert all(r["peak_rss_mb"] is not None and r["peak_rss_mb"] > 0 for r in lines)
+    assert "append" in result.output  # summary table
+    assert settings.PROFILE is False
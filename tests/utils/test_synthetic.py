@@ -0,0 +1,50 @@
+import hashlib
+
+import duckdb
+import polars as pl
+
+from reps.pipeline.ingest import ingest_subject
+from reps.utils.synthetic import SyntheticSpec, generate
+
+SPEC = SyntheticSpec(hours=0.05, gaps_per_hour=40, set_s=(10, 20), rest_s=(5, 10))
+
+
+def _digest(root) -> dict[str, str]:
+    return {
+        p.relative_to(root)
+        .as_posix(): hashlib.sha256(pl.read_parquet(p).write_csv().encode())
+        .hexdigest()
+        for p in sorted(root.rglob("*.parquet"))
+    }
+
+
+def test_generate_is_deterministic_and_realistic(tmp_path):
+    ids = generate(tmp_path / "a", 2, SPEC)
+    generate(tmp_path / "b", 2, SPEC)
+    assert ids == ["001", "002"]
+    assert _digest(tmp_path / "a") == _digest(tmp_path / "b")
+
+    acc = pl.read_parquet(tmp_path / "a/acc/REPS-001_acc.parquet")
+    assert acc["Timestamp"].dtype == pl.String
+    ts = acc["Timestamp"].str.to_datetime()
+    steps = ts.diff().drop_nulls().dt.total_microseconds()
+    assert steps.min() > 0  # jittered, yet still increasing
+    assert steps.max() > 20_000  # dropouts
+    assert acc.height < SPEC.hours * 3600 * SPEC.rate_hz
+
+    labels = pl.read_parquet(
+        tmp_path / "a/exercise_labels/structured/REPS-001_labels.parquet"
+    )
+    assert labels["Exercise"].null_count() > 0  # rest between sets
+    assert labels["Exercise"].drop_nulls().is_between(1, 12).all()
+
+
+def test_generated_subject_ingests(workspace):
+    generate(workspace.raw_root, 1, SPEC)
+    ingest_subject("001")
+    with duckdb.connect(workspace.db_path, read_only=True) as con:
+        n = con.execute("SELECT count(*) FROM imu_structured").fetchone()[0]
+        gaps = con.execute("SELECT sum(acc_gaps) FROM imu_stats").fetchone()[0]
+    # the 10 ms grid starts at the (jittered) first sample, so ±1 at the edges
+    assert abs(n - SPEC.hours * 3600 * SPEC.rate_hz // 2) <= 1
+    assert gaps > 0